@@ -0,0 +1,69 @@
+"""Insert throughput of addexpense() one row at a time vs add_expenses_bulk().
+
+The last line re-runs the bulk insert with duplicate detection on, so every
+row is recognised by fingerprint and skipped.
+
+Run with ``python -m expense_tracker.benchmarks.bulk_insert``.
+"""
+import argparse
+import time
+
+from expense_tracker.benchmarks.fixtures import create_benchmark_pool
+from expense_tracker.core.expense import ExpenseManager
+
+
+def _rows(count):
+    for i in range(count):
+        yield {
+            "amount": f"{i % 500 + 1}.25",
+            "category": "food",
+            "payment_method": "cash",
+            "date": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            "description": f"row {i}",
+            "tag": f"tag{i % 20}",
+            "payment_detail_identifier": f"{i % 10000:04d}",
+        }
+
+
+def run(rows=20000, batch_size=1000):
+    """Return rows/second for both insert paths, each on a fresh database."""
+    results = {}
+
+    pool = create_benchmark_pool()
+    expense_manager = ExpenseManager(pool)
+    expense_manager.set_current_user("admin")
+    started = time.perf_counter()
+    for row in _rows(rows):
+        expense_manager.addexpense(import_fn=1, **row)
+    results["addexpense"] = rows / (time.perf_counter() - started)
+    pool.close()
+
+    pool = create_benchmark_pool()
+    expense_manager = ExpenseManager(pool)
+    expense_manager.set_current_user("admin")
+    started = time.perf_counter()
+    expense_manager.add_expenses_bulk(_rows(rows), batch_size=batch_size)
+    results["add_expenses_bulk"] = rows / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    expense_manager.add_expenses_bulk(_rows(rows), batch_size=batch_size, skip_duplicates=True)
+    results["bulk re-import"] = rows / (time.perf_counter() - started)
+    pool.close()
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000, help="expenses to insert per method")
+    parser.add_argument("--batch-size", type=int, default=1000, help="executemany batch size for the bulk path")
+    args = parser.parse_args(argv)
+
+    print(f"{'Method':<20} {'Rows/s':>10}")
+    print("-" * 31)
+    for method, rate in run(args.rows, args.batch_size).items():
+        print(f"{method:<20} {rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
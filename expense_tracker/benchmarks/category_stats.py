@@ -0,0 +1,97 @@
+"""Latency of ReportManager.get_category_statistics() vs the four-query version it replaced.
+
+The Category Overview tab calls it on every selectbox change. Both versions
+run against the same seeded database, for an admin and for one user, with
+the result cache bypassed so every call reaches SQLite.
+
+Run with ``python -m expense_tracker.benchmarks.category_stats``.
+"""
+import argparse
+import time
+
+from expense_tracker.benchmarks.fixtures import create_benchmark_pool, seed_expenses
+from expense_tracker.core.reporting import ReportManager
+from expense_tracker.database.sql_queries import REPORT_QUERIES
+
+# The previous implementation: an id lookup, then the totals, the monthly
+# GROUP BY and the latest five expenses as separate statements
+LEGACY_QUERIES = {
+    "totals": """
+        SELECT SUM(e.amount), COUNT(e.expense_id), AVG(e.amount), MAX(e.amount), MIN(e.amount)
+        FROM expense_flat e
+        WHERE e.category_name = ? {user_filter}
+    """,
+    "monthly": """
+        SELECT strftime('%Y-%m', e.date) as month, SUM(e.amount) as amount
+        FROM expense_flat e
+        WHERE e.category_name = ? {user_filter}
+        GROUP BY month
+        ORDER BY month ASC
+    """,
+    "recent": """
+        SELECT e.expense_id, e.date, e.amount, e.description, e.username
+        FROM expense_flat e
+        WHERE e.category_name = ? {user_filter}
+        ORDER BY e.date DESC
+        LIMIT 5
+    """,
+}
+
+
+def legacy_category_statistics(pool, category, username=None):
+    """Compute the Category Overview figures the way the four-query version did."""
+    user_filter = "AND e.username = ?" if username else ""
+    params = (category, username) if username else (category,)
+    with pool.reader() as conn:
+        if conn.execute(REPORT_QUERIES["get_category_id"], (category,)).fetchone() is None:
+            return None
+        totals = conn.execute(LEGACY_QUERIES["totals"].format(user_filter=user_filter), params).fetchone()
+        if totals[0] is None:
+            return None
+        monthly = conn.execute(LEGACY_QUERIES["monthly"].format(user_filter=user_filter), params).fetchall()
+        recent = conn.execute(LEGACY_QUERIES["recent"].format(user_filter=user_filter), params).fetchall()
+        return totals, monthly, recent
+
+
+def _time_calls(function, categories, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for category in categories:
+            function(category)
+    return (time.perf_counter() - started) / (repeat * len(categories)) * 1000
+
+
+def run(rows=1_000_000, repeat=5):
+    """Return milliseconds per call for both versions, as an admin and as one user."""
+    pool = create_benchmark_pool()
+    seed_expenses(pool, rows)
+    categories = [row[0] for row in pool.fetchall("SELECT category_name FROM Categories")]
+
+    report_manager = ReportManager(pool)
+    # Bypass the result cache: time the query, not a dictionary lookup
+    uncached = ReportManager.get_category_statistics.__wrapped__
+
+    results = []
+    for label, username, privileges in (("admin", None, "admin"), ("user", "alice", "user")):
+        report_manager.set_user_info(username or "admin", privileges)
+        legacy = _time_calls(lambda c: legacy_category_statistics(pool, c, username), categories, repeat)
+        single = _time_calls(lambda c: uncached(report_manager, c), categories, repeat)
+        results.append((label, legacy, single))
+    pool.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="expenses to seed before measuring")
+    parser.add_argument("--repeat", type=int, default=5, help="passes over every category")
+    args = parser.parse_args(argv)
+
+    print(f"{'Viewer':<8} {'Legacy ms':>10} {'Single ms':>10} {'Speedup':>8}")
+    print("-" * 39)
+    for label, legacy, single in run(args.rows, args.repeat):
+        print(f"{label:<8} {legacy:>10.2f} {single:>10.2f} {legacy / single:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
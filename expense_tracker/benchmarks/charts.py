@@ -0,0 +1,51 @@
+"""Render time of the analytics dashboard: drawn from scratch vs served from the chart cache.
+
+Run with ``python -m expense_tracker.benchmarks.charts``.
+"""
+import argparse
+import time
+
+from expense_tracker.benchmarks.fixtures import create_benchmark_pool, seed_expenses
+from expense_tracker.core.reporting import ReportManager
+from expense_tracker.utils.charts import clear_chart_cache
+
+
+def _time_render(report_manager, repeat, cached=False):
+    report_manager.render_expenses_analytics_chart()  # Warm up the summary
+    started = time.perf_counter()
+    for _ in range(repeat):
+        if not cached:
+            clear_chart_cache()
+        report_manager.render_expenses_analytics_chart()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def run(rows=20000, repeat=5):
+    """Return milliseconds per dashboard render for each rendering path."""
+    pool = create_benchmark_pool()
+    seed_expenses(pool, rows)
+    report_manager = ReportManager(pool)
+    report_manager.set_user_info("admin", "admin")
+
+    results = {
+        "single figure": _time_render(report_manager, repeat),
+        "cached": _time_render(report_manager, repeat, cached=True),
+    }
+    pool.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000, help="expenses to seed before measuring")
+    parser.add_argument("--repeat", type=int, default=5, help="renders per path")
+    args = parser.parse_args(argv)
+
+    print(f"{'Path':<15} {'ms/render':>10}")
+    print("-" * 26)
+    for path, ms in run(args.rows, args.repeat).items():
+        print(f"{path:<15} {ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Aggregate reports from SQLite vs from the columnar snapshot.
+
+Times get_expense_summary(), get_rollup_summary() and get_top_expenses()
+with ReportManager(pool) and ReportManager(pool, columnar=True), for an
+admin and for one user, with the result cache bypassed. Also reports the
+snapshot's initial load and the refresh after one new expense.
+
+Run with ``python -m expense_tracker.benchmarks.columnar``.
+"""
+import argparse
+import time
+
+from expense_tracker.benchmarks.fixtures import create_benchmark_pool, seed_expenses
+from expense_tracker.core.expense import ExpenseManager
+from expense_tracker.core.reporting import ReportManager
+
+def _reports(year):
+    """Report calls to time, as label -> (method, arguments), over ranges in year."""
+    return {
+        "summary": (ReportManager.get_expense_summary.__wrapped__, ()),
+        "summary, one quarter": (
+            ReportManager.get_expense_summary.__wrapped__,
+            ({"date": [(">=", f"{year}-04-01"), ("<=", f"{year}-06-30")]},),
+        ),
+        "by category, ragged range": (
+            ReportManager.get_rollup_summary.__wrapped__, ("category", f"{year}-02-10", f"{year}-09-03"),
+        ),
+        "top 10, one year": (ReportManager.get_top_expenses.__wrapped__, (f"{year}-01-01", f"{year}-12-31", 10)),
+    }
+
+
+def _time_call(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def run(rows=1_000_000, repeat=5):
+    """Return (load ms, refresh ms, [(viewer, report, SQLite ms, columnar ms)])."""
+    pool = create_benchmark_pool()
+    seed_expenses(pool, rows)
+    sql = ReportManager(pool)
+    columnar = ReportManager(pool, columnar=True)
+
+    # The seeded dates end today, so the previous calendar year is complete
+    reports = _reports(int(pool.fetchone("SELECT MAX(date) FROM expense_flat")[0][:4]) - 1)
+
+    load = _time_call(columnar.columnar.refresh, 1)
+    expense_manager = ExpenseManager(pool)
+    expense_manager.set_current_user("alice")
+    category, payment_method = pool.fetchone("SELECT category_name, payment_method_name FROM expense_flat LIMIT 1")
+    expense_manager.addexpense(12.5, category, payment_method, "2024-06-01", "benchmark", "", import_fn=1)
+    refresh = _time_call(columnar.columnar.refresh, 1)
+
+    results = []
+    for viewer, username, privileges in (("admin", "admin", "admin"), ("user", "alice", "user")):
+        sql.set_user_info(username, privileges)
+        columnar.set_user_info(username, privileges)
+        for label, (method, args) in reports.items():
+            results.append((
+                viewer, label,
+                _time_call(lambda: method(sql, *args), repeat),
+                _time_call(lambda: method(columnar, *args), repeat),
+            ))
+    pool.close()
+    return load, refresh, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="expenses to seed before measuring")
+    parser.add_argument("--repeat", type=int, default=5, help="calls per report and engine")
+    args = parser.parse_args(argv)
+
+    load, refresh, results = run(args.rows, args.repeat)
+    print(f"Snapshot load: {load:.0f} ms, refresh after one insert: {refresh:.1f} ms\n")
+    print(f"{'Viewer':<7} {'Report':<27} {'SQLite ms':>10} {'Columnar ms':>12} {'Speedup':>8}")
+    print("-" * 68)
+    for viewer, label, sql_ms, columnar_ms in results:
+        print(f"{viewer:<7} {label:<27} {sql_ms:>10.2f} {columnar_ms:>12.2f} {sql_ms / columnar_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import os
+import random
+import tempfile
+from datetime import date, timedelta
+
+from expense_tracker.database.db_init import initialize_database
+from expense_tracker.database.fingerprint import expense_fingerprint
+from expense_tracker.database.pool import ConnectionPool
+
+
+def create_benchmark_pool(storage_profile=None, max_readers=8, directory=None):
+    """Create a pool over a fresh database file in a temporary directory."""
+    directory = directory or tempfile.mkdtemp(prefix="expense_bench_")
+    db_path = os.path.join(directory, "benchmark.db")
+    return ConnectionPool(
+        db_path,
+        max_readers=max_readers,
+        initializer=initialize_database,
+        storage_profile=storage_profile,
+    )
+
+
+def seed_expenses(pool, rows, users=("alice", "bob", "carol"), days=730, seed=42):
+    """Insert ``rows`` random expenses spread across ``users`` and ``days``.
+
+    Rows are written straight into the link tables in one transaction so that
+    large fixtures (a million expenses) build in seconds.
+    """
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=days)
+
+    with pool.writer() as conn:
+        cursor = conn.cursor()
+        for username in users:
+            cursor.execute("INSERT OR IGNORE INTO User (username, password) VALUES (?, ?)", (username, "bench"))
+            cursor.execute(
+                "INSERT OR IGNORE INTO User_Role (username, role_id) "
+                "SELECT ?, role_id FROM Role WHERE role_name = 'user'",
+                (username,),
+            )
+
+        category_ids = [row[0] for row in cursor.execute("SELECT category_id FROM Categories")]
+        method_ids = [row[0] for row in cursor.execute("SELECT payment_method_id FROM Payment_Method")]
+        for tag in ("work", "home", "travel", "family", "general"):
+            cursor.execute("INSERT OR IGNORE INTO Tags (tag_name) VALUES (?)", (tag,))
+        tag_ids = [row[0] for row in cursor.execute("SELECT tag_id FROM Tags")]
+
+        first_id = (cursor.execute("SELECT COALESCE(MAX(expense_id), 0) FROM Expense").fetchone()[0]) + 1
+        expenses, categories, tags, methods, owners = [], [], [], [], []
+        for expense_id in range(first_id, first_id + rows):
+            day = (start + timedelta(days=rng.randrange(days))).isoformat()
+            amount = round(rng.uniform(1, 500), 2)
+            description = f"expense {expense_id}"
+            detail = f"{rng.randrange(10000):04d}"
+            owner = rng.choice(users)
+            fingerprint = expense_fingerprint(owner, day, amount, description, detail)
+            expenses.append((expense_id, day, amount, description, fingerprint))
+            categories.append((rng.choice(category_ids), expense_id))
+            tags.append((rng.choice(tag_ids), expense_id))
+            methods.append((rng.choice(method_ids), expense_id, detail))
+            owners.append((owner, expense_id))
+
+        cursor.executemany("INSERT INTO Category_Expense (category_id, expense_id) VALUES (?, ?)", categories)
+        cursor.executemany("INSERT INTO Tag_Expense (tag_id, expense_id) VALUES (?, ?)", tags)
+        cursor.executemany(
+            "INSERT INTO Payment_Method_Expense (payment_method_id, expense_id, payment_detail_identifier) VALUES (?, ?, ?)",
+            methods,
+        )
+        cursor.executemany("INSERT INTO User_Expense (username, expense_id) VALUES (?, ?)", owners)
+        # Expense rows last, as in add_expenses_bulk: each one then becomes a
+        # complete expense_flat row (and rollup entry) in a single step
+        cursor.executemany(
+            "INSERT INTO Expense (expense_id, date, amount, description, fingerprint) VALUES (?, ?, ?, ?, ?)",
+            expenses,
+        )
+        conn.commit()
+    return rows
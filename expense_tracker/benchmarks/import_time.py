@@ -0,0 +1,103 @@
+"""Import time of the modules loaded before the login page renders.
+
+Runs ``python -X importtime`` in a fresh interpreter, so nothing is cached
+from this process. Fails (exit status 1) if the login path imports one of
+the DEFERRED packages, which only the report and management pages need, or
+if it takes longer than --budget-ms.
+
+Run with ``python -m expense_tracker.benchmarks.import_time``. Without
+streamlit installed, the app module itself cannot be imported, so only the
+managers and utilities it creates at start-up are measured.
+"""
+import argparse
+import importlib.util
+import subprocess
+import sys
+
+# What web/app.py imports at start-up
+APP_MODULE = "expense_tracker.web.app"
+APP_DEPENDENCIES = (
+    "expense_tracker.core.user",
+    "expense_tracker.core.category",
+    "expense_tracker.core.payment",
+    "expense_tracker.core.expense",
+    "expense_tracker.core.reporting",
+    "expense_tracker.utils.csv_operations",
+    "expense_tracker.utils.logs",
+    "expense_tracker.database.db_init",
+    "expense_tracker.database.pool",
+)
+
+# Packages the login page must not wait for
+DEFERRED = ("pandas", "numpy", "matplotlib", "plotly")
+
+
+def measure(modules):
+    """Import modules in a fresh interpreter; return {module: (self us, cumulative us)} and top-level names."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    timings, top_level = {}, []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nesting is shown by indenting the name two spaces per level
+        if not name[1:].startswith(" "):
+            top_level.append(name.strip())
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings, top_level
+
+
+def run(repeat=3):
+    """Return (modules measured, best total ms, heaviest top-level imports, deferred packages loaded)."""
+    if importlib.util.find_spec("streamlit") is not None:
+        modules = (APP_MODULE,)
+    else:
+        modules = APP_DEPENDENCIES
+
+    best = None
+    for _ in range(repeat):
+        timings, top_level = measure(modules)
+        total = sum(timings[name][1] for name in top_level)
+        if best is None or total < best[0]:
+            best = (total, timings, top_level)
+
+    total, timings, top_level = best
+    heaviest = sorted(((timings[name][1], name) for name in top_level), reverse=True)[:10]
+    loaded = sorted(name for name in DEFERRED if name in timings)
+    return modules, total / 1000, [(name, us / 1000) for us, name in heaviest], loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters to run; the fastest counts")
+    parser.add_argument("--budget-ms", type=float, help="fail if the imports take longer than this")
+    args = parser.parse_args(argv)
+
+    modules, total_ms, heaviest, loaded = run(args.repeat)
+    if modules == APP_DEPENDENCIES:
+        print("streamlit is not installed; measuring the app's start-up dependencies only")
+    print(f"{'Top-level import':<45} {'ms':>8}")
+    print("-" * 54)
+    for name, ms in heaviest:
+        print(f"{name:<45} {ms:>8.1f}")
+    print("-" * 54)
+    print(f"{'Total':<45} {total_ms:>8.1f}")
+
+    failed = False
+    if loaded:
+        print(f"\nLoaded before login: {', '.join(loaded)}. Import them where they are used.")
+        failed = True
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"\nOver budget: {total_ms:.1f} ms > {args.budget_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
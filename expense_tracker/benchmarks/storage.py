@@ -0,0 +1,99 @@
+"""Read throughput under a concurrent write load, per storage profile.
+
+Run with ``python -m expense_tracker.benchmarks.storage``. One thread keeps
+adding expenses (one commit each, like the Add Expense form) while several
+reader threads run a dashboard-style aggregate over the expense join.
+"""
+import argparse
+import threading
+import time
+
+from expense_tracker.benchmarks.fixtures import create_benchmark_pool, seed_expenses
+from expense_tracker.core.expense import ExpenseManager
+from expense_tracker.database.pool import DEFAULT_STORAGE_PROFILE
+from expense_tracker.database.sql_queries import BASE_EXPENSE_QUERY
+
+PROFILES = {
+    "rollback": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "read_only_readers": False,
+    },
+    "wal": DEFAULT_STORAGE_PROFILE,
+}
+
+READ_QUERY = f"""
+    SELECT category_name, COUNT(*), SUM(amount)
+    FROM ({BASE_EXPENSE_QUERY})
+    WHERE username = ?
+    GROUP BY category_name
+"""
+
+
+def run_profile(profile_name, rows=20000, readers=4, duration=5.0):
+    """Run the mixed read/write workload against one storage profile."""
+    pool = create_benchmark_pool(PROFILES[profile_name], max_readers=readers)
+    seed_expenses(pool, rows)
+
+    expense_manager = ExpenseManager(pool)
+    expense_manager.set_current_user("alice")
+
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "read_errors": 0}
+    lock = threading.Lock()
+
+    def write_loop():
+        while not stop.is_set():
+            if expense_manager.addexpense(12.5, "food", "cash", "2024-01-15", "benchmark", "work", import_fn=1):
+                with lock:
+                    counts["writes"] += 1
+
+    def read_loop():
+        while not stop.is_set():
+            try:
+                pool.fetchall(READ_QUERY, ("alice",))
+                with lock:
+                    counts["reads"] += 1
+            except Exception:
+                with lock:
+                    counts["read_errors"] += 1
+
+    threads = [threading.Thread(target=write_loop)]
+    threads += [threading.Thread(target=read_loop) for _ in range(readers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    pool.close()
+
+    return {
+        "profile": profile_name,
+        "reads_per_sec": counts["reads"] / elapsed,
+        "writes_per_sec": counts["writes"] / elapsed,
+        "read_errors": counts["read_errors"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000, help="expenses to seed before measuring")
+    parser.add_argument("--readers", type=int, default=4, help="concurrent reader threads")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds to run each profile")
+    parser.add_argument("--profile", choices=sorted(PROFILES), action="append",
+                        help="profile to run (default: all)")
+    args = parser.parse_args(argv)
+
+    print(f"{'Profile':<10} {'Reads/s':>10} {'Writes/s':>10} {'Read errors':>12}")
+    print("-" * 45)
+    for name in args.profile or ["rollback", "wal"]:
+        result = run_profile(name, rows=args.rows, readers=args.readers, duration=args.duration)
+        print(f"{result['profile']:<10} {result['reads_per_sec']:>10.1f} "
+              f"{result['writes_per_sec']:>10.1f} {result['read_errors']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,17 @@ DB_CONFIG = {
     "demo_data_enabled": True,  # Set to False if you don't want demo data loaded
     "connection_timeout": 30,  # SQLite connection timeout in seconds
     "busy_timeout": 30000,  # SQLite busy timeout in milliseconds
+    "pool_size": 8,  # Maximum number of pooled read connections
+    "pool_checkout_timeout": 30,  # Seconds to wait for a free read connection
+    # SQLite storage profile applied at connect time (see database/pool.py)
+    "storage_profile": {
+        "journal_mode": "WAL",  # Readers are not blocked by the writer
+        "synchronous": "NORMAL",  # Safe with WAL, avoids an fsync per commit
+        "cache_size": -20000,  # Page cache size in KiB (negative) or pages
+        "mmap_size": 268435456,  # Memory-mapped I/O size in bytes
+        "temp_store": "MEMORY",  # Keep temp tables and sort spills in memory
+        "read_only_readers": True,  # Open reporting connections with mode=ro
+    },
 }
 
 # File storage configuration
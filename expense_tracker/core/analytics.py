@@ -0,0 +1,349 @@
+"""Columnar in-memory snapshot of expense_flat for vectorized aggregates.
+
+ColumnarSnapshot holds every expense as NumPy arrays: the amount as float64,
+the date as an int32 day ordinal (date.toordinal()), and the category,
+payment method, tag and owner as int32 codes into per-column name tables,
+with -1 for NULL. One snapshot per pool serves every viewer; a user's
+expenses are a mask on the owner codes.
+
+Before each query the snapshot catches up with the writes recorded in the
+pool's DataVersion: new expenses are read from the highest expense_id it
+holds, updated or deleted ones are re-read by id, and it reloads in full
+only when a write may have changed rows it cannot name. Like the report
+cache, it only sees writes made through this process's managers.
+
+Besides the day ordinal each row keeps its month (months since 1970-01),
+which the monthly groupings and the month filter use.
+"""
+import json
+import operator
+import threading
+import weakref
+from datetime import datetime
+
+import numpy as np
+
+from expense_tracker.core.filters import AND_FIELDS, MONTH_NAMES, normalize_filters
+from expense_tracker.database.result_cache import get_data_version
+from expense_tracker.database.sql_queries import REPORT_QUERIES
+
+# Coded columns, in the order columnar_rows selects them after the amount
+CODED_COLUMNS = ("category", "payment_method", "tag", "user")
+
+# Groupings for group_totals(): year_month is "YYYY-MM", month is "01".."12"
+GROUPINGS = ("year_month", "month", "category", "payment_method", "tag")
+
+COMPARISONS = {
+    "=": operator.eq, "!=": operator.ne, "<>": operator.ne,
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+}
+
+_FETCH_SIZE = 65536
+
+
+def _parse_date(text):
+    """Parse a stored date the way ExpenseManager validates it, so "2024-3-5" is accepted too."""
+    return datetime.strptime(text, "%Y-%m-%d").date()
+
+
+class _Columns:
+    """One consistent set of arrays plus the name tables their codes refer to.
+
+    Refreshing builds new arrays instead of writing into these, so a query
+    can keep using the set it started with. Name tables only ever grow,
+    except on a full reload, which starts a new set.
+    """
+
+    def __init__(self, arrays=None, names=None, codes=None, days=None):
+        self.arrays = arrays if arrays is not None else _empty_arrays()
+        self.names = names if names is not None else {column: [] for column in CODED_COLUMNS}
+        # name -> code; None (NULL) is stored as -1 but has no name
+        self.codes = codes if codes is not None else {column: {None: -1} for column in CODED_COLUMNS}
+        self.days = days if days is not None else ({}, {})  # "YYYY-MM-DD" -> day ordinal, -> month
+
+    def __len__(self):
+        return len(self.arrays["amount"])
+
+    def max_id(self):
+        ids = self.arrays["expense_id"]
+        return int(ids[-1]) if len(ids) else 0
+
+
+def _empty_arrays():
+    arrays = {
+        "expense_id": np.empty(0, np.int64),
+        "day": np.empty(0, np.int32),
+        "month": np.empty(0, np.int32),
+        "amount": np.empty(0, np.float64),
+    }
+    arrays.update((column, np.empty(0, np.int32)) for column in CODED_COLUMNS)
+    return arrays
+
+
+def _concat(parts):
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+class ColumnarSnapshot:
+    """Vectorized group-bys, filters, top-N and histograms over expense_flat."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.data_version = get_data_version(pool)
+        self._lock = threading.Lock()
+        self._columns = _Columns()
+        self._version = None  # DataVersion token the arrays reflect
+        self._change_sequence = 0
+        self.loads = 0
+        self.appends = 0
+        self.patches = 0
+
+    # Loading
+
+    def _encode(self, columns, column, values):
+        codes, names = columns.codes[column], columns.names[column]
+        # Few distinct names: add the new ones, then map every value in C
+        for name in set(values).difference(codes):
+            codes[name] = len(names)
+            names.append(name)
+        return np.fromiter(map(codes.__getitem__, values), np.int32, len(values))
+
+    def _encode_dates(self, columns, values):
+        days, months = columns.days
+        for text in set(values).difference(days):
+            day = _parse_date(text)
+            days[text] = day.toordinal()
+            months[text] = (day.year - 1970) * 12 + day.month - 1
+        return (np.fromiter(map(days.__getitem__, values), np.int32, len(values)),
+                np.fromiter(map(months.__getitem__, values), np.int32, len(values)))
+
+    def _read(self, columns, query, param):
+        """Run a columnar_rows query and return its rows as arrays, coded against columns."""
+        parts = [_empty_arrays()]
+        with self.pool.reader() as conn:
+            cursor = conn.execute(query, (param,))
+            while True:
+                rows = cursor.fetchmany(_FETCH_SIZE)
+                if not rows:
+                    break
+                ids, dates, amounts, *coded = zip(*rows)
+                days, months = self._encode_dates(columns, dates)
+                part = {
+                    "expense_id": np.array(ids, np.int64),
+                    "day": days,
+                    "month": months,
+                    "amount": np.array(amounts, np.float64),
+                }
+                for column, values in zip(CODED_COLUMNS, coded):
+                    part[column] = self._encode(columns, column, values)
+                parts.append(part)
+        return _concat(parts)
+
+    def _patch(self, columns, changed):
+        """Return arrays with the changed expenses re-read: updated rows replaced, deleted rows dropped."""
+        arrays = columns.arrays
+        # Ids above the highest one held arrive with the next append
+        wanted = np.array(sorted(changed), np.int64)
+        wanted = wanted[wanted <= columns.max_id()]
+        if not len(wanted):
+            return arrays
+        rows = self._read(columns, REPORT_QUERIES["columnar_rows_by_id"], json.dumps(wanted.tolist()))
+        keep = ~np.isin(arrays["expense_id"], wanted)
+        kept = {key: values[keep] for key, values in arrays.items()}
+        at = np.searchsorted(kept["expense_id"], rows["expense_id"])
+        return {key: np.insert(values, at, rows[key]) for key, values in kept.items()}
+
+    def refresh(self):
+        """Bring the arrays up to date with the writes recorded in the DataVersion."""
+        with self._lock:
+            version = self.data_version.token()
+            if version == self._version:
+                return
+            # Read the change log before the rows: a write that lands while
+            # reading is then applied again on the next refresh
+            sequence, changed = self.data_version.changes_since(self._change_sequence)
+            if changed is None or self._version is None:
+                columns = _Columns()
+                columns.arrays = self._read(columns, REPORT_QUERIES["columnar_rows"], 0)
+                self.loads += 1
+            else:
+                columns = self._columns
+                arrays = columns.arrays
+                if changed:
+                    arrays = self._patch(columns, changed)
+                    self.patches += 1
+                newer = self._read(columns, REPORT_QUERIES["columnar_rows"], columns.max_id())
+                if len(newer["expense_id"]):
+                    arrays = _concat([arrays, newer])
+                    self.appends += 1
+                columns = _Columns(arrays, columns.names, columns.codes, columns.days)
+            self._columns = columns
+            self._version = version
+            self._change_sequence = sequence
+
+    def _current(self):
+        self.refresh()
+        return self._columns
+
+    # Selection
+
+    def _compare(self, columns, field, op, value):
+        compare = COMPARISONS[op]
+        arrays = columns.arrays
+        if field == "amount":
+            return compare(arrays["amount"], value)
+        if field == "date":
+            return compare(arrays["day"], _parse_date(value).toordinal())
+        if field == "month":
+            return compare(arrays["month"] % 12 + 1, int(value))
+        # Text columns: compare each name once and look the answer up by
+        # code; code -1 (NULL) picks the trailing False, as in SQL
+        names = columns.names[field]
+        table = np.array([compare(name, value) for name in names] + [False], bool)
+        return table[arrays[field]]
+
+    def _where(self, columns, filters=None, username=None):
+        """Return a boolean mask of the rows matching filters (see core/filters.py) and username."""
+        mask = np.ones(len(columns), bool)
+        if username is not None:
+            code = columns.codes["user"].get(username)
+            if code is None:
+                return ~mask
+            mask &= columns.arrays["user"] == code
+        for field, constraints in normalize_filters(filters):
+            hits = [self._compare(columns, field, op, value) for op, value in constraints]
+            mask &= np.logical_and.reduce(hits) if field in AND_FIELDS else np.logical_or.reduce(hits)
+        return mask
+
+    def _group(self, columns, group_by, mask, amounts, extremes=True):
+        """Return [(label, total, count, min, max)] for the masked rows, sorted by label.
+
+        amounts are the masked rows' amounts. Without extremes, min and max
+        are None.
+        """
+        if group_by == "year_month":
+            months = columns.arrays["month"][mask]
+            first = int(months.min()) if len(months) else 0
+            keys = months - first
+            span = int(keys.max()) + 1 if len(keys) else 0
+            labels = [f"{1970 + month // 12}-{month % 12 + 1:02d}" for month in range(first, first + span)]
+        elif group_by == "month":
+            keys = columns.arrays["month"][mask] % 12
+            labels = [f"{number:02d}" for number in range(1, 13)]
+        elif group_by in CODED_COLUMNS:
+            # NULL (-1) moves to group 0, which is labelled "" and left out
+            # below like expenses without a value in the SQL groupings
+            keys = columns.arrays[group_by][mask] + 1
+            labels = [""] + columns.names[group_by]
+        else:
+            raise ValueError(f"Unknown grouping '{group_by}'")
+
+        size = len(labels)
+        counts = np.bincount(keys, minlength=size)
+        totals = np.bincount(keys, weights=amounts, minlength=size)
+        lowest = highest = [None] * size
+        if extremes:
+            lowest = np.full(size, np.inf)
+            highest = np.full(size, -np.inf)
+            np.minimum.at(lowest, keys, amounts)
+            np.maximum.at(highest, keys, amounts)
+            lowest, highest = lowest.tolist(), highest.tolist()
+        groups = [
+            (labels[key], float(totals[key]), int(counts[key]), lowest[key], highest[key])
+            for key in np.flatnonzero(counts).tolist()
+            if labels[key] != ""
+        ]
+        return sorted(groups)
+
+    # Queries
+
+    def group_totals(self, group_by, filters=None, username=None):
+        """Return [(label, total, count, min, max)] per group of the matching expenses, sorted by label.
+
+        group_by is one of GROUPINGS. Raises FilterError for an invalid filter.
+        """
+        columns = self._current()
+        mask = self._where(columns, filters, username)
+        return self._group(columns, group_by, mask, columns.arrays["amount"][mask])
+
+    def top_n(self, n, filters=None, username=None):
+        """Return the ids of the n largest matching expenses, largest first."""
+        columns = self._current()
+        mask = self._where(columns, filters, username)
+        amounts = columns.arrays["amount"][mask]
+        ids = columns.arrays["expense_id"][mask]
+        if n <= 0 or not len(amounts):
+            return []
+        if n < len(amounts):
+            picked = np.argpartition(-amounts, n - 1)[:n]
+        else:
+            picked = np.arange(len(amounts))
+        order = picked[np.lexsort((ids[picked], -amounts[picked]))]
+        return ids[order].tolist()
+
+    def summary(self, filters=None, username=None, bins=20):
+        """Return the get_expense_summary() dict for the matching expenses, or None if there are none."""
+        columns = self._current()
+        mask = self._where(columns, filters, username)
+        amounts = columns.arrays["amount"][mask]
+        if not len(amounts):
+            return None
+
+        min_amount, max_amount = float(amounts.min()), float(amounts.max())
+        total = float(amounts.sum())
+        summary = {
+            "count": len(amounts),
+            "total": total,
+            "average": total / len(amounts),
+            "max": max_amount,
+            "min": min_amount,
+            "year_months": {
+                label: group_total for label, group_total, *_ in self._group(columns, "year_month", mask, amounts, False)
+            },
+            "months": {
+                MONTH_NAMES[label]: group_total for label, group_total, *_ in self._group(columns, "month", mask, amounts, False)
+            },
+        }
+        for group_by, key in (("category", "categories"), ("payment_method", "payment_methods"), ("tag", "tags")):
+            summary[key] = {
+                label: {"count": group_count, "total": group_total}
+                for label, group_total, group_count, _, _ in self._group(columns, group_by, mask, amounts, False)
+            }
+
+        # Same binning as the amount_histogram query. Only min(bins, distinct
+        # amounts) matters, which a small prefix usually settles.
+        distinct = len(np.unique(amounts[:bins * 64]))
+        if distinct < bins:
+            distinct = len(np.unique(amounts))
+        bins = max(1, min(bins, distinct))
+        width = (max_amount - min_amount) / bins or 1.0
+        indexes = np.minimum(((amounts - min_amount) / width).astype(np.int64), bins - 1)
+        summary["histogram"] = {
+            "edges": [min_amount + width * i for i in range(bins + 1)],
+            "counts": np.bincount(indexes, minlength=bins).tolist(),
+        }
+        return summary
+
+    def stats(self):
+        """Return row count, memory use and refresh counters for diagnostics."""
+        columns = self._columns
+        return {
+            "rows": len(columns),
+            "bytes": sum(values.nbytes for values in columns.arrays.values()),
+            "loads": self.loads,
+            "appends": self.appends,
+            "patches": self.patches,
+        }
+
+
+_snapshots = weakref.WeakKeyDictionary()
+_snapshots_lock = threading.Lock()
+
+
+def get_columnar_snapshot(pool):
+    """Return the process-wide columnar snapshot for a connection pool."""
+    with _snapshots_lock:
+        snapshot = _snapshots.get(pool)
+        if snapshot is None:
+            snapshot = _snapshots[pool] = ColumnarSnapshot(pool)
+        return snapshot
@@ -1,10 +1,15 @@
 import sqlite3
 from expense_tracker.database.sql_queries import CATEGORY_QUERIES
+from expense_tracker.database.dimension_cache import get_dimension_cache
+from expense_tracker.database.reference_cache import get_reference_cache
+from expense_tracker.database.result_cache import get_data_version
 
 class CategoryManager:
-    def __init__(self, cursor, conn):
-        self.conn = conn
-        self.cursor = cursor
+    def __init__(self, pool):
+        self.pool = pool
+        self.dimensions = get_dimension_cache(pool)
+        self.references = get_reference_cache(pool)
+        self.data_version = get_data_version(pool)
     
     def add_category(self, category_name):
         category_name = category_name.strip().lower()
@@ -13,18 +18,21 @@ class CategoryManager:
             print("Category name cannot be empty.")
             return False
         
-        try:
-            self.cursor.execute(CATEGORY_QUERIES["add_category"], (category_name,))
-            self.conn.commit()
-            print(f"Category '{category_name}' added successfully.")
-            return True
-        except sqlite3.IntegrityError:
-            print(f"Error: Category '{category_name}' already exists.")
-            return False
+        with self.pool.writer() as conn:
+            try:
+                conn.execute(CATEGORY_QUERIES["add_category"], (category_name,))
+                conn.commit()
+                self.dimensions.invalidate("category")
+                self.references.invalidate("categories")
+                self.data_version.bump()
+                print(f"Category '{category_name}' added successfully.")
+                return True
+            except sqlite3.IntegrityError:
+                print(f"Error: Category '{category_name}' already exists.")
+                return False
     
     def list_categories(self):
-        self.cursor.execute(CATEGORY_QUERIES["list_categories"])
-        categories = self.cursor.fetchall()
+        categories = self.pool.fetchall(CATEGORY_QUERIES["list_categories"])
 
         if not categories:
             print("No categories found.")
@@ -37,29 +45,34 @@ class CategoryManager:
 
     def delete_category(self, category_name):
         """Deletes a category and all related data."""
-        try:
-            # Check if category exists
-            self.cursor.execute("SELECT category_id FROM Categories WHERE category_name = ?", (category_name,))
-            if not self.cursor.fetchone():
-                print(f"Error: Category '{category_name}' does not exist.")
-                return False
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            try:
+                # Check if category exists
+                cursor.execute("SELECT category_id FROM Categories WHERE category_name = ?", (category_name,))
+                if not cursor.fetchone():
+                    print(f"Error: Category '{category_name}' does not exist.")
+                    return False
 
-            # Check if the category has expenses associated with it
-            self.cursor.execute(CATEGORY_QUERIES["check_category_expenses"], (category_name,))
-            expense_count = self.cursor.fetchone()[0]
-            if expense_count > 0:
-                print(f"Error: Cannot delete category '{category_name}' as it has {expense_count} expenses associated with it.")
-                print("Please reassign or delete all expenses in this category first.")
-                return False
+                # Check if the category has expenses associated with it
+                cursor.execute(CATEGORY_QUERIES["check_category_expenses"], (category_name,))
+                expense_count = cursor.fetchone()[0]
+                if expense_count > 0:
+                    print(f"Error: Cannot delete category '{category_name}' as it has {expense_count} expenses associated with it.")
+                    print("Please reassign or delete all expenses in this category first.")
+                    return False
 
-            # Delete category-related data
-            self.cursor.execute(CATEGORY_QUERIES["delete_category_related"], (category_name,))
-            
-            # Delete the category
-            self.cursor.execute(CATEGORY_QUERIES["delete_category"], (category_name,))
-            self.conn.commit()
-            print(f"Category '{category_name}' has been deleted successfully.")
-            return True
-        except sqlite3.Error as e:
-            print(f"Error: Unable to delete category '{category_name}'. {e}")
-            return False
\ No newline at end of file
+                # Delete category-related data
+                cursor.execute(CATEGORY_QUERIES["delete_category_related"], (category_name,))
+                
+                # Delete the category
+                cursor.execute(CATEGORY_QUERIES["delete_category"], (category_name,))
+                conn.commit()
+                self.dimensions.invalidate("category")
+                self.references.invalidate("categories")
+                self.data_version.bump()
+                print(f"Category '{category_name}' has been deleted successfully.")
+                return True
+            except sqlite3.Error as e:
+                print(f"Error: Unable to delete category '{category_name}'. {e}")
+                return False
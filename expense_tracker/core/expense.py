@@ -1,11 +1,30 @@
+import json
+import re
 import sqlite3
 from datetime import datetime
 from expense_tracker.database.sql_queries import EXPENSE_QUERIES, BASE_EXPENSE_QUERY
+from expense_tracker.database.dimension_cache import get_dimension_cache
+from expense_tracker.database.reference_cache import get_reference_cache
+from expense_tracker.database.result_cache import get_data_version
+from expense_tracker.database.fingerprint import expense_fingerprint
+from expense_tracker.core.filters import compile_filters, FilterError
+
+# Search terms the expense picker also treats as a date or an amount prefix
+DATE_PREFIX = re.compile(r"\d{4}(-\d{0,2}){0,2}")
+AMOUNT_PREFIX = re.compile(r"\$?(\d+)(?:\.(\d{0,2}))?")
+
+
+def _prefix_range(prefix):
+    """Return the [low, high) bounds of the strings that start with prefix."""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
 
 class ExpenseManager:
-    def __init__(self, cursor, conn):
-        self.conn = conn
-        self.cursor = cursor
+    def __init__(self, pool):
+        self.pool = pool
+        self.dimensions = get_dimension_cache(pool)
+        self.references = get_reference_cache(pool)
+        self.data_version = get_data_version(pool)
         self.current_user = None
     
     def set_current_user(self, username):
@@ -35,248 +54,425 @@ class ExpenseManager:
             print(f"Error: Invalid date format '{date}'. Must be in YYYY-MM-DD format.")
             return False
         
-        try:
-            self.cursor.execute(EXPENSE_QUERIES["insert_expense"], (date, amount, description))
-            expense_id = self.cursor.lastrowid
-            
-            # Check if category exists
-            self.cursor.execute("SELECT category_id FROM Categories WHERE category_name = ?", (category,))
-            result = self.cursor.fetchone()
-            if result is None:
-                print(f"Error: Category '{category}' does not exist. Adding failed!")
-                self.conn.rollback()
-                return False
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            try:
+                # Check if category exists
+                category_id = self.dimensions.get_id("category", category)
+                if category_id is None:
+                    print(f"Error: Category '{category}' does not exist. Adding failed!")
+                    return False
             
-            category_id = result[0]  # Extract category_id
-            self.cursor.execute(EXPENSE_QUERIES["insert_category_expense"], (category_id, expense_id))
+                payment_method_id = self.dimensions.get_id("payment_method", payment_method)
+                if payment_method_id is None:
+                    print(f"Error: Payment Method '{payment_method}' does not exist. Adding failed!")
+                    return False
             
-            self.cursor.execute("SELECT tag_id FROM Tags WHERE tag_name = ?", (tag,))
-            result = self.cursor.fetchone()
-            if result is None:
-                self.cursor.execute(EXPENSE_QUERIES["insert_tag"], (tag,))
-                tag_id = self.cursor.lastrowid
-            else:
-                tag_id = result[0]
-                
-            self.cursor.execute(EXPENSE_QUERIES["insert_tag_expense"], (tag_id, expense_id))
+                # Take the write lock up front so the expense id below stays ours
+                cursor.execute("BEGIN IMMEDIATE")
+                expense_id = cursor.execute(EXPENSE_QUERIES["next_expense_id"]).fetchone()[0]
             
-            self.cursor.execute("SELECT payment_method_id FROM Payment_Method WHERE Payment_Method_Name = ?", (payment_method,))
-            result = self.cursor.fetchone()
-            if result is None:
-                print(f"Error: Payment Method '{payment_method}' does not exist. Adding failed!")
-                self.conn.rollback()
-                return False
+                tag_id = self.dimensions.get_id("tag", tag)
+                new_tag = tag_id is None
+                if new_tag:
+                    cursor.execute(EXPENSE_QUERIES["insert_tag"], (tag,))
+                    tag_id = cursor.lastrowid
             
-            payment_method_id = result[0]  # Extract payment_method_id
-            self.cursor.execute(EXPENSE_QUERIES["insert_payment_method_expense"], 
-                               (payment_method_id, expense_id, payment_detail_identifier))
+                cursor.execute(EXPENSE_QUERIES["insert_category_expense"], (category_id, expense_id))
+                cursor.execute(EXPENSE_QUERIES["insert_tag_expense"], (tag_id, expense_id))
+                cursor.execute(EXPENSE_QUERIES["insert_payment_method_expense"], 
+                                   (payment_method_id, expense_id, payment_detail_identifier))
+                cursor.execute(EXPENSE_QUERIES["insert_user_expense"], (self.current_user, expense_id))
             
-            self.cursor.execute(EXPENSE_QUERIES["insert_user_expense"], (self.current_user, expense_id))
+                # The Expense row goes in last, as in add_expenses_bulk, so the
+                # expense_flat row and its monthly rollup group are written once
+                fingerprint = expense_fingerprint(self.current_user, date, amount, description, payment_detail_identifier)
+                cursor.execute(EXPENSE_QUERIES["insert_expense_with_id"],
+                               (expense_id, date, amount, description, fingerprint))
             
-            self.conn.commit()
-            if import_fn == 0:
-                print("Expense Added Successfully")
-            return True
+                conn.commit()
+                self.data_version.bump(self.current_user)
+                if new_tag:
+                    self.dimensions.invalidate("tag")
+                    self.references.invalidate("tags")
+                if import_fn == 0:
+                    print("Expense Added Successfully")
+                return True
             
-        except sqlite3.Error as e:
-            print(f"Database error adding expense: {e}")
-            self.conn.rollback()
-            return False
-    
+            except sqlite3.Error as e:
+                print(f"Database error adding expense: {e}")
+                conn.rollback()
+                return False
+
+    def _validate_bulk_row(self, row, category_ids, payment_method_ids, prevalidated=False):
+        """Check one bulk row and return (values, None) or (None, error message)"""
+        date = row.get("date") or ""
+        if prevalidated:
+            amount = row["amount"]
+        else:
+            try:
+                amount = float(row.get("amount"))
+            except (TypeError, ValueError):
+                return None, f"Invalid amount '{row.get('amount')}'. Must be a number."
+
+            if not self._validate_date(date):
+                return None, f"Invalid date format '{date}'. Must be in YYYY-MM-DD format."
+
+        category = row.get("category")
+        if category not in category_ids:
+            return None, f"Category '{category}' does not exist."
+
+        payment_method = row.get("payment_method")
+        if payment_method not in payment_method_ids:
+            return None, f"Payment Method '{payment_method}' does not exist."
+
+        description = row.get("description", "")
+        payment_detail_identifier = row.get("payment_detail_identifier") or ""
+        return {
+            "amount": amount,
+            "date": date,
+            "description": description,
+            "category_id": category_ids[category],
+            "payment_method_id": payment_method_ids[payment_method],
+            "payment_detail_identifier": payment_detail_identifier,
+            "tag": row.get("tag", ""),
+            "fingerprint": expense_fingerprint(self.current_user, date, amount, description, payment_detail_identifier),
+        }, None
+
+    def add_expenses_bulk(self, rows, batch_size=1000, prevalidated=False, skip_duplicates=False, duplicates_before_id=None):
+        """Add many expenses for the current user in a single transaction.
+
+        rows is an iterable of dicts keyed like the addexpense arguments
+        (amount, category, payment_method, date, description, tag and an
+        optional payment_detail_identifier). Category and payment method names
+        are resolved once per call, tags once per batch, and each batch is
+        written with executemany. Returns one result dict per input row, in
+        order: {"row", "status": "added", "expense_id"},
+        {"row", "status": "duplicate"} or {"row", "status": "error", "message"}.
+        If the transaction fails, every row is reported as an error and nothing
+        is written.
+
+        Pass prevalidated=True when the caller has already checked that every
+        amount is a float and every date is YYYY-MM-DD (the CSV importer does
+        this per chunk); category and payment method names are still resolved.
+
+        With skip_duplicates=True each batch's fingerprints are checked against
+        the Expense table in one query, and rows that match an expense with an
+        id below duplicates_before_id (default: the first id this call assigns)
+        are reported as duplicates instead of being written. Identical rows
+        within the same import are all kept, so importing a file and then
+        importing it again gives the same result however it was chunked.
+        """
+        batch_size = max(1, int(batch_size))
+        results = []
+
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            try:
+                # Take the write lock up front so the id range below stays ours
+                cursor.execute("BEGIN IMMEDIATE")
+                category_ids = self.dimensions.ids("category")
+                payment_method_ids = self.dimensions.ids("payment_method")
+                next_id = cursor.execute(EXPENSE_QUERIES["next_expense_id"]).fetchone()[0]
+                if skip_duplicates and duplicates_before_id is None:
+                    duplicates_before_id = next_id
+
+                batch = []
+                for index, row in enumerate(rows):
+                    values, error = self._validate_bulk_row(row, category_ids, payment_method_ids, prevalidated)
+                    if error:
+                        results.append({"row": index, "status": "error", "message": error})
+                        continue
+
+                    result = {"row": index, "status": "added"}
+                    results.append(result)
+                    batch.append((result, values))
+
+                    if len(batch) >= batch_size:
+                        next_id = self._insert_bulk_batch(cursor, batch, next_id, duplicates_before_id if skip_duplicates else None)
+                        batch = []
+
+                if batch:
+                    self._insert_bulk_batch(cursor, batch, next_id, duplicates_before_id if skip_duplicates else None)
+
+                conn.commit()
+                self.data_version.bump(self.current_user)
+                # Batches may have created tags
+                self.dimensions.invalidate("tag")
+                self.references.invalidate("tags")
+                return results
+
+            except sqlite3.Error as e:
+                print(f"Database error adding expenses: {e}")
+                conn.rollback()
+                return [
+                    {"row": result["row"], "status": "error", "message": result.get("message", str(e))}
+                    for result in results
+                ]
+
+    def _insert_bulk_batch(self, cursor, batch, next_id, duplicates_before_id=None):
+        """Write one validated batch with executemany and return the next free expense id"""
+        existing = set()
+        if duplicates_before_id is not None:
+            # One set-based lookup for the whole batch against the fingerprint index
+            fingerprints = json.dumps(list({values["fingerprint"] for _, values in batch}))
+            existing = {
+                row[0] for row in
+                cursor.execute(EXPENSE_QUERIES["existing_fingerprints"], (fingerprints, duplicates_before_id))
+            }
+
+        rows = []
+        for result, values in batch:
+            if values["fingerprint"] in existing:
+                result["status"] = "duplicate"
+                continue
+            values["expense_id"] = result["expense_id"] = next_id
+            next_id += 1
+            rows.append(values)
+        batch = rows
+        if not batch:
+            return next_id
+
+        # Create any tags this batch introduces, then resolve all of its tags at once
+        tags = {values["tag"] for values in batch}
+        cursor.executemany(EXPENSE_QUERIES["insert_tag_if_missing"], [(tag,) for tag in tags])
+        tag_ids = dict(cursor.execute(EXPENSE_QUERIES["tag_ids"]).fetchall())
+
+        cursor.executemany(
+            EXPENSE_QUERIES["insert_category_expense"],
+            [(v["category_id"], v["expense_id"]) for v in batch],
+        )
+        cursor.executemany(
+            EXPENSE_QUERIES["insert_tag_expense"],
+            [(tag_ids[v["tag"]], v["expense_id"]) for v in batch],
+        )
+        cursor.executemany(
+            EXPENSE_QUERIES["insert_payment_method_expense"],
+            [(v["payment_method_id"], v["expense_id"], v["payment_detail_identifier"]) for v in batch],
+        )
+        cursor.executemany(
+            EXPENSE_QUERIES["insert_user_expense"],
+            [(self.current_user, v["expense_id"]) for v in batch],
+        )
+        # Expense rows go in last: the expense_flat insert trigger then builds
+        # each flat row in one step instead of being updated once per link row
+        cursor.executemany(
+            EXPENSE_QUERIES["insert_expense_with_id"],
+            [(v["expense_id"], v["date"], v["amount"], v["description"], v["fingerprint"]) for v in batch],
+        )
+        return next_id
+
     def update_expense(self, expense_id, field, new_value):
-        self.cursor.execute(EXPENSE_QUERIES["check_expense_owner"], (expense_id, self.current_user))
-        exists = self.cursor.fetchone()[0] > 0  # True if count > 0, else False
-        if not exists:
-            print(f"Error: Expense ID {expense_id} doesn't exist or doesn't belong to the current user.")
-            return False
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute(EXPENSE_QUERIES["check_expense_owner"], (expense_id, self.current_user))
+            exists = cursor.fetchone()[0] > 0  # True if count > 0, else False
+            if not exists:
+                print(f"Error: Expense ID {expense_id} doesn't exist or doesn't belong to the current user.")
+                return False
 
-        field = field.lower()
+            field = field.lower()
+            new_tag = False
 
-        try:
-            if field == 'amount':
-                try:
-                    amount = float(new_value)
-                    self.cursor.execute(EXPENSE_QUERIES["update_expense_amount"], (amount, expense_id))
-                except ValueError:
-                    print(f"Error: Invalid amount '{new_value}'. Must be a number.")
-                    return False
-            elif field == 'description':
-                self.cursor.execute(EXPENSE_QUERIES["update_expense_description"], (new_value, expense_id))
-            elif field == 'date':
-                # Validate date format before updating
-                if not self._validate_date(new_value):
-                    print(f"Error: Invalid date format '{new_value}'. Must be in YYYY-MM-DD format.")
-                    return False
-                self.cursor.execute(EXPENSE_QUERIES["update_expense_date"], (new_value, expense_id))
-            elif field == 'category':
-                self.cursor.execute("SELECT category_id FROM Categories WHERE category_name = ?", (new_value,))
-                category = self.cursor.fetchone()
-                if category is None:
-                    print(f"Error: Category '{new_value}' does not exist.")
-                    return False
-                category_id = category[0]
-                self.cursor.execute(EXPENSE_QUERIES["update_category_expense"], (category_id, expense_id))
-            elif field == 'tag':
-                self.cursor.execute("SELECT tag_id FROM Tags WHERE tag_name = ?", (new_value,))
-                tag = self.cursor.fetchone()
-                if tag is None:
-                    self.cursor.execute(EXPENSE_QUERIES["insert_tag"], (new_value,))
-                    tag_id = self.cursor.lastrowid
+            try:
+                if field == 'amount':
+                    try:
+                        amount = float(new_value)
+                        cursor.execute(EXPENSE_QUERIES["update_expense_amount"], (amount, expense_id))
+                    except ValueError:
+                        print(f"Error: Invalid amount '{new_value}'. Must be a number.")
+                        return False
+                elif field == 'description':
+                    cursor.execute(EXPENSE_QUERIES["update_expense_description"], (new_value, expense_id))
+                elif field == 'date':
+                    # Validate date format before updating
+                    if not self._validate_date(new_value):
+                        print(f"Error: Invalid date format '{new_value}'. Must be in YYYY-MM-DD format.")
+                        return False
+                    cursor.execute(EXPENSE_QUERIES["update_expense_date"], (new_value, expense_id))
+                elif field == 'category':
+                    category_id = self.dimensions.get_id("category", new_value)
+                    if category_id is None:
+                        print(f"Error: Category '{new_value}' does not exist.")
+                        return False
+                    cursor.execute(EXPENSE_QUERIES["update_category_expense"], (category_id, expense_id))
+                elif field == 'tag':
+                    tag_id = self.dimensions.get_id("tag", new_value)
+                    if tag_id is None:
+                        cursor.execute(EXPENSE_QUERIES["insert_tag"], (new_value,))
+                        tag_id = cursor.lastrowid
+                        new_tag = True
+                    cursor.execute(EXPENSE_QUERIES["update_tag_expense"], (tag_id, expense_id))
+                elif field == 'payment_method':
+                    payment_method_id = self.dimensions.get_id("payment_method", new_value)
+                    if payment_method_id is None:
+                        print(f"Error: Payment Method '{new_value}' doesn't exist.")
+                        return False
+                    cursor.execute(EXPENSE_QUERIES["update_payment_method_expense"], (payment_method_id, expense_id))
                 else:
-                    tag_id = tag[0]
-                self.cursor.execute(EXPENSE_QUERIES["update_tag_expense"], (tag_id, expense_id))
-            elif field == 'payment_method':
-                self.cursor.execute("SELECT payment_method_id FROM Payment_Method WHERE payment_method_name = ?", (new_value,))
-                payment_method = self.cursor.fetchone()
-                if payment_method is None:
-                    print(f"Error: Payment Method '{new_value}' doesn't exist.")
+                    print(f"Error: Field '{field}' is not valid for updating.")
                     return False
-                payment_method_id = payment_method[0]
-                self.cursor.execute(EXPENSE_QUERIES["update_payment_method_expense"], (payment_method_id, expense_id))
-            else:
-                print(f"Error: Field '{field}' is not valid for updating.")
-                return False
 
-            self.conn.commit()
-            print(f"Expense ID {expense_id} updated successfully.")
-            return True
-        except sqlite3.Error as e:
-            print(f"Error: Failed to update expense. {e}")
-            return False
+                if field in ('amount', 'description', 'date'):
+                    # The trigger has already refreshed expense_flat, so rehash from there
+                    cursor.execute(EXPENSE_QUERIES["fingerprint_source"], (expense_id,))
+                    cursor.execute(EXPENSE_QUERIES["update_expense_fingerprint"],
+                                   (expense_fingerprint(*cursor.fetchone()), expense_id))
+
+                conn.commit()
+                self.data_version.bump(self.current_user, changed=[expense_id])
+                if new_tag:
+                    self.dimensions.invalidate("tag")
+                    self.references.invalidate("tags")
+                print(f"Expense ID {expense_id} updated successfully.")
+                return True
+            except sqlite3.Error as e:
+                print(f"Error: Failed to update expense. {e}")
+                return False
     
     def delete_expense(self, expense_id):
-        self.cursor.execute(EXPENSE_QUERIES["check_expense_owner"], (expense_id, self.current_user))
-        exists = self.cursor.fetchone()[0] > 0  # True if count > 0, else False
-        if not exists:
-            print(f"Error: Expense ID {expense_id} doesn't exist or doesn't belong to the current user.")
-            return False
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute(EXPENSE_QUERIES["check_expense_owner"], (expense_id, self.current_user))
+            exists = cursor.fetchone()[0] > 0  # True if count > 0, else False
+            if not exists:
+                print(f"Error: Expense ID {expense_id} doesn't exist or doesn't belong to the current user.")
+                return False
 
-        try:
-            # Delete from related tables
-            self.cursor.execute(EXPENSE_QUERIES["delete_category_expense"], (expense_id,))
-            self.cursor.execute(EXPENSE_QUERIES["delete_tag_expense"], (expense_id,))
-            self.cursor.execute(EXPENSE_QUERIES["delete_payment_method_expense"], (expense_id,))
-            self.cursor.execute(EXPENSE_QUERIES["delete_user_expense"], (expense_id,))
+            try:
+                # Delete from the main Expense table first: its expense_flat
+                # row and rollup group are then updated once, not per link
+                cursor.execute(EXPENSE_QUERIES["delete_expense"], (expense_id,))
             
-            # Delete from the main Expense table
-            self.cursor.execute(EXPENSE_QUERIES["delete_expense"], (expense_id,))
+                # Delete from related tables
+                cursor.execute(EXPENSE_QUERIES["delete_category_expense"], (expense_id,))
+                cursor.execute(EXPENSE_QUERIES["delete_tag_expense"], (expense_id,))
+                cursor.execute(EXPENSE_QUERIES["delete_payment_method_expense"], (expense_id,))
+                cursor.execute(EXPENSE_QUERIES["delete_user_expense"], (expense_id,))
             
-            self.conn.commit()
-            print(f"Expense ID {expense_id} deleted successfully.")
-            return True
-        except sqlite3.Error as e:
-            print(f"Error: Failed to delete expense. {e}")
-            return False
+                conn.commit()
+                self.data_version.bump(self.current_user, changed=[expense_id])
+                print(f"Expense ID {expense_id} deleted successfully.")
+                return True
+            except sqlite3.Error as e:
+                print(f"Error: Failed to delete expense. {e}")
+                return False
     
+    def get_expense_page(self, filters=None, user_role=None, page_size=50, after=None, before=None):
+        """Return one page of expenses, newest first, paged by (date, expense_id).
+
+        Pass the (date, expense_id) of the last row shown as after for the
+        next page, or of the first row shown as before for the previous one.
+        Returns {"rows", "has_next", "has_previous"}, or None on error. Rows
+        are (expense_id, date, amount, description, category, tag, payment
+        method). Each page reads page_size + 1 rows from the index, however
+        deep it is.
+        """
+        try:
+            # Regular users can only see their own expenses
+            username = self.current_user if user_role != "admin" else None
+            where, params = compile_filters(filters, username)
+            page_size = int(page_size)
+            if page_size <= 0:
+                raise ValueError("page size must be positive")
+
+            boundary = before or after
+            if boundary:
+                where += (" AND " if where else " WHERE ") + f"(e.date, e.expense_id) {'>' if before else '<'} (?, ?)"
+                params += [boundary[0], int(boundary[1])]
+            query = EXPENSE_QUERIES["expense_page_previous" if before else "expense_page"].format(filters=where)
+
+            # One extra row tells whether there is another page that way
+            rows = self.pool.fetchall(query, params + [page_size + 1])
+            more = len(rows) > page_size
+            rows = rows[:page_size]
+            if before:
+                rows.reverse()
+                return {"rows": rows, "has_next": True, "has_previous": more}
+            return {"rows": rows, "has_next": more, "has_previous": after is not None}
+
+        except ValueError as e:  # Includes FilterError
+            print(f"Error: {e}")
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+
+    def search_expenses(self, term="", user_role=None, limit=20):
+        """Return up to limit (expense_id, label) pairs for the expense picker.
+
+        An empty term gives the latest expenses. Otherwise the term is matched
+        as an expense id, a date prefix ("2024-03"), an amount prefix ("12.5"
+        matches 12.50 to 12.59) and a case-insensitive description prefix, in
+        that order. Every lookup is one index range with a LIMIT, so the cost
+        does not grow with the number of expenses. Returns [] on error.
+        """
+        username = self.current_user if user_role != "admin" else None
+        user_filter = "AND e.username = ?" if username else ""
+        user_params = [username] if username else []
+        term = (term or "").strip()
+        try:
+            if not term:
+                where = " WHERE e.username = ?" if username else ""
+                rows = self.pool.fetchall(EXPENSE_QUERIES["picker_recent"].format(filters=where), user_params + [limit])
+            else:
+                lookups = []
+                if term.lstrip("#").isdigit():
+                    lookups.append((EXPENSE_QUERIES["picker_by_id"].format(user_filter=user_filter),
+                                    [int(term.lstrip("#"))] + user_params))
+                if DATE_PREFIX.fullmatch(term):
+                    lookups.append((EXPENSE_QUERIES["picker_by_date"].format(user_filter=user_filter),
+                                    [*_prefix_range(term)] + user_params + [limit]))
+                amount = AMOUNT_PREFIX.fullmatch(term)
+                if amount:
+                    whole, decimals = amount.group(1), amount.group(2) or ""
+                    low = float(f"{whole}.{decimals or 0}")
+                    high = round(low + 10 ** -len(decimals), len(decimals))
+                    lookups.append((EXPENSE_QUERIES["picker_by_amount"], [low, high, username, username, limit]))
+                low, high = _prefix_range(term.lower())
+                lookups.append((EXPENSE_QUERIES["picker_by_description"], [low, high, username, username, limit]))
+
+                rows, seen = [], set()
+                for query, params in lookups:
+                    for row in self.pool.fetchall(query, params):
+                        if row[0] not in seen:
+                            seen.add(row[0])
+                            rows.append(row)
+                    if len(rows) >= limit:
+                        break
+                rows = rows[:limit]
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return []
+
+        options = []
+        for expense_id, date, amount, category, description, owner in rows:
+            label = f"ID: {expense_id} | {date} | ${amount:.2f} | {category or 'N/A'}"
+            if description:
+                label += f" | {description[:40]}"
+            if user_role == "admin":
+                label += f" | User: {owner}"
+            options.append((expense_id, label))
+        return options
+
+    def get_expense_totals(self, filters=None, user_role=None):
+        """Return (count, total amount) of the expenses matching filters, or None on error."""
+        try:
+            username = self.current_user if user_role != "admin" else None
+            where, params = compile_filters(filters, username)
+            return self.pool.fetchone(EXPENSE_QUERIES["expense_totals"].format(filters=where), params)
+        except FilterError as e:
+            print(f"Error: {e}")
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+
     def list_expenses(self, filters={}, user_role=None):
         try:
-            # Start with base query
-            query = BASE_EXPENSE_QUERY
-            params = []
-            
-            # Check if current user is admin or regular user
-            if user_role != "admin":
-                # Regular user can only see their own expenses
-                query += """
-                WHERE e.expense_id IN (
-                    SELECT expense_id FROM user_expense WHERE username = ?
-                )
-                """
-                params.append(self.current_user)
-            
-            # Define operation fields
-            op_fields = {"and": ["amount", "date"], 
-                        "or": ["category", "tag", "payment_method", "month"]}
-            
-            # Month name to number mapping
-            month_mapping = {
-                "january": "01", "february": "02", "march": "03", "april": "04",
-                "may": "05", "june": "06", "july": "07", "august": "08",
-                "september": "09", "october": "10", "november": "11", "december": "12"
-            }
-            
-            # Process filters
-            for field in filters:
-                if not filters[field]:  # Skip empty filter lists
-                    continue
-                    
-                if field in op_fields["and"]:
-                    op = "AND"
-                else:
-                    op = "OR"
-                    
-                # Special handling for month
-                if field == "month":
-                    connector = "WHERE" if "WHERE" not in query else "AND"
-                    query += f" {connector} ("
-                    first = True
-                    for constraint in filters[field]:
-                        op_type, value = constraint
-                        if not first:
-                            query += f" {op} "
-                        first = False
-                        
-                        # Handle month name conversion
-                        if isinstance(value, str) and value.lower() in month_mapping:
-                            month_num = month_mapping[value.lower()]
-                            query += f"strftime('%m', e.date) {op_type} ?"
-                            params.append(month_num)
-                        else:
-                            # Assume it's a number
-                            query += f"strftime('%m', e.date) {op_type} ?"
-                            # Ensure month is zero-padded
-                            if isinstance(value, str) and len(value) == 1:
-                                params.append(value.zfill(2))
-                            else:
-                                params.append(value)
-                    query += ")"
-                    continue
-                
-                # Additional validation for date field
-                if field == "date":
-                    connector = "WHERE" if "WHERE" not in query else "AND"
-                    query += f" {connector} ("
-                    first = True
-                    for constraint in filters[field]:
-                        op_type, value = constraint
-                        # Validate date format
-                        if not self._validate_date(value):
-                            print(f"Error: Invalid date format '{value}' in filter. Must be in YYYY-MM-DD format.")
-                            return False
-                        
-                        if not first:
-                            query += f" {op} "
-                        first = False
-                        query += f"e.date {op_type} ?"
-                        params.append(value)
-                    query += ")"
-                    continue
-                    
-                # Handle regular fields with mapping to actual DB columns
-                field_mapping = {
-                    "amount": "e.amount",
-                    "date": "e.date",
-                    "category": "c.category_name",
-                    "tag": "t.tag_name",
-                    "payment_method": "pm.payment_method_name"
-                }
-                
-                db_field = field_mapping.get(field, field)
-                connector = "WHERE" if "WHERE" not in query else "AND"
-                query += f" {connector} ("
-                first = True
-                for constraint in filters[field]:
-                    op_type, value = constraint
-                    if not first:
-                        query += f" {op} "
-                    first = False
-                    query += f"{db_field} {op_type} ?"
-                    params.append(value)
-                query += ")"
+            # Regular users can only see their own expenses
+            username = self.current_user if user_role != "admin" else None
+            where, params = compile_filters(filters, username)
+            query = BASE_EXPENSE_QUERY + where
             
             # Execute the query and display results
-            self.cursor.execute(query, params)
-            expenses = self.cursor.fetchall()
+            expenses = self.pool.fetchall(query, params)
             
             if not expenses:
                 print("No expenses found matching the criteria.")
@@ -292,7 +488,7 @@ class ExpenseManager:
                 print("-" * 95)
                 
                 for expense in expenses:
-                    expense_id, date, amount, description, category, tag, payment_method, username = expense
+                    expense_id, date, amount, description, category, tag, payment_method, username, _ = expense
                     # Handle NULL values from LEFT JOINs
                     category = category or "N/A"
                     tag = tag or "N/A"
@@ -306,7 +502,7 @@ class ExpenseManager:
                 print("-" * 95)
                 
                 for expense in expenses:
-                    expense_id, date, amount, description, category, tag, payment_method, _ = expense
+                    expense_id, date, amount, description, category, tag, payment_method, _, _ = expense
                     # Handle NULL values from LEFT JOINs
                     category = category or "N/A"
                     tag = tag or "N/A"
@@ -319,9 +515,11 @@ class ExpenseManager:
             print(f"Total: {len(expenses)} expense(s) found")
             return True
             
+        except FilterError as e:
+            print(f"Error: {e}")
+            return False
         except sqlite3.Error as e:
             print(f"Database error: {e}")
-            self.conn.rollback()
             return False
         except Exception as e:
             print(f"Error listing expenses: {e}")
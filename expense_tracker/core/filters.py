@@ -0,0 +1,121 @@
+from datetime import datetime
+from functools import lru_cache
+
+# Filter fields -> SQL expression on expense_flat e. The month expression
+# matches idx_expense_flat_month exactly, so SQLite can use that index.
+FILTER_COLUMNS = {
+    "amount": "e.amount",
+    "date": "e.date",
+    "category": "e.category_name",
+    "tag": "e.tag_name",
+    "payment_method": "e.payment_method_name",
+    "month": "substr(e.date, 6, 2)",
+}
+
+# Constraints on these fields must all hold; on the rest, any one of them
+AND_FIELDS = {"amount", "date"}
+
+OPERATORS = {"=", "!=", "<>", "<", "<=", ">", ">="}
+
+MONTHS = {
+    "january": "01", "february": "02", "march": "03", "april": "04",
+    "may": "05", "june": "06", "july": "07", "august": "08",
+    "september": "09", "october": "10", "november": "11", "december": "12"
+}
+MONTH_NAMES = {number: name for name, number in MONTHS.items()}
+
+
+class FilterError(ValueError):
+    """Raised for a filter on an unknown field, operator or value."""
+
+
+def _normalize_value(field, value):
+    if field == "amount":
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise FilterError(f"Invalid amount '{value}' in filter. Must be a number.")
+    if field == "date":
+        try:
+            # Dates are compared as text, so 2024-1-5 must become 2024-01-05
+            return datetime.strptime(str(value), "%Y-%m-%d").strftime("%Y-%m-%d")
+        except ValueError:
+            raise FilterError(f"Invalid date format '{value}' in filter. Must be in YYYY-MM-DD format.")
+    if field == "month":
+        text = str(value).strip().lower()
+        if text in MONTHS:
+            return MONTHS[text]
+        if text.isdigit() and 1 <= int(text) <= 12:
+            return text.zfill(2)
+        raise FilterError(f"Invalid month '{value}' in filter.")
+    if field in ("category", "payment_method"):
+        # Both are stored lower-cased
+        return str(value).strip().lower()
+    return str(value).strip()
+
+
+@lru_cache(maxsize=256)
+def _compile_shape(shape, by_user):
+    """Build the WHERE fragment for a filter shape: ((field, (op, ...)), ...)."""
+    clauses = ["e.username = ?"] if by_user else []
+    for field, operators in shape:
+        column = FILTER_COLUMNS[field]
+        if field not in AND_FIELDS and all(op == "=" for op in operators):
+            # Alternatives of one column become a single IN list
+            placeholders = ", ".join("?" * len(operators))
+            clauses.append(f"{column} = ?" if len(operators) == 1 else f"{column} IN ({placeholders})")
+            continue
+        joiner = " AND " if field in AND_FIELDS else " OR "
+        clauses.append("(" + joiner.join(f"{column} {op} ?" for op in operators) + ")")
+    return " WHERE " + " AND ".join(clauses) if clauses else ""
+
+
+def normalize_filters(filters):
+    """Validate a filter dict and return [(field, [(operator, value), ...]), ...].
+
+    Fields come out sorted, empty constraint lists are dropped and values are
+    normalized as described in compile_filters. Raises FilterError for an
+    unknown field, operator or value.
+    """
+    normalized = []
+    for field in sorted(filters or {}):
+        constraints = filters[field]
+        if not constraints:  # Skip empty filter lists
+            continue
+        if field not in FILTER_COLUMNS:
+            raise FilterError(f"Unknown filter field '{field}'.")
+
+        checked = []
+        for op, value in constraints:
+            op = op.strip()
+            if op not in OPERATORS:
+                raise FilterError(f"Invalid operator '{op}' in filter.")
+            checked.append((op, _normalize_value(field, value)))
+        normalized.append((field, checked))
+    return normalized
+
+
+def compile_filters(filters, username=None):
+    """Turn a filter dict into (WHERE fragment, params) for a query on expense_flat e.
+
+    filters maps a field to a list of (operator, value) constraints, as
+    produced by the CLI and the web pages. Fields and operators are checked
+    against a whitelist and values are normalized (month names become
+    "01".."12", dates are zero-padded, amounts become floats), so filters
+    with the same shape compile to the same SQL text and reuse the same
+    prepared statement.
+    With username, results are restricted to that user's expenses.
+    Raises FilterError for anything it cannot compile.
+    """
+    shape = []
+    params = [username] if username is not None else []
+    for field, constraints in normalize_filters(filters):
+        shape.append((field, tuple(op for op, _ in constraints)))
+        params.extend(value for _, value in constraints)
+
+    return _compile_shape(tuple(shape), username is not None), params
+
+
+def compile_cache_info():
+    """Return hit/miss counters for the compiled filter cache."""
+    return _compile_shape.cache_info()
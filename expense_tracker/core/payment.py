@@ -1,10 +1,15 @@
 import sqlite3
 from expense_tracker.database.sql_queries import PAYMENT_QUERIES
+from expense_tracker.database.dimension_cache import get_dimension_cache
+from expense_tracker.database.reference_cache import get_reference_cache
+from expense_tracker.database.result_cache import get_data_version
 
 class PaymentManager:
-    def __init__(self, cursor, conn):
-        self.conn = conn
-        self.cursor = cursor
+    def __init__(self, pool):
+        self.pool = pool
+        self.dimensions = get_dimension_cache(pool)
+        self.references = get_reference_cache(pool)
+        self.data_version = get_data_version(pool)
     
     def add_payment_method(self, payment_method_name):
         payment_method_name = payment_method_name.strip().lower()
@@ -13,18 +18,21 @@ class PaymentManager:
             print("Error : Payment Method cannot be empty.")
             return False
         
-        try:
-            self.cursor.execute(PAYMENT_QUERIES["add_payment_method"], (payment_method_name,))
-            self.conn.commit()
-            print(f"Payment method '{payment_method_name}' added successfully.")
-            return True
-        except sqlite3.IntegrityError:
-            print(f"Error: Payment method '{payment_method_name}' already exists.")
-            return False
+        with self.pool.writer() as conn:
+            try:
+                conn.execute(PAYMENT_QUERIES["add_payment_method"], (payment_method_name,))
+                conn.commit()
+                self.dimensions.invalidate("payment_method")
+                self.references.invalidate("payment_methods")
+                self.data_version.bump()
+                print(f"Payment method '{payment_method_name}' added successfully.")
+                return True
+            except sqlite3.IntegrityError:
+                print(f"Error: Payment method '{payment_method_name}' already exists.")
+                return False
     
     def list_payment_methods(self):
-        self.cursor.execute(PAYMENT_QUERIES["list_payment_methods"])
-        methods = self.cursor.fetchall()
+        methods = self.pool.fetchall(PAYMENT_QUERIES["list_payment_methods"])
 
         if not methods:
             print("No payment methods found.")
@@ -37,20 +45,26 @@ class PaymentManager:
 
     def delete_payment_method(self, payment_method_name):
         """Deletes a payment method and all related data."""
-        try:
-            # Check if payment method exists
-            self.cursor.execute("SELECT payment_method_id FROM Payment_Method WHERE payment_method_name = ?", (payment_method_name,))
-            if not self.cursor.fetchone():
-                print(f"Error: Payment method '{payment_method_name}' does not exist.")
-                return False
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            try:
+                # Check if payment method exists
+                cursor.execute("SELECT payment_method_id FROM Payment_Method WHERE payment_method_name = ?", (payment_method_name,))
+                if not cursor.fetchone():
+                    print(f"Error: Payment method '{payment_method_name}' does not exist.")
+                    return False
 
-            # Delete related entries
-            self.cursor.execute(PAYMENT_QUERIES["delete_payment_related"], (payment_method_name,))
-            # Delete the payment method
-            self.cursor.execute(PAYMENT_QUERIES["delete_payment_method"], (payment_method_name,))
-            self.conn.commit()
-            print(f"Payment method '{payment_method_name}' and related data deleted successfully.")
-            return True
-        except sqlite3.Error as e:
-            print(f"Error: Unable to delete payment method '{payment_method_name}'. {e}")
-            return False
\ No newline at end of file
+                # Delete related entries
+                cursor.execute(PAYMENT_QUERIES["delete_payment_related"], (payment_method_name,))
+                # Delete the payment method
+                cursor.execute(PAYMENT_QUERIES["delete_payment_method"], (payment_method_name,))
+                conn.commit()
+                self.dimensions.invalidate("payment_method")
+                self.references.invalidate("payment_methods")
+                # Expenses that used it lose their payment method
+                self.data_version.bump(changed=None)
+                print(f"Payment method '{payment_method_name}' and related data deleted successfully.")
+                return True
+            except sqlite3.Error as e:
+                print(f"Error: Unable to delete payment method '{payment_method_name}'. {e}")
+                return False
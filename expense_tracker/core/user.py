@@ -1,23 +1,25 @@
 import sqlite3
 from expense_tracker.database.sql_queries import USER_QUERIES
+from expense_tracker.database.reference_cache import get_reference_cache
+from expense_tracker.database.result_cache import get_data_version
+from expense_tracker.utils.logs import get_log_writer
 
 class UserManager:
-    def __init__(self, cursor, conn):
-        self.conn = conn
-        self.cursor = cursor
+    def __init__(self, pool):
+        self.pool = pool
+        self.data_version = get_data_version(pool)
+        self.references = get_reference_cache(pool)
         self.current_user = None
         self.privileges = None
     
     def authenticate(self, username, password):
-        self.cursor.execute(USER_QUERIES["get_user"], (username,))
-        user = self.cursor.fetchone()
+        user = self.pool.fetchone(USER_QUERIES["get_user"], (username,))
         
         if user and user[1] == password:
             self.current_user = username
             
             # Get user role
-            self.cursor.execute(USER_QUERIES["get_user_role"], (username,))
-            role = self.cursor.fetchone()
+            role = self.pool.fetchone(USER_QUERIES["get_user_role"], (username,))
             if role:
                 self.privileges = role[0]
             
@@ -50,24 +52,26 @@ class UserManager:
             if self.current_user is None or self.privileges != 'admin':
                 return False, "Only admins can assign non-user roles."
 
-        self.cursor.execute(USER_QUERIES["get_role_id"], (role,))
-        result = self.cursor.fetchone()
+        result = self.pool.fetchone(USER_QUERIES["get_role_id"], (role,))
         if result is None:
             return False, f"Role '{role}' does not exist."
         
         role_id = result[0]  # Extract role_id
 
-        try:
-            self.cursor.execute(USER_QUERIES["insert_user"], (username, password))
-            self.cursor.execute(USER_QUERIES["insert_user_role"], (username, role_id))
-            self.conn.commit()
-            return True, ""
-        except sqlite3.IntegrityError:
-            return False, f"Username '{username}' already exists."
+        with self.pool.writer() as conn:
+            try:
+                conn.execute(USER_QUERIES["insert_user"], (username, password))
+                conn.execute(USER_QUERIES["insert_user_role"], (username, role_id))
+                conn.commit()
+                self.data_version.bump()
+                self.references.invalidate("users")
+                return True, ""
+            except sqlite3.IntegrityError:
+                conn.rollback()
+                return False, f"Username '{username}' already exists."
     
     def list_users(self):
-        self.cursor.execute(USER_QUERIES["list_users"])
-        users = self.cursor.fetchall()
+        users = self.pool.fetchall(USER_QUERIES["list_users"])
         
         if not users:
             print("No users found!!")
@@ -109,40 +113,47 @@ class UserManager:
     
     def delete_user(self, username):
         """Deletes a user and all related data."""
-        try:
-            # Check if user exists
-            self.cursor.execute("SELECT username FROM User WHERE username = ?", (username,))
-            if not self.cursor.fetchone():
-                print(f"Error: User '{username}' does not exist.")
-                return False
+        # Queued log entries must land before the user's logs are deleted;
+        # flushing needs the writer connection, so do it before taking it
+        get_log_writer(self.pool).flush()
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            try:
+                # Check if user exists
+                cursor.execute("SELECT username FROM User WHERE username = ?", (username,))
+                if not cursor.fetchone():
+                    print(f"Error: User '{username}' does not exist.")
+                    return False
 
-            # Fetch all expenses of this user
-            self.cursor.execute("SELECT expense_id FROM User_Expense WHERE username = ?", (username,))
-            expense_ids = [row[0] for row in self.cursor.fetchall()]
-            # Delete related expense data
-            for eid in expense_ids:
-                self.cursor.execute("DELETE FROM Category_Expense WHERE expense_id = ?", (eid,))
-                self.cursor.execute("DELETE FROM Tag_Expense WHERE expense_id = ?", (eid,))
-                self.cursor.execute("DELETE FROM Payment_Method_Expense WHERE expense_id = ?", (eid,))
-                self.cursor.execute("DELETE FROM User_Expense WHERE expense_id = ?", (eid,))
-                self.cursor.execute("DELETE FROM Expense WHERE expense_id = ?", (eid,))
+                # Fetch all expenses of this user
+                cursor.execute("SELECT expense_id FROM User_Expense WHERE username = ?", (username,))
+                expense_ids = [row[0] for row in cursor.fetchall()]
+                # Delete related expense data
+                for eid in expense_ids:
+                    cursor.execute("DELETE FROM Category_Expense WHERE expense_id = ?", (eid,))
+                    cursor.execute("DELETE FROM Tag_Expense WHERE expense_id = ?", (eid,))
+                    cursor.execute("DELETE FROM Payment_Method_Expense WHERE expense_id = ?", (eid,))
+                    cursor.execute("DELETE FROM User_Expense WHERE expense_id = ?", (eid,))
+                    cursor.execute("DELETE FROM Expense WHERE expense_id = ?", (eid,))
 
-            # Delete user logs
-            self.cursor.execute(USER_QUERIES["delete_user_related"], (username,))
-            # Delete user roles
-            self.cursor.execute(USER_QUERIES["delete_user_role"], (username,))
-            # Delete the user
-            self.cursor.execute(USER_QUERIES["delete_user"], (username,))
+                # Delete user logs
+                cursor.execute(USER_QUERIES["delete_user_related"], (username,))
+                # Delete user roles
+                cursor.execute(USER_QUERIES["delete_user_role"], (username,))
+                # Delete the user
+                cursor.execute(USER_QUERIES["delete_user"], (username,))
 
-            self.conn.commit()
-            print(f"User '{username}' and all related data have been deleted successfully.")
+                conn.commit()
+                self.data_version.bump(changed=expense_ids)
+                self.references.invalidate("users")
+                print(f"User '{username}' and all related data have been deleted successfully.")
             
-            # If user deleted themselves, log them out
-            if self.current_user == username:
-                print("You have deleted your own account. Logging out...")
-                self.current_user = None
-                self.privileges = None
-            return True
-        except sqlite3.Error as e:
-            print(f"Error: Unable to delete user '{username}'. {e}")
-            return False
\ No newline at end of file
+                # If user deleted themselves, log them out
+                if self.current_user == username:
+                    print("You have deleted your own account. Logging out...")
+                    self.current_user = None
+                    self.privileges = None
+                return True
+            except sqlite3.Error as e:
+                print(f"Error: Unable to delete user '{username}'. {e}")
+                return False
\ No newline at end of file
@@ -1,10 +1,11 @@
 import os
-import sqlite3
 from pathlib import Path
 import tempfile
 import streamlit as st
 import sys
+import threading
 from expense_tracker.database.db_init import initialize_database
+from expense_tracker.database.pool import ConnectionPool, DEFAULT_STORAGE_PROFILE
 
 # Import cloud configuration if available
 try:
@@ -16,20 +17,28 @@ except ImportError:
         "demo_data_enabled": True,
         "connection_timeout": 30,
         "busy_timeout": 30000,
+        "pool_size": 8,
+        "pool_checkout_timeout": 30,
+        "storage_profile": DEFAULT_STORAGE_PROFILE,
     }
     
     def is_streamlit_cloud():
         return os.environ.get('STREAMLIT_SHARING') is not None or os.environ.get('STREAMLIT_CLOUD') is not None
 
-_conn = None
-_cursor = None
+_pool = None
+_pool_lock = threading.Lock()
 
-def get_connection():
-    """Return a singleton SQLite connection and cursor, initializing database once."""
-    global _conn, _cursor
-    if _conn and _cursor:
-        return _conn, _cursor
-        
+def get_pool():
+    """Return the process-wide connection pool, initializing the database once."""
+    global _pool
+    if _pool is not None:
+        return _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _create_pool()
+    return _pool
+
+def _create_pool():
     # Determine if we're running in Streamlit Cloud
     running_in_cloud = is_streamlit_cloud()
     
@@ -51,15 +60,20 @@ def get_connection():
     if hasattr(st, 'write'):
         st.session_state['db_path'] = str(db_path)
     
-    # Connect to database
-    # Get timeout values from config
+    # Get timeout, pool sizing and storage profile values from config
     timeout = DB_CONFIG.get("connection_timeout", 30)
     busy_timeout = DB_CONFIG.get("busy_timeout", 30000)
+    pool_size = DB_CONFIG.get("pool_size", 8)
+    checkout_timeout = DB_CONFIG.get("pool_checkout_timeout", 30)
+    storage_profile = DB_CONFIG.get("storage_profile", DEFAULT_STORAGE_PROFILE)
     
-    _conn = sqlite3.connect(str(db_path), check_same_thread=False, timeout=timeout)
-    _conn.execute(f"PRAGMA busy_timeout = {busy_timeout}")
-    
-    # Initialize database schema and defaults once
-    initialize_database(_conn)
-    _cursor = _conn.cursor()
-    return _conn, _cursor
\ No newline at end of file
+    # Initialize database schema and defaults once, on the writer connection
+    return ConnectionPool(
+        db_path,
+        max_readers=pool_size,
+        timeout=timeout,
+        busy_timeout=busy_timeout,
+        checkout_timeout=checkout_timeout,
+        initializer=initialize_database,
+        storage_profile=storage_profile,
+    )
@@ -1,9 +1,9 @@
 import sqlite3
+from expense_tracker.database.fingerprint import expense_fingerprint
+from expense_tracker.database.sql_queries import ROLLUP_QUERIES
 
-def initialize_database(db_connection):
-    """Initialize the database with all required tables."""
-    
-    cursor = db_connection.cursor()
+def _migration_001_initial_schema(cursor):
+    """Create the original tables and insert the default roles, admin user, categories and payment methods."""
     
     # Create User table
     cursor.execute('''
@@ -144,6 +144,492 @@ def initialize_database(db_connection):
     default_payment_methods = ['Cash', 'Credit Card', 'Debit Card', 'UPI', 'Net Banking', 'Check', 'Digital Wallet']
     for method in default_payment_methods:
         cursor.execute("INSERT OR IGNORE INTO Payment_Method (payment_method_name) VALUES (?)", (method.lower(),))
+
+
+def _migration_002_query_indexes(cursor):
+    """Add secondary indexes for the join and filter columns used by sql_queries.py."""
+
+    # The link tables are keyed on (dimension, expense_id), so joining them on
+    # expense_id needs an index that leads with expense_id. Including the other
+    # column makes each lookup covering.
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_category_expense_expense ON Category_Expense (expense_id, category_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tag_expense_expense ON Tag_Expense (expense_id, tag_id)")
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_payment_method_expense_expense
+        ON Payment_Method_Expense (expense_id, payment_method_id, payment_detail_identifier)
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_expense_expense ON User_Expense (expense_id, username)")
+
+    # Date range filters and top_expenses (date range, ordered by amount) are
+    # answered from this index without touching the table rows
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_expense_date_amount ON Expense (date, amount)")
+    # Amount ordering and amount filters
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_expense_amount ON Expense (amount)")
+
+    # Case-insensitive category lookups (REPORT_QUERIES["get_category_id"])
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_categories_lower_name ON Categories (LOWER(category_name))")
+
+    # Per-user and time-ordered log queries
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_username_timestamp ON Logs (username, timestamp)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON Logs (timestamp)")
+
+
+def _migration_003_expense_flat(cursor):
+    """Create the denormalized expense_flat read model and the triggers that maintain it.
+
+    expense_flat holds one row per expense with the category, tag, payment
+    method and owner already resolved, so reporting and listing read a single
+    table instead of joining seven. The application never writes to it; the
+    triggers below keep it in step with Expense, the link tables and the
+    dimension names.
+    """
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS expense_flat (
+            expense_id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL,
+            amount REAL NOT NULL,
+            description TEXT,
+            category_name TEXT,
+            tag_name TEXT,
+            payment_method_name TEXT,
+            payment_detail_identifier TEXT,
+            username TEXT
+        )
+    ''')
+
+    # Expense rows. The insert trigger also picks up any link rows that were
+    # written before the expense itself.
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_expense_flat_insert AFTER INSERT ON Expense
+        BEGIN
+            INSERT OR REPLACE INTO expense_flat (
+                expense_id, date, amount, description, category_name, tag_name,
+                payment_method_name, payment_detail_identifier, username
+            )
+            VALUES (
+                NEW.expense_id, NEW.date, NEW.amount, NEW.description,
+                (SELECT c.category_name FROM Category_Expense ce
+                 JOIN Categories c ON ce.category_id = c.category_id
+                 WHERE ce.expense_id = NEW.expense_id),
+                (SELECT t.tag_name FROM Tag_Expense te
+                 JOIN Tags t ON te.tag_id = t.tag_id
+                 WHERE te.expense_id = NEW.expense_id),
+                (SELECT pm.payment_method_name FROM Payment_Method_Expense pme
+                 JOIN Payment_Method pm ON pme.payment_method_id = pm.payment_method_id
+                 WHERE pme.expense_id = NEW.expense_id),
+                (SELECT pme.payment_detail_identifier FROM Payment_Method_Expense pme
+                 WHERE pme.expense_id = NEW.expense_id),
+                (SELECT ue.username FROM User_Expense ue WHERE ue.expense_id = NEW.expense_id)
+            );
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_expense_flat_update AFTER UPDATE OF date, amount, description ON Expense
+        BEGIN
+            UPDATE expense_flat
+            SET date = NEW.date, amount = NEW.amount, description = NEW.description
+            WHERE expense_id = NEW.expense_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_expense_flat_delete AFTER DELETE ON Expense
+        BEGIN
+            DELETE FROM expense_flat WHERE expense_id = OLD.expense_id;
+        END
+    ''')
+
+    # Link tables: each expense has at most one category, tag, payment method
+    # and owner, so the link row maps directly onto the flat columns
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_category_expense_flat_insert AFTER INSERT ON Category_Expense
+        BEGIN
+            UPDATE expense_flat
+            SET category_name = (SELECT category_name FROM Categories WHERE category_id = NEW.category_id)
+            WHERE expense_id = NEW.expense_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_category_expense_flat_update AFTER UPDATE ON Category_Expense
+        BEGIN
+            UPDATE expense_flat SET category_name = NULL WHERE expense_id = OLD.expense_id;
+            UPDATE expense_flat
+            SET category_name = (SELECT category_name FROM Categories WHERE category_id = NEW.category_id)
+            WHERE expense_id = NEW.expense_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_category_expense_flat_delete AFTER DELETE ON Category_Expense
+        BEGIN
+            UPDATE expense_flat SET category_name = NULL WHERE expense_id = OLD.expense_id;
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_tag_expense_flat_insert AFTER INSERT ON Tag_Expense
+        BEGIN
+            UPDATE expense_flat
+            SET tag_name = (SELECT tag_name FROM Tags WHERE tag_id = NEW.tag_id)
+            WHERE expense_id = NEW.expense_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_tag_expense_flat_update AFTER UPDATE ON Tag_Expense
+        BEGIN
+            UPDATE expense_flat SET tag_name = NULL WHERE expense_id = OLD.expense_id;
+            UPDATE expense_flat
+            SET tag_name = (SELECT tag_name FROM Tags WHERE tag_id = NEW.tag_id)
+            WHERE expense_id = NEW.expense_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_tag_expense_flat_delete AFTER DELETE ON Tag_Expense
+        BEGIN
+            UPDATE expense_flat SET tag_name = NULL WHERE expense_id = OLD.expense_id;
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_payment_method_expense_flat_insert AFTER INSERT ON Payment_Method_Expense
+        BEGIN
+            UPDATE expense_flat
+            SET payment_method_name = (SELECT payment_method_name FROM Payment_Method
+                                       WHERE payment_method_id = NEW.payment_method_id),
+                payment_detail_identifier = NEW.payment_detail_identifier
+            WHERE expense_id = NEW.expense_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_payment_method_expense_flat_update AFTER UPDATE ON Payment_Method_Expense
+        BEGIN
+            UPDATE expense_flat
+            SET payment_method_name = NULL, payment_detail_identifier = NULL
+            WHERE expense_id = OLD.expense_id;
+            UPDATE expense_flat
+            SET payment_method_name = (SELECT payment_method_name FROM Payment_Method
+                                       WHERE payment_method_id = NEW.payment_method_id),
+                payment_detail_identifier = NEW.payment_detail_identifier
+            WHERE expense_id = NEW.expense_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_payment_method_expense_flat_delete AFTER DELETE ON Payment_Method_Expense
+        BEGIN
+            UPDATE expense_flat
+            SET payment_method_name = NULL, payment_detail_identifier = NULL
+            WHERE expense_id = OLD.expense_id;
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_user_expense_flat_insert AFTER INSERT ON User_Expense
+        BEGIN
+            UPDATE expense_flat SET username = NEW.username WHERE expense_id = NEW.expense_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_user_expense_flat_update AFTER UPDATE ON User_Expense
+        BEGIN
+            UPDATE expense_flat SET username = NULL WHERE expense_id = OLD.expense_id;
+            UPDATE expense_flat SET username = NEW.username WHERE expense_id = NEW.expense_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_user_expense_flat_delete AFTER DELETE ON User_Expense
+        BEGIN
+            UPDATE expense_flat SET username = NULL WHERE expense_id = OLD.expense_id;
+        END
+    ''')
+
+    # Dimension renames and deletes. The names are unique, so they identify
+    # the affected flat rows directly.
+    for table, name_column in (("Categories", "category_name"), ("Tags", "tag_name"),
+                               ("Payment_Method", "payment_method_name")):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table.lower()}_flat_rename AFTER UPDATE OF {name_column} ON {table}
+            BEGIN
+                UPDATE expense_flat SET {name_column} = NEW.{name_column} WHERE {name_column} = OLD.{name_column};
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table.lower()}_flat_delete AFTER DELETE ON {table}
+            BEGIN
+                UPDATE expense_flat SET {name_column} = NULL WHERE {name_column} = OLD.{name_column};
+            END
+        ''')
+
+    # Backfill existing expenses from the normalized tables
+    cursor.execute('''
+        INSERT OR REPLACE INTO expense_flat (
+            expense_id, date, amount, description, category_name, tag_name,
+            payment_method_name, payment_detail_identifier, username
+        )
+        SELECT
+            e.expense_id, e.date, e.amount, e.description, c.category_name, t.tag_name,
+            pm.payment_method_name, pme.payment_detail_identifier, ue.username
+        FROM Expense e
+        LEFT JOIN Category_Expense ce ON e.expense_id = ce.expense_id
+        LEFT JOIN Categories c ON ce.category_id = c.category_id
+        LEFT JOIN Tag_Expense te ON e.expense_id = te.expense_id
+        LEFT JOIN Tags t ON te.tag_id = t.tag_id
+        LEFT JOIN Payment_Method_Expense pme ON e.expense_id = pme.expense_id
+        LEFT JOIN Payment_Method pm ON pme.payment_method_id = pm.payment_method_id
+        LEFT JOIN User_Expense ue ON e.expense_id = ue.expense_id
+    ''')
+
+    # Reporting indexes. expense_id is the rowid, so every index ends in it.
+    # Per-user listings, date ranges and top-N by amount
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_expense_flat_user_date ON expense_flat (username, date, amount)")
+    # Admin date ranges and top-N by amount
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_expense_flat_date ON expense_flat (date, amount)")
+    # Category totals, with or without a user filter
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_expense_flat_category ON expense_flat (category_name, username, amount)")
+    # Payment method reports
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_expense_flat_payment_method ON expense_flat (payment_method_name, username)")
+
+
+def _migration_004_expense_fingerprint(cursor):
+    """Add Expense.fingerprint, backfill it for existing rows and index it."""
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(Expense)")]
+    if "fingerprint" not in columns:
+        cursor.execute("ALTER TABLE Expense ADD COLUMN fingerprint TEXT")
+
+    # Hash in batches so large databases are never loaded into memory at once
+    reader = cursor.connection.cursor()
+    reader.execute('''
+        SELECT expense_id, username, date, amount, description, payment_detail_identifier
+        FROM expense_flat
+    ''')
+    while True:
+        rows = reader.fetchmany(5000)
+        if not rows:
+            break
+        cursor.executemany(
+            "UPDATE Expense SET fingerprint = ? WHERE expense_id = ?",
+            [(expense_fingerprint(*row[1:]), row[0]) for row in rows],
+        )
+
+    # Imports look fingerprints up a chunk at a time; expense_id rides along
+    # in the index as the rowid
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_expense_fingerprint ON Expense (fingerprint)")
+
+
+def _migration_005_month_index(cursor):
+    """Index the month of each expense for month filters (see core/filters.py)."""
+    # Filters on the month across years cannot become a date range; the
+    # query must spell the expression exactly as substr(e.date, 6, 2)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_expense_flat_month ON expense_flat (substr(date, 6, 2), username)")
+
+
+# Recomputes one expense_monthly group from expense_flat. {row} is OLD or NEW;
+# the username/date range lets SQLite use idx_expense_flat_user_date, so the
+# cost is bounded by one user's expenses in one month.
+_REFRESH_MONTHLY_GROUP = '''
+        DELETE FROM expense_monthly
+        WHERE username = COALESCE({row}.username, '')
+            AND month = substr({row}.date, 1, 7)
+            AND category_name = COALESCE({row}.category_name, '')
+            AND payment_method_name = COALESCE({row}.payment_method_name, '')
+            AND tag_name = COALESCE({row}.tag_name, '');
+        INSERT INTO expense_monthly (
+            username, month, category_name, payment_method_name, tag_name,
+            total, count, min_amount, max_amount
+        )
+        SELECT
+            COALESCE(username, ''), substr(date, 1, 7), COALESCE(category_name, ''),
+            COALESCE(payment_method_name, ''), COALESCE(tag_name, ''),
+            SUM(amount), COUNT(*), MIN(amount), MAX(amount)
+        FROM expense_flat
+        WHERE username IS {row}.username
+            AND date BETWEEN substr({row}.date, 1, 7) || '-01' AND substr({row}.date, 1, 7) || '-31'
+            AND COALESCE(category_name, '') = COALESCE({row}.category_name, '')
+            AND COALESCE(payment_method_name, '') = COALESCE({row}.payment_method_name, '')
+            AND COALESCE(tag_name, '') = COALESCE({row}.tag_name, '')
+        GROUP BY 1, 2, 3, 4, 5;
+'''
+
+
+def _migration_006_expense_monthly(cursor):
+    """Create the expense_monthly rollup, the triggers that maintain it and fill it.
+
+    expense_monthly holds sum, count, min and max per (username, YYYY-MM,
+    category, payment method, tag). Missing dimensions are stored as '' so
+    they can be part of the primary key. It is maintained from expense_flat,
+    so every write path (single adds, bulk imports, renames and deletes of
+    categories or payment methods) keeps it current: inserts add to their
+    group in place, while updates and deletes recompute the affected groups,
+    since a minimum or maximum cannot be subtracted.
+    """
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS expense_monthly (
+            username TEXT NOT NULL,
+            month TEXT NOT NULL,
+            category_name TEXT NOT NULL,
+            payment_method_name TEXT NOT NULL,
+            tag_name TEXT NOT NULL,
+            total REAL NOT NULL,
+            count INTEGER NOT NULL,
+            min_amount REAL NOT NULL,
+            max_amount REAL NOT NULL,
+            PRIMARY KEY (username, month, category_name, payment_method_name, tag_name)
+        ) WITHOUT ROWID
+    ''')
+    # Admin reports read every user for a range of months
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_expense_monthly_month ON expense_monthly (month)")
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_expense_monthly_insert
+        AFTER INSERT ON expense_flat
+        BEGIN
+            INSERT INTO expense_monthly (
+                username, month, category_name, payment_method_name, tag_name,
+                total, count, min_amount, max_amount
+            )
+            VALUES (
+                COALESCE(NEW.username, ''), substr(NEW.date, 1, 7), COALESCE(NEW.category_name, ''),
+                COALESCE(NEW.payment_method_name, ''), COALESCE(NEW.tag_name, ''),
+                NEW.amount, 1, NEW.amount, NEW.amount
+            )
+            ON CONFLICT (username, month, category_name, payment_method_name, tag_name) DO UPDATE SET
+                total = total + excluded.total,
+                count = count + 1,
+                min_amount = MIN(min_amount, excluded.min_amount),
+                max_amount = MAX(max_amount, excluded.max_amount);
+        END
+    ''')
+
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_expense_monthly_delete
+        AFTER DELETE ON expense_flat
+        BEGIN
+            {_REFRESH_MONTHLY_GROUP.format(row="OLD")}
+        END
+    ''')
+
+    rollup_columns = "date, amount, username, category_name, payment_method_name, tag_name"
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_expense_monthly_update_old
+        AFTER UPDATE OF {rollup_columns} ON expense_flat
+        BEGIN
+            {_REFRESH_MONTHLY_GROUP.format(row="OLD")}
+        END
+    ''')
+    # When the row moved to another group, that group changes too
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_expense_monthly_update_new
+        AFTER UPDATE OF {rollup_columns} ON expense_flat
+        WHEN NEW.username IS NOT OLD.username
+            OR substr(NEW.date, 1, 7) IS NOT substr(OLD.date, 1, 7)
+            OR COALESCE(NEW.category_name, '') IS NOT COALESCE(OLD.category_name, '')
+            OR COALESCE(NEW.payment_method_name, '') IS NOT COALESCE(OLD.payment_method_name, '')
+            OR COALESCE(NEW.tag_name, '') IS NOT COALESCE(OLD.tag_name, '')
+        BEGIN
+            {_REFRESH_MONTHLY_GROUP.format(row="NEW")}
+        END
+    ''')
+
+    cursor.execute(ROLLUP_QUERIES["clear"])
+    cursor.execute(ROLLUP_QUERIES["fill"])
+
+
+def _migration_007_category_indexes(cursor):
+    """Index expense_flat and expense_monthly by category for the Category Overview."""
+    # The latest expenses of a category are read straight off the index in
+    # date order instead of sorting every expense in the category
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_expense_flat_category_date ON expense_flat (category_name, date)")
+    # Admins see every user's rollup rows, so the primary key prefix does not help
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_expense_monthly_category ON expense_monthly (category_name, month)")
+
+
+
+def _migration_008_search_indexes(cursor):
+    """Index expense_flat for the expense picker's description and amount prefix searches."""
+    # NOCASE so a case-insensitive prefix is a single index range. username
+    # comes second: admins search everyone, and a user's search still filters
+    # on the index entry without reading the row.
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_expense_flat_description "
+        "ON expense_flat (description COLLATE NOCASE, username)"
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_expense_flat_amount ON expense_flat (amount, username)")
+
+def _migration_009_log_epoch(cursor):
+    """Add Logs.ts (epoch seconds), backfill it from timestamp and index it."""
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(Logs)")]
+    if "ts" not in columns:
+        cursor.execute("ALTER TABLE Logs ADD COLUMN ts INTEGER NOT NULL DEFAULT 0")
+
+    # timestamp is local wall-clock time, as written by LogManager.add_log;
+    # 'utc' converts it the way Python's datetime.timestamp() does. Values
+    # that do not parse keep ts = 0 and sort as the oldest entries.
+    cursor.execute('''
+        UPDATE Logs
+        SET ts = COALESCE(CAST(strftime('%s', timestamp, 'utc') AS INTEGER), 0)
+        WHERE ts = 0
+    ''')
+
+    # Date ranges and newest-first pages walk these by (ts, log_id); the
+    # TEXT timestamp indexes are no longer read and only slow down inserts
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_username_ts ON Logs (username, ts)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_ts ON Logs (ts)")
+    cursor.execute("DROP INDEX IF EXISTS idx_logs_username_timestamp")
+    cursor.execute("DROP INDEX IF EXISTS idx_logs_timestamp")
+
+# Ordered list of (version, description, migration). Each migration runs in its
+# own transaction and bumps PRAGMA user_version, so existing databases pick up
+# only the steps they are missing. Append new migrations; never edit old ones.
+MIGRATIONS = [
+    (1, "initial schema and default data", _migration_001_initial_schema),
+    (2, "indexes for join and filter columns", _migration_002_query_indexes),
+    (3, "expense_flat read model", _migration_003_expense_flat),
+    (4, "expense fingerprints for duplicate detection", _migration_004_expense_fingerprint),
+    (5, "month index for expense filters", _migration_005_month_index),
+    (6, "expense_monthly rollup", _migration_006_expense_monthly),
+    (7, "category indexes for category statistics", _migration_007_category_indexes),
+    (8, "search indexes for the expense picker", _migration_008_search_indexes),
+    (9, "epoch timestamps and indexes for the audit log", _migration_009_log_epoch),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(db_connection):
+    """Return the schema version recorded in the database header."""
+    return db_connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(db_connection, target_version=SCHEMA_VERSION):
+    """Apply every pending migration up to target_version, one transaction each."""
+    for version, description, migration in MIGRATIONS:
+        if version > target_version:
+            break
+        if get_schema_version(db_connection) >= version:
+            continue
+
+        # Take the write lock first and re-check, in case another process
+        # migrated the database while we were waiting.
+        db_connection.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(db_connection) >= version:
+                db_connection.rollback()
+                continue
+            migration(db_connection.cursor())
+            db_connection.execute(f"PRAGMA user_version = {int(version)}")
+            db_connection.commit()
+        except Exception:
+            db_connection.rollback()
+            raise
+        print(f"Applied database migration {version}: {description}")
+    return get_schema_version(db_connection)
+
+
+def initialize_database(db_connection):
+    """Initialize the database, migrating it to the latest schema version.
     
-    # Commit the changes
-    db_connection.commit()
\ No newline at end of file
+    A database that is already current costs a single PRAGMA read: no DDL,
+    no seeding and no commit.
+    """
+    if get_schema_version(db_connection) >= SCHEMA_VERSION:
+        return SCHEMA_VERSION
+    return apply_migrations(db_connection)
@@ -0,0 +1,122 @@
+import threading
+import weakref
+
+# Dimension tables that are cached: dimension -> (table, id column, name column)
+DIMENSIONS = {
+    "category": ("Categories", "category_id", "category_name"),
+    "payment_method": ("Payment_Method", "payment_method_id", "payment_method_name"),
+    "tag": ("Tags", "tag_id", "tag_name"),
+}
+
+
+class DimensionCache:
+    """In-process name <-> id maps for the category, payment method and tag tables.
+
+    Each dimension is loaded whole on first use and kept until it is
+    invalidated. The managers that add or delete categories, payment methods
+    and tags call invalidate() after committing, so a lookup never returns an
+    id for a row that this process has removed. A name that is not in the map
+    is looked up once more in the database before being reported as missing,
+    which picks up rows added by other processes.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._ids = {}
+        self._names = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    def _load(self, dimension):
+        table, id_column, name_column = DIMENSIONS[dimension]
+        generation = self._generation
+        rows = self.pool.fetchall(f"SELECT {name_column}, {id_column} FROM {table}")
+        with self._lock:
+            # An invalidation while we were reading makes these rows stale
+            if generation != self._generation:
+                return
+            self._ids[dimension] = dict(rows)
+            self._names[dimension] = {row_id: name for name, row_id in rows}
+            self.loads += 1
+
+    def _ensure_loaded(self, dimension):
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension '{dimension}'")
+        if dimension not in self._ids:
+            self._load(dimension)
+
+    def get_id(self, dimension, name):
+        """Return the id for a name, or None if it does not exist."""
+        self._ensure_loaded(dimension)
+        ids = self._ids.get(dimension, {})
+        if name in ids:
+            self.hits += 1
+            return ids[name]
+
+        self.misses += 1
+        table, id_column, name_column = DIMENSIONS[dimension]
+        row = self.pool.fetchone(f"SELECT {id_column} FROM {table} WHERE {name_column} = ?", (name,))
+        if row is None:
+            return None
+        with self._lock:
+            self._ids.setdefault(dimension, {})[name] = row[0]
+            self._names.setdefault(dimension, {})[row[0]] = name
+        return row[0]
+
+    def get_name(self, dimension, dimension_id):
+        """Return the name for an id, or None if it does not exist."""
+        self._ensure_loaded(dimension)
+        names = self._names.get(dimension, {})
+        if dimension_id in names:
+            self.hits += 1
+            return names[dimension_id]
+
+        self.misses += 1
+        table, id_column, name_column = DIMENSIONS[dimension]
+        row = self.pool.fetchone(f"SELECT {name_column} FROM {table} WHERE {id_column} = ?", (dimension_id,))
+        if row is None:
+            return None
+        with self._lock:
+            self._names.setdefault(dimension, {})[dimension_id] = row[0]
+            self._ids.setdefault(dimension, {})[row[0]] = dimension_id
+        return row[0]
+
+    def ids(self, dimension):
+        """Return a copy of the whole name -> id map for a dimension."""
+        self._ensure_loaded(dimension)
+        self.hits += 1
+        return dict(self._ids.get(dimension, {}))
+
+    def invalidate(self, dimension=None):
+        """Drop one dimension, or all of them, so the next lookup reloads it."""
+        with self._lock:
+            self._generation += 1
+            for name in ([dimension] if dimension else list(DIMENSIONS)):
+                self._ids.pop(name, None)
+                self._names.pop(name, None)
+
+    def stats(self):
+        """Return hit/miss counters for diagnostics."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_caches = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def get_dimension_cache(pool):
+    """Return the process-wide dimension cache for a connection pool."""
+    with _caches_lock:
+        cache = _caches.get(pool)
+        if cache is None:
+            cache = _caches[pool] = DimensionCache(pool)
+        return cache
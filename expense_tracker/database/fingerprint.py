@@ -0,0 +1,26 @@
+import hashlib
+import re
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_description(description):
+    """Lower-case a description and collapse runs of whitespace."""
+    return _WHITESPACE.sub(" ", (description or "").strip().lower())
+
+
+def expense_fingerprint(username, date, amount, description, payment_detail_identifier):
+    """Return the content hash used to recognise an expense that was already imported.
+
+    The hash covers the owner, date, amount to the cent, normalized
+    description and payment detail, so re-importing the same statement
+    produces the same fingerprints.
+    """
+    key = "|".join((
+        username or "",
+        date or "",
+        f"{float(amount):.2f}",
+        normalize_description(description),
+        (payment_detail_identifier or "").strip(),
+    ))
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
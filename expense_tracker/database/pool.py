@@ -0,0 +1,211 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Storage profile applied to every pooled connection. WAL lets read-only
+# reporting connections keep reading while the single writer commits.
+DEFAULT_STORAGE_PROFILE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -20000,  # Negative values are KiB, so roughly 20 MB per connection
+    "mmap_size": 268435456,  # 256 MB of memory-mapped I/O
+    "temp_store": "MEMORY",
+    "read_only_readers": True,
+}
+
+_PRAGMA_CHOICES = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+}
+_PRAGMA_INTEGERS = ("cache_size", "mmap_size")
+
+
+def apply_storage_profile(conn, profile, writer=False):
+    """Apply the PRAGMAs from a storage profile to an open connection.
+
+    The journal mode is stored in the database file, so it is only set from
+    the writer; the remaining settings are per connection.
+    """
+    for name, choices in _PRAGMA_CHOICES.items():
+        value = profile.get(name)
+        if value is None or (name == "journal_mode" and not writer):
+            continue
+        value = str(value).upper()
+        if value not in choices:
+            raise ValueError(f"Invalid {name} '{value}' in storage profile")
+        conn.execute(f"PRAGMA {name} = {value}")
+
+    for name in _PRAGMA_INTEGERS:
+        value = profile.get(name)
+        if value is not None:
+            conn.execute(f"PRAGMA {name} = {int(value)}")
+
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    """Raised when no reader connection becomes available in time."""
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections with one writer and several readers.
+
+    SQLite allows a single writer at a time, so all writes go through one
+    connection guarded by a re-entrant lock. Reads borrow a connection from a
+    bounded queue so concurrent sessions no longer share a cursor. A thread
+    that already holds a reader gets the same one back on nested checkouts.
+    With a WAL storage profile the readers are opened with ``mode=ro`` URIs
+    and run in parallel with the writer.
+    """
+
+    def __init__(self, db_path, max_readers=8, timeout=30, busy_timeout=30000,
+                 checkout_timeout=30, initializer=None, storage_profile=None):
+        self.db_path = str(db_path)
+        self.storage_profile = dict(DEFAULT_STORAGE_PROFILE if storage_profile is None else storage_profile)
+        self.max_readers = max_readers
+        self.timeout = timeout
+        self.busy_timeout = busy_timeout
+        self.checkout_timeout = checkout_timeout
+
+        self._write_lock = threading.RLock()
+        self._readers = queue.LifoQueue(maxsize=max_readers)
+        self._created_readers = 0
+        self._create_lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+        self._writer = self._connect(writer=True)
+        if initializer:
+            initializer(self._writer)
+
+    def _connect(self, writer=False):
+        """Open a connection configured for use from any thread."""
+        if not writer and self.storage_profile.get("read_only_readers"):
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False, timeout=self.timeout)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=self.timeout)
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        apply_storage_profile(conn, self.storage_profile, writer=writer)
+        return conn
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _replace(self, conn, writer=False):
+        """Close a broken connection and open a fresh one in its place."""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        return self._connect(writer=writer)
+
+    def _checkout_reader(self):
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._create_lock:
+            if self._created_readers < self.max_readers:
+                self._created_readers += 1
+                try:
+                    return self._connect()
+                except sqlite3.Error:
+                    self._created_readers -= 1
+                    raise
+
+        try:
+            return self._readers.get(timeout=self.checkout_timeout)
+        except queue.Empty:
+            raise PoolTimeoutError(
+                f"No reader connection available after {self.checkout_timeout}s "
+                f"(pool size {self.max_readers})"
+            )
+
+    @contextmanager
+    def reader(self):
+        """Borrow a read connection for the duration of the block."""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+
+        held = getattr(self._local, "reader", None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._checkout_reader()
+        if not self._is_healthy(conn):
+            conn = self._replace(conn)
+
+        self._local.reader = conn
+        self._local.depth = 1
+        try:
+            yield conn
+        finally:
+            self._local.reader = None
+            self._local.depth = 0
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    @contextmanager
+    def writer(self):
+        """Borrow the single write connection, serialising all writers."""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+
+        with self._write_lock:
+            depth = getattr(self._local, "writer_depth", 0)
+            if depth == 0 and not self._is_healthy(self._writer):
+                self._writer = self._replace(self._writer, writer=True)
+            conn = self._writer
+            self._local.writer_depth = depth + 1
+            try:
+                yield conn
+            finally:
+                self._local.writer_depth = depth
+                # Never hand an open transaction to the next borrower
+                if depth == 0 and conn.in_transaction:
+                    conn.rollback()
+
+    def fetchone(self, query, params=()):
+        """Run a single read query on a borrowed connection and return one row."""
+        with self.reader() as conn:
+            return conn.execute(query, params).fetchone()
+
+    def fetchall(self, query, params=()):
+        """Run a single read query on a borrowed connection and return all rows."""
+        with self.reader() as conn:
+            return conn.execute(query, params).fetchall()
+
+    def stats(self):
+        """Return a snapshot of pool usage for diagnostics."""
+        with self._write_lock:
+            journal_mode = self._writer.execute("PRAGMA journal_mode").fetchone()[0]
+        return {
+            "max_readers": self.max_readers,
+            "created_readers": self._created_readers,
+            "idle_readers": self._readers.qsize(),
+            "journal_mode": journal_mode,
+        }
+
+    def close(self):
+        """Close every idle connection and the writer."""
+        self._closed = True
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._write_lock:
+            self._writer.close()
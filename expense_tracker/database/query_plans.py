@@ -0,0 +1,124 @@
+"""EXPLAIN QUERY PLAN check for the queries in sql_queries.py.
+
+Run with ``python -m expense_tracker.database.query_plans``. Every query in
+REPORT_QUERIES, EXPENSE_QUERIES and LOG_QUERIES is planned against a freshly
+migrated in-memory database, and any full table scan that is not expected is
+reported. Exits with status 1 if a query does not use the indexes.
+"""
+import sqlite3
+import sys
+
+from expense_tracker.database.db_init import initialize_database
+from expense_tracker.database.sql_queries import EXPENSE_QUERIES, LOG_QUERIES, REPORT_QUERIES
+
+QUERY_GROUPS = {
+    "REPORT_QUERIES": REPORT_QUERIES,
+    "EXPENSE_QUERIES": EXPENSE_QUERIES,
+    "LOG_QUERIES": LOG_QUERIES,
+}
+
+# Fragments that are appended to other queries rather than run on their own
+SKIP_QUERIES = set()
+
+# Values substituted for {user_filter}: the admin variant and the per-user variant
+USER_FILTERS = ("", "AND e.username = ?")
+
+# Values substituted for {filters}: no filter, and the per-user WHERE that
+# core/filters.py always starts with
+FILTER_FRAGMENTS = ("", "WHERE e.username = ?")
+
+# Queries that deliberately read the whole driving table: unfiltered listings
+# whose WHERE clause is appended by the caller, and the analytics queries,
+# which an admin runs over every expense. The joins inside them must still
+# use indexes.
+FULL_SCAN_ALLOWED = {
+    "base_expense_query": ("e",),
+    "expense_breakdowns": ("e",),
+    "amount_histogram": ("e",),
+    # The admin dashboard reads the whole monthly rollup, which is sized by
+    # groups rather than expenses
+    "dashboard_breakdowns": ("e",),
+}
+
+# Small lookup tables that are loaded whole (name -> id maps), plus SQLite's
+# own bookkeeping. Scanning them is cheaper than any index.
+SMALL_TABLES = {"Categories", "Tags", "Payment_Method", "Role", "sqlite_sequence"}
+
+# Table-valued functions over a bound parameter (e.g. a JSON list of keys);
+# scanning them walks the parameter, not stored rows
+PARAMETER_TABLES = {"json_each"}
+
+
+def explain(conn, query):
+    """Return the EXPLAIN QUERY PLAN detail lines for a query."""
+    params = [None] * query.count("?")
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+
+
+def _query_variants(name, query):
+    if "{user_filter}" in query:
+        for user_filter in USER_FILTERS:
+            label = f"{name} (per-user)" if user_filter else f"{name} (admin)"
+            yield label, query.format(user_filter=user_filter)
+    elif "{filters}" in query:
+        for fragment in FILTER_FRAGMENTS:
+            label = f"{name} (per-user)" if fragment else f"{name} (admin)"
+            yield label, query.format(filters=fragment)
+    else:
+        yield name, query
+
+
+def _plan_problems(name, plan):
+    # CTEs and subqueries (including the ones SQLite adds for window
+    # functions) are built by an earlier plan step; scanning them reads rows
+    # that step produced, not a stored table
+    derived = {detail.split()[1] for detail in plan if detail.startswith(("CO-ROUTINE ", "MATERIALIZE "))}
+    problems = []
+    for detail in plan:
+        if not detail.startswith("SCAN ") or "USING" in detail or detail == "SCAN CONSTANT ROW":
+            continue
+        table = detail.split()[1]
+        if table in FULL_SCAN_ALLOWED.get(name, ()) or table in SMALL_TABLES or table in PARAMETER_TABLES:
+            continue
+        if table in derived:
+            continue
+        problems.append(detail)
+    return problems
+
+
+def check_query_plans(conn, verbose=False):
+    """Plan every query and return a list of (query name, plan line) problems."""
+    problems = []
+    for group, queries in QUERY_GROUPS.items():
+        for name, query in queries.items():
+            if name in SKIP_QUERIES or query.lstrip().upper().startswith("INSERT"):
+                continue
+            for label, sql in _query_variants(name, query):
+                plan = explain(conn, sql)
+                found = _plan_problems(name, plan)
+                problems.extend((label, detail) for detail in found)
+                if verbose:
+                    status = "FULL SCAN" if found else "ok"
+                    print(f"{group}[{label}]: {status}")
+                    for detail in plan:
+                        print(f"    {detail}")
+    return problems
+
+
+def main():
+    conn = sqlite3.connect(":memory:")
+    initialize_database(conn)
+    problems = check_query_plans(conn, verbose=True)
+    conn.close()
+
+    if problems:
+        print(f"\n{len(problems)} unindexed scan(s):")
+        for label, detail in problems:
+            print(f"  {label}: {detail}")
+        return 1
+    print("\nAll queries use indexes.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
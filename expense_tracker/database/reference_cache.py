@@ -0,0 +1,116 @@
+import sys
+import threading
+import time
+import weakref
+from expense_tracker.database.sql_queries import CATEGORY_QUERIES, EXPENSE_QUERIES, PAYMENT_QUERIES, USER_QUERIES
+
+# Reference lists shared by every session: name -> query
+REFERENCE_LISTS = {
+    "categories": CATEGORY_QUERIES["list_categories"],
+    "payment_methods": PAYMENT_QUERIES["list_payment_methods"],
+    "tags": EXPENSE_QUERIES["list_tags"],
+    "users": USER_QUERIES["list_users"],
+}
+
+
+def _estimate_size(rows):
+    """Approximate the memory held by a list of rows, in bytes."""
+    return sys.getsizeof(rows) + sum(
+        sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) for row in rows
+    )
+
+
+class ReferenceCache:
+    """Process-wide copies of the category, payment method, tag and user lists.
+
+    Every page that offers a selectbox of these used to query them on each
+    rerun of each session; with one cache per pool, all sessions share a
+    single copy. The managers that add or delete rows call invalidate()
+    after committing. Entries also expire after ttl seconds, which picks up
+    writes made by other processes (the CLI, a second server). A list larger
+    than max_bytes is returned without being kept, and the least recently
+    loaded lists are dropped when the total passes max_bytes.
+    """
+
+    def __init__(self, pool, ttl=300, max_bytes=4 * 1024 * 1024):
+        self.pool = pool
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = {}  # name -> (rows, loaded at, size)
+        self._generation = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, name):
+        """Return the rows of a reference list, in the order its query sorts them."""
+        if name not in REFERENCE_LISTS:
+            raise ValueError(f"Unknown reference list '{name}'")
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl:
+                self.hits += 1
+                return list(entry[0])
+            self.misses += 1
+            generation = self._generation
+
+        rows = self.pool.fetchall(REFERENCE_LISTS[name])
+        self._store(name, rows, generation)
+        return list(rows)
+
+    def values(self, name):
+        """Return the first column of a reference list, e.g. the category names."""
+        return [row[0] for row in self.get(name)]
+
+    def _store(self, name, rows, generation):
+        size = _estimate_size(rows)
+        with self._lock:
+            # An invalidation while we were reading makes these rows stale
+            if generation != self._generation or size > self.max_bytes:
+                return
+            previous = self._entries.pop(name, None)
+            if previous is not None:
+                self.bytes -= previous[2]
+            self._entries[name] = (rows, time.monotonic(), size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                oldest = min(self._entries, key=lambda key: self._entries[key][1])
+                self.bytes -= self._entries.pop(oldest)[2]
+                self.evictions += 1
+
+    def invalidate(self, *names):
+        """Drop the named lists, or all of them, so the next read reloads them."""
+        with self._lock:
+            self._generation += 1
+            for name in (names or list(self._entries)):
+                entry = self._entries.pop(name, None)
+                if entry is not None:
+                    self.bytes -= entry[2]
+
+    def stats(self):
+        """Return hit/miss, eviction and size counters for diagnostics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_caches = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def get_reference_cache(pool):
+    """Return the process-wide reference list cache for a connection pool."""
+    with _caches_lock:
+        cache = _caches.get(pool)
+        if cache is None:
+            cache = _caches[pool] = ReferenceCache(pool)
+        return cache
@@ -0,0 +1,195 @@
+import copy
+import pickle
+import sys
+import threading
+import weakref
+from collections import OrderedDict, deque
+
+# Entries kept in the DataVersion change log; a reader further behind reloads
+CHANGE_LOG_SIZE = 1024
+
+
+class DataVersion:
+    """Generation counters that change whenever data a report depends on is written.
+
+    A write to one user's expenses bumps that user's counter. A write that
+    can change every user's reports (categories, payment methods, users)
+    bumps the shared counter. Admin reports cover all users, so they follow
+    a counter that every write bumps. Counters only see writes made through
+    this process's managers.
+
+    Writes that modify or delete existing expenses are also kept in a short
+    change log, so in-memory copies of expense_flat can patch those rows
+    instead of reloading; inserts only need the highest expense_id seen.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._shared = 0
+        self._all = 0
+        self._users = {}
+        self._change_sequence = 0
+        self._changes = deque(maxlen=CHANGE_LOG_SIZE)  # (sequence, expense ids or None)
+
+    def bump(self, username=None, changed=()):
+        """Record a write to one user's expenses, or to shared data when username is None.
+
+        changed lists the existing expenses the write updated or deleted;
+        pass None when it may have changed any of them.
+        """
+        with self._lock:
+            self._all += 1
+            if username is None:
+                self._shared += 1
+            else:
+                self._users[username] = self._users.get(username, 0) + 1
+            if changed is None or changed:
+                self._change_sequence += 1
+                self._changes.append((self._change_sequence, None if changed is None else tuple(changed)))
+
+    def changes_since(self, sequence):
+        """Return (latest sequence, ids of expenses changed after sequence).
+
+        The ids are None when they are not known: a write changed arbitrary
+        rows, or the log no longer reaches back to sequence.
+        """
+        with self._lock:
+            if sequence == self._change_sequence:
+                return sequence, set()
+            if not self._changes or self._changes[0][0] > sequence + 1:
+                return self._change_sequence, None
+            ids = set()
+            for change_sequence, changed in self._changes:
+                if change_sequence <= sequence:
+                    continue
+                if changed is None:
+                    return self._change_sequence, None
+                ids.update(changed)
+            return self._change_sequence, ids
+
+    def token(self, username=None):
+        """Return a value that changes whenever data visible to username changes.
+
+        Pass None for an admin, who sees every user's data.
+        """
+        with self._lock:
+            if username is None:
+                return ("all", self._all)
+            return (self._shared, self._users.get(username, 0))
+
+
+def freeze(value):
+    """Turn dicts, lists and sets inside value into hashable tuples for use in a cache key."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(freeze(item) for item in value))
+    return value
+
+
+def _estimate_size(value):
+    """Approximate the memory held by a cached value, in bytes."""
+    if hasattr(value, "memory_usage"):  # pandas DataFrame
+        return int(value.memory_usage(deep=True).sum())
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class ResultCache:
+    """LRU cache of report results bounded by entry count and approximate size.
+
+    Keys must include a DataVersion token so that writes make old entries
+    unreachable; those entries then age out through LRU eviction. Callers
+    always get a deep copy, so pages that add columns to a returned
+    DataFrame cannot change the cached one.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, size)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss."""
+        try:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(entry[0])
+                self.misses += 1
+        except TypeError:
+            # Unhashable arguments: nothing to key on, so just run it
+            return compute()
+
+        value = compute()
+        if value is not None:  # Report methods return None on errors
+            self._store(key, value)
+        return copy.deepcopy(value)
+
+    def _store(self, key, value):
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """Return hit/miss, eviction and size counters for diagnostics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_data_versions = weakref.WeakKeyDictionary()
+_result_caches = weakref.WeakKeyDictionary()
+_registry_lock = threading.Lock()
+
+
+def get_data_version(pool):
+    """Return the process-wide data version counters for a connection pool."""
+    with _registry_lock:
+        version = _data_versions.get(pool)
+        if version is None:
+            version = _data_versions[pool] = DataVersion()
+        return version
+
+
+def get_result_cache(pool):
+    """Return the process-wide report result cache for a connection pool."""
+    with _registry_lock:
+        cache = _result_caches.get(pool)
+        if cache is None:
+            cache = _result_caches[pool] = ResultCache()
+        return cache
@@ -0,0 +1,56 @@
+"""Rebuild the expense_monthly rollup from expense_flat.
+
+The rollup is kept current by triggers (see db_init.py), so this is only
+needed to repair it, e.g. after editing the database by hand. Run with
+``python -m expense_tracker.database.rollup [database path]``; the path
+defaults to $SQLITE_PATH, then to expense_tracker.db in the temp directory
+like the app.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from expense_tracker.database.db_init import initialize_database
+from expense_tracker.database.pool import ConnectionPool
+from expense_tracker.database.sql_queries import ROLLUP_QUERIES
+
+
+def rebuild_monthly_rollup(pool):
+    """Recompute every expense_monthly row in one transaction and return the group count."""
+    with pool.writer() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(ROLLUP_QUERIES["clear"])
+            cursor.execute(ROLLUP_QUERIES["fill"])
+            groups = cursor.rowcount
+            conn.commit()
+            return groups
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    default_path = os.getenv("SQLITE_PATH") or str(Path(tempfile.gettempdir()) / "expense_tracker.db")
+    parser.add_argument("db_path", nargs="?", default=default_path, help="SQLite database file")
+    args = parser.parse_args(argv)
+
+    if not Path(args.db_path).exists():
+        print(f"Error: Database '{args.db_path}' not found")
+        return 1
+
+    pool = ConnectionPool(args.db_path, initializer=initialize_database)
+    try:
+        groups = rebuild_monthly_rollup(pool)
+    finally:
+        pool.close()
+    print(f"Rebuilt expense_monthly: {groups} group(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
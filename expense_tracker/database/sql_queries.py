@@ -51,37 +51,51 @@ PAYMENT_QUERIES = {
     "delete_payment_method": "DELETE FROM Payment_Method WHERE payment_method_name = ?"
 }
 
-# Base query for expense listing
+# Base query for expense listing. Reads the trigger-maintained expense_flat
+# table (see db_init.py) instead of joining Expense with the link tables.
 BASE_EXPENSE_QUERY = """
     SELECT 
         e.expense_id,
         e.date,
         e.amount,
         e.description,
-        c.category_name,
-        t.tag_name,
-        pm.payment_method_name,
-        ue.username,
-        pme.payment_detail_identifier
+        e.category_name,
+        e.tag_name,
+        e.payment_method_name,
+        e.username,
+        e.payment_detail_identifier
     FROM 
-        Expense e
-    LEFT JOIN Category_Expense ce ON e.expense_id = ce.expense_id
-    LEFT JOIN Categories c ON ce.category_id = c.category_id
-    LEFT JOIN Tag_Expense te ON e.expense_id = te.expense_id
-    LEFT JOIN Tags t ON te.tag_id = t.tag_id
-    LEFT JOIN Payment_Method_Expense pme ON e.expense_id = pme.expense_id
-    LEFT JOIN Payment_Method pm ON pme.payment_method_id = pm.payment_method_id
-    LEFT JOIN User_Expense ue ON e.expense_id = ue.expense_id
+        expense_flat e
 """
 
 # Expense-related queries
 EXPENSE_QUERIES = {
-    "insert_expense": "INSERT INTO Expense (date, amount, description) VALUES (?, ?, ?)",
     "insert_category_expense": "INSERT INTO Category_Expense (category_id, expense_id) VALUES (?, ?)",
     "insert_tag": "INSERT INTO Tags (tag_name) VALUES (?)",
     "insert_tag_expense": "INSERT INTO Tag_Expense (tag_id, expense_id) VALUES (?, ?)",
     "insert_payment_method_expense": "INSERT INTO Payment_Method_Expense (payment_method_id, expense_id, payment_detail_identifier) VALUES (?, ?, ?)",
     "insert_user_expense": "INSERT INTO User_Expense (username, expense_id) VALUES (?, ?)",
+    "insert_expense_with_id": "INSERT INTO Expense (expense_id, date, amount, description, fingerprint) VALUES (?, ?, ?, ?, ?)",
+    "insert_tag_if_missing": "INSERT OR IGNORE INTO Tags (tag_name) VALUES (?)",
+    "next_expense_id": """
+        SELECT MAX(
+            COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'Expense'), 0),
+            COALESCE((SELECT MAX(expense_id) FROM Expense), 0)
+        ) + 1
+    """,
+    "tag_ids": "SELECT tag_name, tag_id FROM Tags",
+    "list_tags": "SELECT tag_name FROM Tags ORDER BY tag_name",
+    "existing_fingerprints": """
+        SELECT DISTINCT fingerprint FROM Expense
+        WHERE fingerprint IN (SELECT value FROM json_each(?))
+            AND expense_id < ?
+    """,
+    "fingerprint_source": """
+        SELECT username, date, amount, description, payment_detail_identifier
+        FROM expense_flat
+        WHERE expense_id = ?
+    """,
+    "update_expense_fingerprint": "UPDATE Expense SET fingerprint = ? WHERE expense_id = ?",
     "check_expense_owner": """
         SELECT COUNT(*) FROM User_Expense 
         WHERE expense_id = ? AND username = ?
@@ -108,7 +122,77 @@ EXPENSE_QUERIES = {
     "delete_tag_expense": "DELETE FROM Tag_Expense WHERE expense_id = ?",
     "delete_payment_method_expense": "DELETE FROM Payment_Method_Expense WHERE expense_id = ?",
     "delete_user_expense": "DELETE FROM User_Expense WHERE expense_id = ?",
-    "delete_expense": "DELETE FROM Expense WHERE expense_id = ?"
+    "delete_expense": "DELETE FROM Expense WHERE expense_id = ?",
+    # Keyset pagination for the expense list, newest first. {filters} is a
+    # compile_filters() WHERE clause extended with the page boundary
+    # "(e.date, e.expense_id) < (?, ?)"; the previous page walks the other
+    # way with ">" and is reversed by the caller.
+    "expense_page": """
+        SELECT e.expense_id, e.date, e.amount, e.description,
+            e.category_name, e.tag_name, e.payment_method_name
+        FROM expense_flat e
+        {filters}
+        ORDER BY e.date DESC, e.expense_id DESC
+        LIMIT ?
+    """,
+    "expense_page_previous": """
+        SELECT e.expense_id, e.date, e.amount, e.description,
+            e.category_name, e.tag_name, e.payment_method_name
+        FROM expense_flat e
+        {filters}
+        ORDER BY e.date ASC, e.expense_id ASC
+        LIMIT ?
+    """,
+    "expense_totals": """
+        SELECT COUNT(*), TOTAL(e.amount)
+        FROM expense_flat e
+        {filters}
+    """,
+    # Expense picker lookups (ExpenseManager.search_expenses). Each one is a
+    # single index range with a LIMIT; prefixes are passed as [low, high).
+    # The amount and description ranges take the username as "? IS NULL OR"
+    # so that a user's search also walks the prefix range, not all of their
+    # expenses.
+    "picker_recent": """
+        SELECT e.expense_id, e.date, e.amount, e.category_name, e.description, e.username
+        FROM expense_flat e
+        {filters}
+        ORDER BY e.date DESC, e.expense_id DESC
+        LIMIT ?
+    """,
+    "picker_by_id": """
+        SELECT e.expense_id, e.date, e.amount, e.category_name, e.description, e.username
+        FROM expense_flat e
+        WHERE e.expense_id = ? {user_filter}
+    """,
+    "picker_by_date": """
+        SELECT e.expense_id, e.date, e.amount, e.category_name, e.description, e.username
+        FROM expense_flat e
+        WHERE e.date >= ? AND e.date < ? {user_filter}
+        ORDER BY e.date DESC, e.expense_id DESC
+        LIMIT ?
+    """,
+    "picker_by_amount": """
+        SELECT e.expense_id, e.date, e.amount, e.category_name, e.description, e.username
+        FROM expense_flat e
+        WHERE e.amount >= ? AND e.amount < ? AND (? IS NULL OR e.username = ?)
+        ORDER BY e.amount
+        LIMIT ?
+    """,
+    "picker_by_description": """
+        SELECT e.expense_id, e.date, e.amount, e.category_name, e.description, e.username
+        FROM expense_flat e
+        WHERE e.description >= ? COLLATE NOCASE AND e.description < ? COLLATE NOCASE
+            AND (? IS NULL OR e.username = ?)
+        ORDER BY e.description COLLATE NOCASE
+        LIMIT ?
+    """,
+    "expense_details": """
+        SELECT e.expense_id, e.date, e.amount, e.category_name, e.tag_name,
+            e.payment_method_name, e.description, e.username, e.payment_detail_identifier
+        FROM expense_flat e
+        WHERE e.expense_id = ? {user_filter}
+    """
 }
 
 # Report-related queries
@@ -119,19 +203,12 @@ REPORT_QUERIES = {
             e.date,
             e.amount,
             e.description,
-            c.category_name,
-            t.tag_name,
-            pm.payment_method_name,
-            ue.username
+            e.category_name,
+            e.tag_name,
+            e.payment_method_name,
+            e.username
         FROM 
-            Expense e
-        LEFT JOIN Category_Expense ce ON e.expense_id = ce.expense_id
-        LEFT JOIN Categories c ON ce.category_id = c.category_id
-        LEFT JOIN Tag_Expense te ON e.expense_id = te.expense_id
-        LEFT JOIN Tags t ON te.tag_id = t.tag_id
-        LEFT JOIN Payment_Method_Expense pme ON e.expense_id = pme.expense_id
-        LEFT JOIN Payment_Method pm ON pme.payment_method_id = pm.payment_method_id
-        LEFT JOIN User_Expense ue ON e.expense_id = ue.expense_id
+            expense_flat e
         WHERE 
             e.date BETWEEN ? AND ?
             {user_filter}
@@ -148,56 +225,260 @@ REPORT_QUERIES = {
             MIN(e.amount) as min_amount,
             AVG(e.amount) as avg_amount
         FROM 
-            Expense e
-        JOIN Category_Expense ce ON e.expense_id = ce.expense_id
-        JOIN User_Expense ue ON e.expense_id = ue.expense_id
+            expense_flat e
         WHERE 
-            ce.category_id = ?
+            e.category_name = (SELECT category_name FROM Categories WHERE category_id = ?)
             {user_filter}
     """,
-    "base_expense_query": BASE_EXPENSE_QUERY
+    "base_expense_query": BASE_EXPENSE_QUERY,
+    # Every analytics breakdown in one statement. {filters} is a WHERE
+    # fragment from core/filters.py; the filtered rows are materialized once
+    # and each UNION ALL branch groups them on one dimension.
+    "expense_breakdowns": """
+        WITH f AS (
+            SELECT e.date, e.amount, e.category_name, e.tag_name, e.payment_method_name
+            FROM expense_flat e
+            {filters}
+        )
+        SELECT 'total' AS dimension, NULL AS label, COUNT(*), SUM(amount),
+            MIN(amount), MAX(amount), COUNT(DISTINCT amount)
+        FROM f
+        UNION ALL
+        SELECT 'year_month', substr(date, 1, 7), COUNT(*), SUM(amount), NULL, NULL, NULL
+        FROM f GROUP BY substr(date, 1, 7)
+        UNION ALL
+        SELECT 'month', substr(date, 6, 2), COUNT(*), SUM(amount), NULL, NULL, NULL
+        FROM f GROUP BY substr(date, 6, 2)
+        UNION ALL
+        SELECT 'category', category_name, COUNT(*), SUM(amount), NULL, NULL, NULL
+        FROM f WHERE category_name <> '' GROUP BY category_name
+        UNION ALL
+        SELECT 'payment_method', payment_method_name, COUNT(*), SUM(amount), NULL, NULL, NULL
+        FROM f WHERE payment_method_name <> '' GROUP BY payment_method_name
+        UNION ALL
+        SELECT 'tag', tag_name, COUNT(*), SUM(amount), NULL, NULL, NULL
+        FROM f WHERE tag_name <> '' GROUP BY tag_name
+    """,
+    # Category Overview in one statement: the monthly totals come from the
+    # expense_monthly rollup and the five latest expenses from expense_flat;
+    # 'kind' tells the two row shapes apart. Takes the category and, per
+    # user, the username, once for each part.
+    "category_statistics": """
+        WITH months AS (
+            SELECT e.month, SUM(e.total) AS total, SUM(e.count) AS count,
+                MIN(e.min_amount) AS min_amount, MAX(e.max_amount) AS max_amount
+            FROM expense_monthly e
+            WHERE e.category_name = ?
+                {user_filter}
+            GROUP BY e.month
+        ),
+        recent AS (
+            SELECT e.expense_id, e.date, e.amount, e.description, e.username
+            FROM expense_flat e
+            WHERE e.category_name = ?
+                {user_filter}
+            ORDER BY e.date DESC, e.expense_id DESC
+            LIMIT 5
+        )
+        SELECT 'month' AS kind, month, total, count, min_amount, max_amount
+        FROM months
+        UNION ALL
+        SELECT 'recent', expense_id, date, amount, description, username
+        FROM recent
+    """,
+    # Expenses above their category's average, most exceptional first, one
+    # page at a time. {filters} is a WHERE fragment from core/filters.py and
+    # also bounds the rows the averages are taken over. Only the narrow
+    # columns go through the window sorts; date and description are looked
+    # up for the rows on the page. total counts the rows across all pages.
+    # Takes the filter parameters, then the limit and offset.
+    "above_average_expenses": """
+        WITH scored AS (
+            SELECT e.expense_id, e.category_name, e.amount,
+                AVG(e.amount) OVER (PARTITION BY e.category_name) AS category_avg
+            FROM expense_flat e
+            {filters}
+        ),
+        ranked AS (
+            SELECT expense_id, category_name, amount, category_avg,
+                (amount - category_avg) / category_avg * 100 AS percent_above,
+                COUNT(*) OVER () AS total
+            FROM scored
+            WHERE category_name IS NOT NULL AND amount > category_avg
+            ORDER BY percent_above DESC, expense_id
+            LIMIT ? OFFSET ?
+        )
+        SELECT ranked.expense_id, f.date, ranked.amount, f.description, ranked.category_name,
+            ranked.category_avg, ranked.percent_above, ranked.total
+        FROM ranked
+        JOIN expense_flat f ON f.expense_id = ranked.expense_id
+        ORDER BY ranked.percent_above DESC, ranked.expense_id
+    """,
+    # Amount histogram counted in SQL: parameters are the lowest amount, the
+    # bin width and the last bin index, followed by the filter parameters
+    "amount_histogram": """
+        SELECT MIN(CAST((e.amount - ?) / ? AS INTEGER), ?) AS bin, COUNT(*)
+        FROM expense_flat e
+        {filters}
+        GROUP BY bin
+    """,
+    # Landing page figures in one statement: totals and the four breakdowns
+    # from the monthly rollup (O(groups), not O(expenses)) plus the latest
+    # expense date off the date index. {filters} is "" or the per-user WHERE,
+    # so the username is bound once per {filters} or not at all.
+    "dashboard_breakdowns": """
+        SELECT 'total' AS dimension, NULL AS label, TOTAL(e.total), TOTAL(e.count)
+        FROM expense_monthly e {filters}
+        UNION ALL
+        SELECT 'latest', MAX(e.date), NULL, NULL
+        FROM expense_flat e {filters}
+        UNION ALL
+        SELECT 'category', e.category_name, SUM(e.total), SUM(e.count)
+        FROM expense_monthly e {filters}
+        GROUP BY e.category_name HAVING e.category_name <> ''
+        UNION ALL
+        SELECT 'month', e.month, SUM(e.total), SUM(e.count)
+        FROM expense_monthly e {filters}
+        GROUP BY e.month
+        UNION ALL
+        SELECT 'payment_method', e.payment_method_name, SUM(e.total), SUM(e.count)
+        FROM expense_monthly e {filters}
+        GROUP BY e.payment_method_name HAVING e.payment_method_name <> ''
+        UNION ALL
+        SELECT 'tag', e.tag_name, SUM(e.total), SUM(e.count)
+        FROM expense_monthly e {filters}
+        GROUP BY e.tag_name HAVING e.tag_name <> ''
+    """,
+    # Total over every category, for a category's share of spending
+    "total_spending": "SELECT TOTAL(e.amount) FROM expense_flat e {filters}",
+    "recent_expenses": """
+        SELECT e.expense_id, e.date, e.amount, e.category_name, e.tag_name, e.payment_method_name, e.description
+        FROM expense_flat e
+        {filters}
+        ORDER BY e.date DESC, e.expense_id DESC
+        LIMIT ?
+    """,
+    # Rows for the columnar snapshot (core/analytics.py): everything after
+    # the highest expense_id it holds, and the rows of a JSON list of ids
+    "columnar_rows": """
+        SELECT e.expense_id, e.date, e.amount, e.category_name, e.payment_method_name, e.tag_name, e.username
+        FROM expense_flat e
+        WHERE e.expense_id > ?
+        ORDER BY e.expense_id
+    """,
+    "columnar_rows_by_id": """
+        SELECT e.expense_id, e.date, e.amount, e.category_name, e.payment_method_name, e.tag_name, e.username
+        FROM expense_flat e
+        WHERE e.expense_id IN (SELECT value FROM json_each(?))
+        ORDER BY e.expense_id
+    """,
+    # The top_expenses columns for ids the snapshot picked, largest first
+    "expenses_by_id": """
+        SELECT e.expense_id, e.date, e.amount, e.description, e.category_name,
+            e.tag_name, e.payment_method_name, e.username
+        FROM expense_flat e
+        WHERE e.expense_id IN (SELECT value FROM json_each(?))
+        ORDER BY e.amount DESC, e.expense_id
+    """
+}
+
+# Groupings answered from the expense_monthly rollup: name -> (rollup
+# column, the same value computed from an expense_flat row)
+ROLLUP_GROUPS = {
+    "month": ("e.month", "substr(e.date, 1, 7)"),
+    "category": ("e.category_name", "COALESCE(e.category_name, '')"),
+    "payment_method": ("e.payment_method_name", "COALESCE(e.payment_method_name, '')"),
+    "tag": ("e.tag_name", "COALESCE(e.tag_name, '')"),
+}
+
+# rollup_by_<group> reads whole months from expense_monthly;
+# partial_month_by_<group> aggregates the days of a month that is only partly
+# in range straight from expense_flat. Both take a range, then the category
+# twice (NULL for all categories).
+for _group, (_rollup_column, _flat_column) in ROLLUP_GROUPS.items():
+    REPORT_QUERIES[f"rollup_by_{_group}"] = f"""
+        SELECT {_rollup_column}, SUM(e.total), SUM(e.count), MIN(e.min_amount), MAX(e.max_amount)
+        FROM expense_monthly e
+        WHERE e.month BETWEEN ? AND ?
+            AND (? IS NULL OR e.category_name = ?)
+            {{user_filter}}
+        GROUP BY {_rollup_column}
+    """
+    REPORT_QUERIES[f"partial_month_by_{_group}"] = f"""
+        SELECT {_flat_column}, SUM(e.amount), COUNT(*), MIN(e.amount), MAX(e.amount)
+        FROM expense_flat e
+        WHERE e.date BETWEEN ? AND ?
+            AND (? IS NULL OR e.category_name = ?)
+            {{user_filter}}
+        GROUP BY {_flat_column}
+    """
+
+# Monthly rollup (expense_monthly) maintenance. The triggers in db_init.py
+# keep it current; these rebuild it from expense_flat.
+ROLLUP_QUERIES = {
+    "clear": "DELETE FROM expense_monthly",
+    "fill": """
+        INSERT INTO expense_monthly (
+            username, month, category_name, payment_method_name, tag_name,
+            total, count, min_amount, max_amount
+        )
+        SELECT
+            COALESCE(e.username, ''),
+            substr(e.date, 1, 7),
+            COALESCE(e.category_name, ''),
+            COALESCE(e.payment_method_name, ''),
+            COALESCE(e.tag_name, ''),
+            SUM(e.amount), COUNT(*), MIN(e.amount), MAX(e.amount)
+        FROM expense_flat e
+        GROUP BY 1, 2, 3, 4, 5
+    """,
 }
 
 # CSV Operation Queries
 CSV_QUERIES = {
     "export_base": """
 SELECT e.amount,
-    c.category_name,
-    pm.payment_method_name,
+    e.category_name,
+    e.payment_method_name,
     e.date,
     e.description,
-    t.tag_name,
-    pme.payment_detail_identifier
-FROM Expense e
-JOIN Category_Expense ce ON e.expense_id = ce.expense_id
-JOIN Categories c ON ce.category_id = c.category_id
-JOIN Payment_Method_Expense pme ON e.expense_id = pme.expense_id
-JOIN Payment_Method pm ON pme.payment_method_id = pm.payment_method_id
-JOIN Tag_Expense te ON e.expense_id = te.expense_id
-JOIN Tags t ON te.tag_id = t.tag_id
+    e.tag_name,
+    e.payment_detail_identifier
+FROM expense_flat e
+WHERE e.category_name IS NOT NULL
+    AND e.payment_method_name IS NOT NULL
+    AND e.tag_name IS NOT NULL
 """
 }
 
 # Log Management Queries
 LOG_QUERIES = {
+    # ts is the same moment as timestamp, in seconds since the epoch; range
+    # filters and ordering use it so they can be answered from an index
     "add_log_with_description": """
-        INSERT INTO Logs (username, timestamp, description) 
-        VALUES (?, ?, ?)""",
-    "get_user_logs": """
-        SELECT log_id AS logid, username, timestamp, description 
-        FROM Logs 
-        WHERE username = ? 
-        ORDER BY timestamp ASC 
-        LIMIT ?""",
-    "get_all_logs": """
-        SELECT log_id AS logid, username, timestamp, description 
-        FROM Logs 
-        ORDER BY timestamp ASC 
-        LIMIT ?""",
-    "view_logs_base": """
-        SELECT log_id AS logid, username, timestamp, description
-        FROM Logs""",
-    "view_logs_order": " ORDER BY timestamp ASC",
+        INSERT INTO Logs (username, timestamp, description, ts) 
+        VALUES (?, ?, ?, ?)""",
+    # {filters} is "" or a WHERE over e.username, e.ts and the (e.ts, e.log_id) cursor
+    "log_list": """
+        SELECT e.log_id AS logid, e.username, e.timestamp, e.description
+        FROM Logs e
+        {filters}
+        ORDER BY e.ts ASC, e.log_id ASC
+    """,
+    "log_page": """
+        SELECT e.log_id, e.username, e.timestamp, e.description, e.ts
+        FROM Logs e
+        {filters}
+        ORDER BY e.ts DESC, e.log_id DESC
+        LIMIT ?
+    """,
+    "log_page_previous": """
+        SELECT e.log_id, e.username, e.timestamp, e.description, e.ts
+        FROM Logs e
+        {filters}
+        ORDER BY e.ts ASC, e.log_id ASC
+        LIMIT ?
+    """,
     "get_users_with_logs": """
         SELECT DISTINCT username FROM Logs ORDER BY username
     """,
@@ -0,0 +1,313 @@
+"""Headless rendering of the matplotlib report charts to PNG or SVG bytes.
+
+Charts are drawn on matplotlib.figure.Figure objects with an Agg canvas and
+never go through pyplot, so no display or GUI backend is needed and no
+figure outlives the call that rendered it. A chart is a list of panels in a
+grid; each panel is a top-level function drawing one Axes from plain
+aggregate data. The whole chart is drawn on one figure: drawing panels in a
+process pool was measured slower, as start-up and pickling outweigh the
+per-panel work.
+
+Rendered bytes are cached on the chart name, format, resolution and the
+data itself, so re-rendering a report over unchanged aggregates is a
+dictionary lookup.
+"""
+import io
+
+import numpy as np
+from matplotlib import cm
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Circle
+from matplotlib.ticker import FuncFormatter
+
+from expense_tracker.core.filters import MONTHS
+from expense_tracker.database.result_cache import ResultCache, freeze
+
+FORMATS = ("png", "svg")
+
+_currency = FuncFormatter(lambda x, _: f'${x:.0f}')
+
+
+# Top expenses: data = {"n", "ids", "amounts", "usernames" (None for non-admins)}
+
+def _draw_top_expenses(ax, data):
+    ids, amounts, usernames = data["ids"], data["amounts"], data["usernames"]
+    ax.plot([str(i) for i in ids], amounts, marker='o', linestyle='-', color='red', linewidth=2, markersize=8)
+
+    # Add amount labels above each point
+    for i, amount in enumerate(amounts):
+        ax.text(i, amount + (max(amounts) * 0.02), f'{amount:.2f}', ha='center', va='bottom', fontsize=9)
+
+    ax.set_xlabel('Expense ID')
+    ax.set_ylabel('Amount')
+    if usernames is not None:
+        ax.set_title(f'Top {data["n"]} Expenses - Line Chart (With User Info)')
+        ax.set_xticks(range(len(ids)))
+        ax.set_xticklabels([f"ID:{i}\n{user or 'N/A'}" for i, user in zip(ids, usernames)], rotation=45)
+    else:
+        ax.set_title(f'Top {data["n"]} Expenses - Line Chart')
+        ax.tick_params(axis='x', rotation=45)
+    ax.grid(True, linestyle='--', alpha=0.7)
+
+
+# Category dashboard: data = {"category", "total", "count", "max", "min",
+# "average", "total_all"}
+
+def _draw_category_metrics(ax, data):
+    ax.axis('off')  # No axes for text display
+    ax.text(0.5, 0.9, "Key Metrics", ha='center', fontsize=14, fontweight='bold')
+    ax.text(0.5, 0.7, f"Total Spending: ${data['total']:.2f}", ha='center')
+    ax.text(0.5, 0.5, f"Number of Expenses: {data['count']}", ha='center')
+    ax.text(0.5, 0.3, f"Average Expense: ${data['average']:.2f}", ha='center')
+
+
+def _draw_category_values(ax, data):
+    metrics = ['Total', 'Maximum', 'Minimum', 'Average']
+    values = [data['total'], data['max'], data['min'], data['average']]
+    bars = ax.bar(metrics, values, color=['#3498db', '#e74c3c', '#2ecc71', '#f39c12'])
+    ax.set_title('Expense Values')
+    ax.set_ylabel('Amount ($)')
+
+    # Add value labels to the bars
+    for bar in bars:
+        height = bar.get_height()
+        ax.annotate(f'${height:.2f}',
+                    xy=(bar.get_x() + bar.get_width() / 2, height),
+                    xytext=(0, 3),  # 3 points vertical offset
+                    textcoords="offset points",
+                    ha='center', va='bottom')
+
+
+def _draw_category_share(ax, data):
+    total, total_all = data['total'], data['total_all']
+    # Only create pie if there are other expenses
+    if total_all > 0:
+        name = data['category'].capitalize()
+        ax.pie([total, total_all - total], explode=(0.1, 0),
+               labels=[f'{name}\n(${total:.2f})', f'Other Categories\n(${total_all - total:.2f})'],
+               colors=['#3498db', '#e6e6e6'], autopct='%1.1f%%', shadow=True, startangle=90)
+        ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
+        ax.set_title('Proportion of Total Spending')
+    else:
+        ax.axis('off')
+        ax.text(0.5, 0.5, "No data for proportion", ha='center')
+
+
+def _draw_category_gauge(ax, data):
+    percentage = (data['total'] / data['total_all'] * 100) if data['total_all'] > 0 else 0
+
+    # Draw a semi-circle gauge background
+    theta = np.linspace(0, np.pi, 100)
+    for i, color in enumerate(['#f1c40f', '#e67e22', '#e74c3c']):
+        ax.fill_between(theta, 0.8, 1.0, color=color, alpha=0.3,
+                        where=((i / 3) * np.pi <= theta) & (theta <= ((i + 1) / 3) * np.pi))
+
+    # Draw the gauge needle and its hub
+    needle_theta = np.pi * min(percentage / 100, 1.0)
+    ax.plot([0, np.cos(needle_theta)], [0, np.sin(needle_theta)], 'k-', lw=2)
+    ax.add_artist(Circle((0, 0), 0.1, color='k', fill=True))
+
+    ax.text(-0.2, -0.15, '0%', fontsize=10)
+    ax.text(1.1, -0.15, '100%', fontsize=10)
+    ax.text(0.5, 0.5, f'{percentage:.1f}%', ha='center', fontsize=14)
+    ax.set_xlim(-1.1, 1.1)
+    ax.set_ylim(-0.2, 1.1)
+    ax.axis('off')
+    ax.set_title('Percentage of Total Spending')
+
+
+# Expense analytics: data is the dict from ReportManager.get_expense_summary()
+
+def _draw_analytics_metrics(ax, summary):
+    ax.axis('off')
+    metrics_text = (
+        f"EXPENSE SUMMARY\n\n"
+        f"Total: ${summary['total']:.2f}\n"
+        f"Average: ${summary['average']:.2f}\n"
+        f"Maximum: ${summary['max']:.2f}\n"
+        f"Minimum: ${summary['min']:.2f}\n"
+        f"Count: {summary['count']}\n"
+    )
+    ax.text(0.5, 0.5, metrics_text, ha='center', va='center', fontsize=12,
+            bbox=dict(boxstyle="round,pad=0.5", facecolor='lightblue', alpha=0.3))
+
+
+def _draw_analytics_time_series(ax, summary):
+    dates = summary["year_months"]
+    sorted_dates = sorted(dates)
+    ax.plot(sorted_dates, [dates[date] for date in sorted_dates], marker='o', linewidth=2, color='blue')
+    ax.set_title('Spending Over Time')
+    ax.set_xlabel('Month')
+    ax.set_ylabel('Amount ($)')
+    ax.tick_params(axis='x', rotation=45)
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.yaxis.set_major_formatter(_currency)
+
+
+def _draw_analytics_categories(ax, summary):
+    categories = summary["categories"]
+    if not categories:
+        ax.text(0.5, 0.5, "No category data available", ha='center', va='center')
+        ax.axis('off')
+        return
+
+    cat_names = list(categories)
+    _, _, autotexts = ax.pie(
+        [categories[cat]["total"] for cat in cat_names],
+        labels=cat_names,
+        autopct='%1.1f%%',
+        startangle=90,
+        wedgeprops={'edgecolor': 'w', 'linewidth': 1}
+    )
+    for autotext in autotexts:
+        autotext.set_fontsize(9)
+        autotext.set_fontweight('bold')
+    ax.set_title('Spending by Category')
+    ax.axis('equal')
+
+
+def _draw_analytics_months(ax, summary):
+    months = summary["months"]
+    if not months:
+        ax.text(0.5, 0.5, "No monthly data available", ha='center', va='center')
+        ax.axis('off')
+        return
+
+    # Calendar order, only months that are in the data
+    sorted_months = [m for m in MONTHS if m in months]
+    bars = ax.bar(sorted_months, [months[m] for m in sorted_months], color='skyblue')
+    ax.set_title('Monthly Spending')
+    ax.set_xlabel('Month')
+    ax.set_ylabel('Amount ($)')
+    ax.tick_params(axis='x', rotation=45)
+    ax.yaxis.set_major_formatter(_currency)
+
+    for bar in bars:
+        height = bar.get_height()
+        ax.annotate(f'${height:.0f}',
+                    xy=(bar.get_x() + bar.get_width() / 2, height),
+                    xytext=(0, 3),
+                    textcoords="offset points",
+                    ha='center', va='bottom',
+                    rotation=45)
+
+
+def _draw_analytics_histogram(ax, summary):
+    # The bins were counted in SQL; weights redraw them as a histogram
+    edges = summary["histogram"]["edges"]
+    ax.hist(edges[:-1], bins=edges, weights=summary["histogram"]["counts"],
+            alpha=0.7, color='lightgreen', edgecolor='black')
+    ax.set_title('Amount Distribution')
+    ax.set_xlabel('Amount ($)')
+    ax.set_ylabel('Frequency')
+
+    avg_amount = summary["average"]
+    ax.axvline(avg_amount, color='red', linestyle='dashed', linewidth=1)
+    ax.text(avg_amount, ax.get_ylim()[1] * 0.9, f'Avg: ${avg_amount:.2f}', color='red',
+            ha='center', va='center', bbox=dict(facecolor='white', alpha=0.8, edgecolor='none'))
+
+
+def _draw_analytics_payment_methods(ax, summary):
+    payment_methods = summary["payment_methods"]
+    if not payment_methods:
+        ax.text(0.5, 0.5, "No payment method data available", ha='center', va='center')
+        ax.axis('off')
+        return
+
+    sorted_methods = sorted(payment_methods.items(), key=lambda x: x[1]["count"], reverse=True)
+    method_names = [method[0] for method in sorted_methods]
+    method_counts = [method[1]["count"] for method in sorted_methods]
+    bars = ax.barh(method_names, method_counts, color=cm.viridis(np.linspace(0.2, 0.8, len(method_names))))
+    ax.set_title('Payment Method Usage')
+    ax.set_xlabel('Number of Expenses')
+
+    for bar in bars:
+        width = bar.get_width()
+        ax.text(width + 0.3, bar.get_y() + bar.get_height() / 2, f'{width:.0f}',
+                ha='left', va='center', fontweight='bold')
+
+
+# Chart name -> figure size (inches), grid (rows, columns), the share of the
+# height left below the title, and panels as (draw function, first row,
+# last row + 1, first column, last column + 1)
+CHARTS = {
+    "top_expenses": {
+        "figsize": (12, 6),
+        "grid": (1, 1),
+        "top": 1.0,
+        "panels": [(_draw_top_expenses, 0, 1, 0, 1)],
+    },
+    "category_spending": {
+        "figsize": (12, 8),
+        "grid": (2, 3),
+        "top": 0.9,
+        "panels": [
+            (_draw_category_metrics, 0, 1, 0, 1),
+            (_draw_category_values, 0, 1, 1, 3),
+            (_draw_category_share, 1, 2, 0, 1),
+            (_draw_category_gauge, 1, 2, 1, 3),
+        ],
+    },
+    "expense_analytics": {
+        "figsize": (15, 12),
+        "grid": (3, 6),
+        "top": 0.93,
+        "panels": [
+            (_draw_analytics_metrics, 0, 1, 0, 2),
+            (_draw_analytics_time_series, 0, 1, 2, 6),
+            (_draw_analytics_categories, 1, 2, 0, 3),
+            (_draw_analytics_months, 1, 2, 3, 6),
+            (_draw_analytics_histogram, 2, 3, 0, 3),
+            (_draw_analytics_payment_methods, 2, 3, 3, 6),
+        ],
+    },
+}
+
+_chart_cache = ResultCache(max_entries=128, max_bytes=32 * 1024 * 1024)
+
+
+def _save(fig, fmt, dpi):
+    buffer = io.BytesIO()
+    FigureCanvasAgg(fig)
+    fig.savefig(buffer, format=fmt, dpi=dpi)
+    return buffer.getvalue()
+
+
+def _render_whole(spec, data, title, fmt, dpi):
+    fig = Figure(figsize=spec["figsize"], dpi=dpi)
+    grid = fig.add_gridspec(*spec["grid"])
+    for draw, row0, row1, col0, col1 in spec["panels"]:
+        draw(fig.add_subplot(grid[row0:row1, col0:col1]), data)
+    if title:
+        fig.suptitle(title, fontsize=16, fontweight='bold')
+    fig.tight_layout(rect=(0, 0, 1, spec["top"]))
+    return _save(fig, fmt, dpi)
+
+
+def render_chart(name, data, title=None, fmt="png", dpi=100):
+    """Render chart ``name`` from CHARTS over ``data`` and return the image bytes.
+
+    Results are cached by chart, data, title, format and dpi. Raises
+    ValueError for an unknown chart or format.
+    """
+    if name not in CHARTS:
+        raise ValueError(f"Unknown chart '{name}'")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported chart format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+
+    spec = CHARTS[name]
+
+    return _chart_cache.get_or_compute(
+        (name, freeze(data), title, fmt, dpi), lambda: _render_whole(spec, data, title, fmt, dpi)
+    )
+
+
+def chart_cache_stats():
+    """Return hit/miss and size counters for the rendered chart cache."""
+    return _chart_cache.stats()
+
+
+def clear_chart_cache():
+    """Drop every rendered chart."""
+    _chart_cache.clear()
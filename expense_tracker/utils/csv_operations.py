@@ -1,68 +1,116 @@
 import csv
+import io
+import os
 import sqlite3
-from expense_tracker.database.sql_queries import CSV_QUERIES
+import zlib
+from expense_tracker.database.sql_queries import CSV_QUERIES, EXPENSE_QUERIES
+
+REQUIRED_FIELDS = ["amount", "category", "payment_method", "date", "description", "tag"]
+EXPORT_FIELDS = REQUIRED_FIELDS + ["payment_detail_identifier"]
 
 class CSVOperations:
-    def __init__(self, cursor, conn, expense_manager=None):
-        self.conn = conn
-        self.cursor = cursor
+    def __init__(self, pool, expense_manager=None):
+        self.pool = pool
         self.expense_manager = expense_manager
         self.current_user = None
+        self.last_import_stats = None
+        self.last_export_rows = 0
     
     def set_current_user(self, username):
         self.current_user = username
         if self.expense_manager:
             self.expense_manager.set_current_user(username)
     
-    def import_expenses(self, file_path):
+    def _validate_chunk(self, chunk, category_ids, payment_method_ids):
+        """Validate one parsed chunk with vectorized checks.
+
+        Returns the valid rows as dicts ready for add_expenses_bulk and the
+        number of rows rejected.
+        """
+        import pandas as pd
+        amounts = pd.to_numeric(chunk["amount"].str.strip(), errors="coerce")
+        dates = pd.to_datetime(chunk["date"].str.strip(), format="%Y-%m-%d", errors="coerce")
+        categories = chunk["category"].str.strip().str.lower()
+        payment_methods = chunk["payment_method"].str.strip().str.lower()
+
+        valid = (
+            amounts.notna()
+            & dates.notna()
+            & categories.isin(category_ids.keys())
+            & payment_methods.isin(payment_method_ids.keys())
+        )
+
+        details = chunk["payment_detail_identifier"] if "payment_detail_identifier" in chunk else ""
+        rows = pd.DataFrame({
+            "amount": amounts,
+            "category": categories,
+            "payment_method": payment_methods,
+            "date": dates.dt.strftime("%Y-%m-%d"),
+            "description": chunk["description"],
+            "tag": chunk["tag"],
+            "payment_detail_identifier": details,
+        })[valid]
+        return rows.to_dict("records"), int((~valid).sum())
+
+    def import_expenses(self, file_path, chunk_size=5000, progress_callback=None):
+        """Import expenses from a CSV file in fixed-size chunks.
+
+        Only one chunk is held in memory at a time. Each chunk is validated as
+        a whole (amounts, dates, known categories and payment methods) and
+        inserted in one transaction. Rows whose fingerprint matches an expense
+        that existed before the import started are skipped as duplicates, so
+        re-importing a statement does not double it. After every chunk,
+        progress_callback (if given) receives the running counts. The final
+        counts are also kept on self.last_import_stats.
+        """
+        # Deferred like in ReportManager: only imports need pandas
+        import pandas as pd
         if not self.current_user:
             print("Error: No user logged in")
             return False
             
+        stats = {"rows": 0, "added": 0, "duplicates": 0, "errors": 0,
+                 "bytes_read": 0, "total_bytes": 0}
+        self.last_import_stats = stats
+        
         try:
-            success_count = 0
-            error_count = 0
-            duplicate_count = 0  # Track duplicates
+            stats["total_bytes"] = os.path.getsize(file_path)
             
-            with open(file_path, "r") as csvfile:
-                reader = csv.DictReader(csvfile)
-                
-                # Validate CSV header
-                required_fields = ["amount", "category", "payment_method", "date", "description", "tag"]
-                for field in required_fields:
-                    if field not in reader.fieldnames:
-                        print("Error: CSV header does not match")
-                        return False
-                
-                for row in reader:
-                    amount = row.get('amount', '')
-                    category = row.get('category', '').lower()
-                    payment_method = row.get('payment_method', '').lower()
-                    date = row.get('date', '')
-                    description = row.get('description', '')
-                    tag = row.get('tag', '')
-                    payment_detail = row.get('payment_detail_identifier', '')
-                    
-                    # Attempt to add each expense
-                    result = self.expense_manager.addexpense(
-                        amount=amount,
-                        category=category,
-                        payment_method=payment_method,
-                        date=date,
-                        description=description,
-                        tag=tag,
-                        payment_detail_identifier=payment_detail,
-                        import_fn=1  # Flag to suppress individual success messages
+            # Validate CSV header
+            header = pd.read_csv(file_path, nrows=0).columns
+            for field in REQUIRED_FIELDS:
+                if field not in header:
+                    print("Error: CSV header does not match")
+                    return False
+            
+            dimensions = self.expense_manager.dimensions
+            category_ids = dimensions.ids("category")
+            payment_method_ids = dimensions.ids("payment_method")
+            # Expenses from earlier chunks of this file are not duplicates
+            first_new_id = self.pool.fetchone(EXPENSE_QUERIES["next_expense_id"])[0]
+            
+            with open(file_path, "rb") as csvfile:
+                chunks = pd.read_csv(csvfile, chunksize=chunk_size, dtype=str, keep_default_na=False)
+                for chunk in chunks:
+                    rows, rejected = self._validate_chunk(chunk, category_ids, payment_method_ids)
+                    results = self.expense_manager.add_expenses_bulk(
+                        rows, batch_size=chunk_size, prevalidated=True,
+                        skip_duplicates=True, duplicates_before_id=first_new_id,
                     )
                     
-                    if result == "duplicate":
-                        duplicate_count += 1
-                    elif result:
-                        success_count += 1
-                    else:
-                        error_count += 1
+                    added = sum(1 for result in results if result["status"] == "added")
+                    duplicates = sum(1 for result in results if result["status"] == "duplicate")
+                    stats["rows"] += len(chunk)
+                    stats["added"] += added
+                    stats["duplicates"] += duplicates
+                    stats["errors"] += rejected + len(results) - added - duplicates
+                    stats["bytes_read"] = csvfile.tell()
+                    
+                    if progress_callback:
+                        progress_callback(dict(stats))
             
-            print(f"Import completed: {success_count} expenses added successfully, {duplicate_count} duplicates skipped, {error_count} errors.")
+            stats["bytes_read"] = stats["total_bytes"]
+            print(f"Import completed: {stats['added']} expenses added successfully, {stats['duplicates']} duplicates skipped, {stats['errors']} errors.")
             return True
                 
         except FileNotFoundError:
@@ -72,16 +120,17 @@ class CSVOperations:
             print(f"Error importing expenses: {e}")
             return False
     
-    def export_csv(self, file_path, sort_field=None):
+    def _export_query(self, sort_field):
+        """Return the export query for a sort field, or None if it is invalid"""
         # Mapping allowed sort fields to actual SQL columns
         sort_fields = {
             "amount": "e.amount",
-            "category": "c.category_name",
-            "payment_method": "pm.payment_method_name",
+            "category": "e.category_name",
+            "payment_method": "e.payment_method_name",
             "date": "e.date",
             "description": "e.description",
-            "tag": "t.tag_name",
-            "payment_detail_identifier": "pme.payment_detail_identifier"
+            "tag": "e.tag_name",
+            "payment_detail_identifier": "e.payment_detail_identifier"
         }
         
         query = CSV_QUERIES["export_base"]
@@ -90,26 +139,71 @@ class CSVOperations:
         if sort_field:
             if sort_field not in sort_fields:
                 print("Error: Invalid sort field.")
-                return False
+                return None
             query += f" ORDER BY {sort_fields[sort_field]}"
+        return query
 
-        self.cursor.execute(query)
-        rows = self.cursor.fetchall()
+    def iter_export_csv(self, sort_field=None, compress=False, fetch_size=1000):
+        """Return a generator of CSV bytes for the export, or None for an invalid sort field.
 
-        if not rows:
-            print("No expenses found to export.")
+        Rows are read fetch_size at a time and encoded as they arrive, so a
+        consumer that writes the chunks out as it goes (export_csv) uses
+        memory that does not grow with the number of expenses; one that
+        collects them, like the web download, still holds the whole export. With
+        compress=True the bytes are a gzip stream. The number of data rows
+        produced is kept on self.last_export_rows once the generator finishes.
+        """
+        self.last_export_rows = 0
+        query = self._export_query(sort_field)
+        if query is None:
+            return None
+        return self._export_chunks(query, compress, fetch_size)
+
+    def _export_chunks(self, query, compress, fetch_size):
+        # wbits=31 makes zlib write a gzip header and trailer
+        compressor = zlib.compressobj(wbits=31) if compress else None
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+
+        with self.pool.reader() as conn:
+            cursor = conn.execute(query)
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if rows:
+                    writer.writerows(rows)
+                    self.last_export_rows += len(rows)
+                data = buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+                if compressor:
+                    data = compressor.compress(data)
+                if data:
+                    yield data
+                if not rows:
+                    break
+
+        if compressor:
+            yield compressor.flush()
+
+    def export_csv(self, file_path, sort_field=None, compress=False):
+        """Stream the export into file_path; gzip it when compress is True."""
+        chunks = self.iter_export_csv(sort_field, compress)
+        if chunks is None:
             return False
 
         try:
-            with open(file_path, "w", newline="") as csvfile:
-                writer = csv.writer(csvfile)
-                # Write header row
-                writer.writerow(['amount', 'category', 'payment_method', 'date', 'description', 'tag', 'payment_detail_identifier'])
-                # Write data rows
-                writer.writerows(rows)
-            
-            print(f"Expenses exported successfully to {file_path}")
-            return True
+            with open(file_path, "wb") as output:
+                for chunk in chunks:
+                    output.write(chunk)
         except Exception as e:
             print(f"Error exporting expenses: {e}")
-            return False
\ No newline at end of file
+            return False
+
+        if not self.last_export_rows:
+            os.unlink(file_path)
+            print("No expenses found to export.")
+            return False
+
+        print(f"Expenses exported successfully to {file_path}")
+        return True
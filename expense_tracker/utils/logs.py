@@ -1,5 +1,10 @@
+import atexit
+import queue
 import sqlite3
-from datetime import datetime
+import threading
+import time
+import weakref
+from datetime import datetime, timedelta
 import os
 import sys
 
@@ -9,29 +14,156 @@ if project_root not in sys.path:
 
 from expense_tracker.database.sql_queries import LOG_QUERIES
 
+class BufferedLogWriter:
+    """Writes audit log rows from a background thread in batches.
+
+    add() only puts the row on a bounded in-memory queue, so logging a page
+    view no longer costs the caller a write transaction and its fsync. The
+    writer thread inserts queued rows with executemany once batch_size rows
+    are waiting or flush_interval seconds have passed since the first of
+    them. When the queue is full, add() waits up to put_timeout seconds for
+    room and then drops the row, counting it in stats()["dropped"].
+    flush() blocks until every row added before it is written; it is called
+    on logout, before logs are read or deleted, and at interpreter exit.
+    """
+
+    def __init__(self, pool, batch_size=100, flush_interval=1.0, max_queue=10000, put_timeout=0.05):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                if self._thread is None:
+                    atexit.register(self.close)
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def add(self, username, timestamp, description, ts):
+        """Queue one log row; returns False if it was dropped because the queue stayed full."""
+        self._ensure_started()
+        try:
+            self._queue.put((username, timestamp, description, ts), timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def flush(self, timeout=5.0):
+        """Wait until the rows queued so far are written; returns False on timeout."""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self):
+        """Write what is queued and stop the writer thread."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self.flush()
+        self._queue.put(None)
+        self._thread.join(self.flush_interval + 5.0)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            rows, waiters, stop = [], [], False
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    stop = True
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                rows.append(item)
+                if len(rows) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            if rows:
+                self._write(rows)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+
+    def _write(self, rows):
+        try:
+            with self.pool.writer() as conn:
+                conn.executemany(LOG_QUERIES["add_log_with_description"], rows)
+                conn.commit()
+            with self._lock:
+                self.written += len(rows)
+                self.batches += 1
+        except sqlite3.Error as e:
+            print(f"Error adding logs: {e}")
+            with self._lock:
+                self.failed += len(rows)
+
+    def stats(self):
+        """Return queue depth and written/dropped/failed counters for diagnostics."""
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "written": self.written,
+                "batches": self.batches,
+                "dropped": self.dropped,
+                "failed": self.failed,
+            }
+
+
+_writers = weakref.WeakKeyDictionary()
+_writers_lock = threading.Lock()
+
+
+def get_log_writer(pool):
+    """Return the process-wide buffered log writer for a connection pool."""
+    with _writers_lock:
+        writer = _writers.get(pool)
+        if writer is None:
+            writer = _writers[pool] = BufferedLogWriter(pool)
+        return writer
+
+
 class LogManager:
-    def __init__(self, cursor, conn):
-        self.conn = conn
-        self.cursor = cursor
+    def __init__(self, pool):
+        self.pool = pool
+        self.writer = get_log_writer(pool)
         self.current_user = None
     
     def set_current_user(self, username):
         self.current_user = username
     
     def add_log(self, description):
+        """Queue a log entry for the current user; it is written in the background."""
         if not self.current_user:
             return False
-        try:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self.cursor.execute(
-                LOG_QUERIES["add_log_with_description"],
-                (self.current_user, timestamp, description)
-            )
-            self.conn.commit()
-            return True
-        except sqlite3.Error as e:
-            print(f"Error adding log: {e}")
-            return False
+        now = datetime.now()
+        return self.writer.add(self.current_user, now.strftime("%Y-%m-%d %H:%M:%S"), description, int(now.timestamp()))
+
+    def flush(self):
+        """Write all queued log entries before returning."""
+        return self.writer.flush()
     
     def generate_log_description(self, action_type, parameters=None):
         description = ""
@@ -65,33 +197,33 @@ class LogManager:
 
         return description
     
+    def _log_filters(self, username=None, start_date=None, end_date=None):
+        """Build the WHERE conditions for a user and a YYYY-MM-DD date range (both ends inclusive).
+
+        Dates become ts bounds, [start of start_date, start of the day after
+        end_date), so the range is read from the (username, ts) or (ts) index.
+        """
+        conditions, params = [], []
+        if username:
+            conditions.append("e.username = ?")
+            params.append(username)
+        if start_date:
+            conditions.append("e.ts >= ?")
+            params.append(int(datetime.strptime(str(start_date)[:10], "%Y-%m-%d").timestamp()))
+        if end_date:
+            conditions.append("e.ts < ?")
+            params.append(int((datetime.strptime(str(end_date)[:10], "%Y-%m-%d") + timedelta(days=1)).timestamp()))
+        return conditions, params
+
     def view_logs(self, filters=None):
+        self.flush()
         try:
-            query = LOG_QUERIES["view_logs_base"]
-            params = []
-
-            if filters:
-                if 'username' in filters:
-                    query += " WHERE username = ?"
-                    params.append(filters['username'])
-
-                if 'start_date' in filters:
-                    if 'username' in filters:
-                        query += " AND DATE(timestamp) >= DATE(?)"
-                    else:
-                        query += " WHERE DATE(timestamp) >= DATE(?)"
-                    params.append(filters['start_date'])
-
-                if 'end_date' in filters:
-                    if 'username' in filters or 'start_date' in filters:
-                        query += " AND DATE(timestamp) <= DATE(?)"
-                    else:
-                        query += " WHERE DATE(timestamp) <= DATE(?)"
-                    params.append(filters['end_date'])
-
-            query += LOG_QUERIES["view_logs_order"]
-            self.cursor.execute(query, tuple(params))
-            logs = self.cursor.fetchall()
+            filters = filters or {}
+            conditions, params = self._log_filters(
+                filters.get('username'), filters.get('start_date'), filters.get('end_date')
+            )
+            where = "WHERE " + " AND ".join(conditions) if conditions else ""
+            logs = self.pool.fetchall(LOG_QUERIES["log_list"].format(filters=where), tuple(params))
 
             if not logs:
                 print("No logs found.")
@@ -111,14 +243,54 @@ class LogManager:
                 print(f"Total: {len(logs)} log(s) found.")
 
             return True
+        except ValueError as e:
+            print(f"Error: Invalid date. Must be in YYYY-MM-DD format. {e}")
+            return False
         except sqlite3.Error as e:
             print(f"Error viewing logs: {e}")
             return False
 
+    def get_log_page(self, username=None, start_date=None, end_date=None, page_size=100, after=None, before=None):
+        """Return one page of log entries, newest first, paged by (ts, log_id).
+
+        Pass the (ts, log_id) of the last row shown as after for the next
+        (older) page, or of the first row shown as before for the previous
+        one. Returns {"rows", "has_next", "has_previous"}, or None on error.
+        Rows are (log_id, username, timestamp, description, ts). Each page
+        reads page_size + 1 index entries, however long the history is.
+        """
+        self.flush()
+        try:
+            conditions, params = self._log_filters(username, start_date, end_date)
+            page_size = int(page_size)
+            if page_size <= 0:
+                raise ValueError("page size must be positive")
+
+            boundary = before or after
+            if boundary:
+                conditions.append(f"(e.ts, e.log_id) {'>' if before else '<'} (?, ?)")
+                params += [int(boundary[0]), int(boundary[1])]
+            where = "WHERE " + " AND ".join(conditions) if conditions else ""
+            query = LOG_QUERIES["log_page_previous" if before else "log_page"].format(filters=where)
+
+            # One extra row tells whether there is another page that way
+            rows = self.pool.fetchall(query, params + [page_size + 1])
+            more = len(rows) > page_size
+            rows = rows[:page_size]
+            if before:
+                rows.reverse()
+                return {"rows": rows, "has_next": True, "has_previous": more}
+            return {"rows": rows, "has_next": more, "has_previous": after is not None}
+
+        except ValueError as e:
+            print(f"Error: {e}")
+        except sqlite3.Error as e:
+            print(f"Error reading logs: {e}")
+
     def get_users_with_logs(self):
+        self.flush()
         try:
-            self.cursor.execute(LOG_QUERIES["get_users_with_logs"])
-            users = self.cursor.fetchall()
+            users = self.pool.fetchall(LOG_QUERIES["get_users_with_logs"])
             return [u[0] for u in users]
         except sqlite3.Error as e:
             print(f"Error getting users with logs: {e}")
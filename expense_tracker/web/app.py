@@ -1,6 +1,5 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+import importlib
 import os
 import sys
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
@@ -17,17 +16,26 @@ from expense_tracker.utils.logs import LogManager
 from expense_tracker.database.sql_queries import USER_QUERIES
 
 # Import centralized DB connection
-from expense_tracker.database.connection import get_connection
+from expense_tracker.database.connection import get_pool
 
-# Import pages via package path
-from expense_tracker.web.pages.user_management import show_user_management
-from expense_tracker.web.pages.category_management import show_category_management
-from expense_tracker.web.pages.payment_management import show_payment_management
-from expense_tracker.web.pages.manage_expenses import show_manage_expenses
-from expense_tracker.web.pages.basic_reports import show_basic_reports
-from expense_tracker.web.pages.advanced_reports import show_advanced_reports
-from expense_tracker.web.pages.import_export import show_import_export
-from expense_tracker.web.pages.system_logs import show_system_logs
+# Page name -> (module, show function). The page modules pull in pandas and
+# plotly, so each one is imported the first time it is opened instead of
+# before the login page can render.
+PAGES = {
+    "user_management": ("expense_tracker.web.pages.user_management", "show_user_management"),
+    "category_management": ("expense_tracker.web.pages.category_management", "show_category_management"),
+    "payment_management": ("expense_tracker.web.pages.payment_management", "show_payment_management"),
+    "system_logs": ("expense_tracker.web.pages.system_logs", "show_system_logs"),
+    "manage_expenses": ("expense_tracker.web.pages.manage_expenses", "show_manage_expenses"),
+    "basic_reports": ("expense_tracker.web.pages.basic_reports", "show_basic_reports"),
+    "advanced_reports": ("expense_tracker.web.pages.advanced_reports", "show_advanced_reports"),
+    "import_export": ("expense_tracker.web.pages.import_export", "show_import_export"),
+}
+
+def load_page(name):
+    """Import a page module on first use and return its show function."""
+    module_name, function_name = PAGES[name]
+    return getattr(importlib.import_module(module_name), function_name)
 
 # Set page configuration
 st.set_page_config(
@@ -138,30 +146,31 @@ if "current_page" not in st.session_state:
     st.session_state.current_page = "login"
 
 # Initialize managers
-def initialize_managers(_conn, _cursor):
-    user_manager = UserManager(_cursor, _conn)
-    category_manager = CategoryManager(_cursor, _conn)
-    payment_manager = PaymentManager(_cursor, _conn)
-    expense_manager = ExpenseManager(_cursor, _conn)
+def initialize_managers(pool):
+    # Managers borrow a pooled connection per operation instead of sharing a cursor
+    user_manager = UserManager(pool)
+    category_manager = CategoryManager(pool)
+    payment_manager = PaymentManager(pool)
+    expense_manager = ExpenseManager(pool)
     # Pass expense_manager directly to CSVOperations constructor
-    csv_operations = CSVOperations(_cursor, _conn, expense_manager)
-    report_manager = ReportManager(_cursor, _conn)
-    log_manager = LogManager(_cursor, _conn)
+    csv_operations = CSVOperations(pool, expense_manager)
+    # Opt-in: aggregate reports from an in-memory NumPy snapshot (core/analytics.py)
+    report_manager = ReportManager(pool, columnar=os.getenv("EXPENSE_TRACKER_COLUMNAR") == "1")
+    log_manager = LogManager(pool)
     
     return (user_manager, category_manager, payment_manager, 
             expense_manager, csv_operations, report_manager, log_manager)
 
 # Get database connection and initialize managers
 def ensure_session_initialized():
-    if "cursor" not in st.session_state:
-        conn, cursor = get_connection()
+    if "pool" not in st.session_state:
+        pool = get_pool()
         (
             user_manager, category_manager, payment_manager, 
             expense_manager, csv_operations, report_manager, log_manager
-        ) = initialize_managers(conn, cursor)
+        ) = initialize_managers(pool)
 
-        st.session_state.conn = conn
-        st.session_state.cursor = cursor
+        st.session_state.pool = pool
         st.session_state.user_manager = user_manager
         st.session_state.category_manager = category_manager
         st.session_state.payment_manager = payment_manager
@@ -190,6 +199,8 @@ def login_user(username, password):
 def logout_user():
     if st.session_state.authenticated:
         st.session_state.log_manager.add_log(st.session_state.log_manager.generate_log_description("logout"))
+        # Log entries are written in the background; don't leave the session's behind
+        st.session_state.log_manager.flush()
         st.session_state.user_manager.logout()
         st.session_state.authenticated = False
         st.session_state.username = None
@@ -254,11 +265,8 @@ def show_sidebar():
 def show_delete_account():
     st.markdown("<div class='main-header'>Delete My Account</div>", unsafe_allow_html=True)
     # Count user-related expenses
-    # Use module-level cursor
-    global cursor
     user = st.session_state.username
-    cursor.execute(USER_QUERIES["check_user_expenses"], (user,))
-    count = cursor.fetchone()[0]
+    count = st.session_state.pool.fetchone(USER_QUERIES["check_user_expenses"], (user,))[0]
     st.warning(f"Deleting your account will remove your user data and {count} associated expenses. This action cannot be undone.")
     confirm = st.checkbox("I understand the consequences and want to delete my account", key="confirm_self_delete")
     if confirm and st.button("Delete My Account", key="confirm_delete_account_btn"):
@@ -312,72 +320,50 @@ def show_login_page():
                         st.error("Registration failed. See errors above.")
      
 def show_dashboard():
+    import pandas as pd
+    import plotly.express as px
+
     st.markdown("<div class='main-header'>Dashboard</div>", unsafe_allow_html=True)
     
-    # Get expenses data
-    if st.session_state.role == "admin":
-        query = """
-        SELECT e.expense_id, e.date, e.amount, e.description, 
-            c.category_name, t.tag_name, pm.payment_method_name, ue.username
-        FROM Expense e
-        LEFT JOIN category_expense ce ON e.expense_id = ce.expense_id
-        LEFT JOIN Categories c ON ce.category_id = c.category_id
-        LEFT JOIN tag_expense te ON e.expense_id = te.expense_id
-        LEFT JOIN Tags t ON te.tag_id = t.tag_id
-        LEFT JOIN payment_method_expense pme ON e.expense_id = pme.expense_id
-        LEFT JOIN Payment_Method pm ON pme.payment_method_id = pm.payment_method_id
-        LEFT JOIN user_expense ue ON e.expense_id = ue.expense_id
-        """
-    else:
-        query = f"""
-        SELECT e.expense_id, e.date, e.amount, e.description, 
-            c.category_name, t.tag_name, pm.payment_method_name, ue.username
-        FROM Expense e
-        LEFT JOIN category_expense ce ON e.expense_id = ce.expense_id
-        LEFT JOIN Categories c ON ce.category_id = c.category_id
-        LEFT JOIN tag_expense te ON e.expense_id = te.expense_id
-        LEFT JOIN Tags t ON te.tag_id = t.tag_id
-        LEFT JOIN payment_method_expense pme ON e.expense_id = pme.expense_id
-        LEFT JOIN Payment_Method pm ON pme.payment_method_id = pm.payment_method_id
-        LEFT JOIN user_expense ue ON e.expense_id = ue.expense_id
-        WHERE ue.username = '{st.session_state.username}'
-        """
-    
-    expenses_df = pd.read_sql_query(query, st.session_state.conn)
+    # KPIs, breakdowns and recent expenses in one cached call; writes through
+    # the managers invalidate it for the affected user
+    report_manager = st.session_state.report_manager
+    report_manager.set_user_info(st.session_state.username, st.session_state.role)
+    dashboard = report_manager.get_dashboard(recent=10)
+    if dashboard is None:
+        st.error("Could not load the dashboard.")
+        return
     
     # Quick metrics
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         st.markdown("<div class='card metric-card'>", unsafe_allow_html=True)
-        st.metric("Total Expenses", f"₹{expenses_df['amount'].sum():.2f}")
+        st.metric("Total Expenses", f"₹{dashboard.total:.2f}")
         st.markdown("</div>", unsafe_allow_html=True)
     
     with col2:
         st.markdown("<div class='card metric-card'>", unsafe_allow_html=True)
-        st.metric("Average Expense", (f"₹{expenses_df['amount'].mean():.2f}") if not expenses_df.empty else "₹0.00")
+        st.metric("Average Expense", f"₹{dashboard.average:.2f}")
         st.markdown("</div>", unsafe_allow_html=True)
     
     with col3:
         st.markdown("<div class='card metric-card'>", unsafe_allow_html=True)
-        st.metric("Expense Count", len(expenses_df))
+        st.metric("Expense Count", dashboard.count)
         st.markdown("</div>", unsafe_allow_html=True)
     
     with col4:
         st.markdown("<div class='card metric-card'>", unsafe_allow_html=True)
-        if not expenses_df.empty:
-            st.metric("Latest Expense Date", expenses_df['date'].max())
-        else:
-            st.metric("Latest Expense Date", "N/A")
+        st.metric("Latest Expense Date", dashboard.latest_date or "N/A")
         st.markdown("</div>", unsafe_allow_html=True)
     
     # Charts
-    if not expenses_df.empty:
+    if dashboard.count:
         col1, col2 = st.columns(2)
         
         with col1:
             st.markdown("<div class='section-header'>Category Breakdown</div>", unsafe_allow_html=True)
-            category_data = expenses_df.groupby('category_name')['amount'].sum().reset_index()
+            category_data = pd.DataFrame(dashboard.by_category, columns=['category_name', 'amount'])
             fig = px.pie(category_data, values='amount', names='category_name', 
                         title='Expenses by Category', hole=0.4,
                         color_discrete_sequence=px.colors.qualitative.Pastel)
@@ -385,8 +371,7 @@ def show_dashboard():
         
         with col2:
             st.markdown("<div class='section-header'>Monthly Trend</div>", unsafe_allow_html=True)
-            expenses_df['month'] = pd.to_datetime(expenses_df['date']).dt.strftime('%Y-%m')
-            monthly_data = expenses_df.groupby('month')['amount'].sum().reset_index()
+            monthly_data = pd.DataFrame(dashboard.by_month, columns=['month', 'amount'])
             fig = px.line(monthly_data, x='month', y='amount', 
                         title='Monthly Expense Trend',
                         markers=True)
@@ -396,7 +381,7 @@ def show_dashboard():
         
         with col1:
             st.markdown("<div class='section-header'>Payment Method Usage</div>", unsafe_allow_html=True)
-            payment_data = expenses_df.groupby('payment_method_name')['amount'].sum().reset_index()
+            payment_data = pd.DataFrame(dashboard.by_payment_method, columns=['payment_method_name', 'amount'])
             fig = px.bar(payment_data, x='payment_method_name', y='amount',
                         title='Expenses by Payment Method',
                         color='payment_method_name',
@@ -405,7 +390,7 @@ def show_dashboard():
         
         with col2:
             st.markdown("<div class='section-header'>Tag Analysis</div>", unsafe_allow_html=True)
-            tag_data = expenses_df.groupby('tag_name')['amount'].sum().reset_index()
+            tag_data = pd.DataFrame(dashboard.by_tag, columns=['tag_name', 'amount'])
             fig = px.bar(tag_data, x='tag_name', y='amount',
                         title='Expenses by Tag',
                         color='tag_name',
@@ -417,10 +402,11 @@ def show_dashboard():
     # Recent expenses table
     st.markdown("<div class='section-header'>Recent Expenses</div>", unsafe_allow_html=True)
     
-    if not expenses_df.empty:
-        recent_expenses = expenses_df.sort_values('date', ascending=False).head(10)
-        recent_expenses = recent_expenses[['expense_id', 'date', 'amount', 'category_name', 'tag_name', 'payment_method_name', 'description']]
-        recent_expenses.columns = ['ID', 'Date', 'Amount', 'Category', 'Tag', 'Payment Method', 'Description']
+    if dashboard.recent:
+        recent_expenses = pd.DataFrame(
+            dashboard.recent,
+            columns=['ID', 'Date', 'Amount', 'Category', 'Tag', 'Payment Method', 'Description']
+        )
         st.dataframe(recent_expenses, use_container_width=True)
     else:
         st.info("No recent expenses to display.")
@@ -440,24 +426,10 @@ def main():
 
         if st.session_state.current_page == "dashboard":
             show_dashboard()
-        elif st.session_state.current_page == "user_management":
-            show_user_management()
-        elif st.session_state.current_page == "category_management":
-            show_category_management()
-        elif st.session_state.current_page == "payment_management":
-            show_payment_management()
-        elif st.session_state.current_page == "system_logs":
-            show_system_logs()
-        elif st.session_state.current_page == "manage_expenses":
-            show_manage_expenses()
-        elif st.session_state.current_page == "basic_reports":
-            show_basic_reports()
-        elif st.session_state.current_page == "advanced_reports":
-            show_advanced_reports()
-        elif st.session_state.current_page == "import_export":
-            show_import_export()
         elif st.session_state.current_page == "delete_account":
             show_delete_account()
+        elif st.session_state.current_page in PAGES:
+            load_page(st.session_state.current_page)()
         else:
             show_dashboard()
     else:
@@ -1,15 +1,15 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 import plotly.express as px
 from streamlit import session_state
-from expense_tracker.database.sql_queries import PAYMENT_QUERIES
+from expense_tracker.database.reference_cache import get_reference_cache
 
 def show_advanced_reports():
     st.markdown("<div class='main-header'>Advanced Analytics</div>", unsafe_allow_html=True)
 
-    # Retrieve shared managers and cursor
-    cursor = session_state.cursor
+    # Retrieve shared managers and connection pool
+    pool = session_state.pool
+    references = get_reference_cache(pool)
     report_manager = session_state.report_manager
     report_manager.set_user_info(session_state.username, session_state.role)
     log_manager = session_state.log_manager
@@ -21,10 +21,27 @@ def show_advanced_reports():
     # Tab 1: Above Average Expenses
     with tabs[0]:
         st.subheader("Above Average Expenses")
-        df = report_manager.get_above_average_expenses()
+        range_start = range_end = None
+        if st.checkbox("Only expenses in a date range", key="above_avg_use_range"):
+            col1, col2 = st.columns(2)
+            with col1:
+                range_start = st.date_input("From", value=datetime.today().replace(day=1), key="above_avg_start")
+            with col2:
+                range_end = st.date_input("To", value=datetime.today(), key="above_avg_end")
+            range_start, range_end = range_start.strftime("%Y-%m-%d"), range_end.strftime("%Y-%m-%d")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1, key="above_avg_page_size")
+        with col2:
+            page = st.number_input("Page", min_value=1, value=1, step=1, key="above_avg_page")
+        offset = (int(page) - 1) * page_size
+
+        df = report_manager.get_above_average_expenses(range_start, range_end, limit=page_size, offset=offset)
         if df.empty:
             st.info("No expenses found above category average.")
         else:
+            st.caption(f"Showing {offset + 1}-{offset + len(df)} of {df.attrs['total_rows']} expenses")
             st.dataframe(df, use_container_width=True)
             fig = px.bar(
                 df,
@@ -69,31 +86,35 @@ def show_advanced_reports():
             st.warning("Start date must be before end date.")
             return
 
-        df = report_manager.get_expenses_by_date_range(
-            start_date.strftime("%Y-%m-%d"),
-            end_date.strftime("%Y-%m-%d")
-        )
+        # Monthly and category totals are answered from the monthly rollup
+        start_str, end_str = start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+        trend = report_manager.get_rollup_summary("month", start_str, end_str)
 
-        if df.empty:
+        if trend.empty:
             st.info("No data available in the selected range.")
             return
 
-        df["date"] = pd.to_datetime(df["date"])
-        df["month"] = df["date"].dt.strftime("%Y-%m")
-
         # Time trend chart
-        trend = df.groupby("month")["amount"].sum().reset_index()
-        fig = px.line(trend, x="month", y="amount", title="Monthly Expense Trend", markers=True)
+        fig = px.line(trend, x="month", y="total", title="Monthly Expense Trend", markers=True)
         st.plotly_chart(fig, use_container_width=True)
 
         # Category-wise summary
-        cat_sum = df.groupby("category")["amount"].agg(["sum", "mean", "count"]).reset_index()
-        st.dataframe(cat_sum.rename(columns={"sum": "Total", "mean": "Average", "count": "Transactions"}))
+        cat_sum = report_manager.get_rollup_summary("category", start_str, end_str)[["category", "total", "average", "count"]]
+        st.dataframe(cat_sum.rename(columns={"total": "Total", "average": "Average", "count": "Transactions"}))
 
-        # Fix: Use the correct column name "sum" instead of "Total" since rename doesn't change the actual column names
-        fig2 = px.pie(cat_sum, values="sum", names="category", title="Category Distribution")
+        fig2 = px.pie(cat_sum, values="total", names="category", title="Category Distribution")
         st.plotly_chart(fig2, use_container_width=True)
 
+        # Static version of the full dashboard, rendered only on request
+        if st.button("Prepare dashboard image"):
+            image = report_manager.render_expenses_analytics_chart(
+                {"date": [(">=", start_str), ("<=", end_str)]}
+            )
+            if image:
+                st.image(image)
+                st.download_button("Download PNG", data=image,
+                                   file_name=f"expense_dashboard_{start_str}_{end_str}.png", mime="image/png")
+
         log_manager.add_log("Viewed Expense Analytics Dashboard")
 
     # Tab 3: Payment Method Details
@@ -101,8 +122,7 @@ def show_advanced_reports():
         st.subheader("Payment Method Analysis")
 
         # Fetch methods via shared SQL templates
-        cursor.execute(PAYMENT_QUERIES["list_payment_methods"])
-        methods = [row[0] for row in cursor.fetchall()]
+        methods = references.values("payment_methods")
 
         selected = st.selectbox("Payment Method", methods)
 
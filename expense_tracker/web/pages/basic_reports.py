@@ -3,13 +3,14 @@ import pandas as pd
 from datetime import datetime
 import plotly.express as px
 from streamlit import session_state
-from expense_tracker.database.sql_queries import CATEGORY_QUERIES
+from expense_tracker.database.reference_cache import get_reference_cache
 
 def show_basic_reports():
     st.markdown("<div class='main-header'>Basic Reports</div>", unsafe_allow_html=True)
 
-    # Retrieve shared managers and cursor
-    cursor = session_state.cursor
+    # Retrieve shared managers and connection pool
+    pool = session_state.pool
+    references = get_reference_cache(pool)
     report_manager = session_state.report_manager
     report_manager.set_user_info(session_state.username, session_state.role)
     log_manager = session_state.log_manager
@@ -62,37 +63,27 @@ def show_basic_reports():
         st.subheader("Category Spending Overview")
 
         # Fetch categories via shared SQL templates
-        cursor.execute(CATEGORY_QUERIES["list_categories"])
-        categories = [c[0] for c in cursor.fetchall()]
+        categories = references.values("categories")
         selected = st.selectbox("Select Category", categories)
 
         if selected:
             stats = report_manager.get_category_statistics(selected)
             if stats:
                 col1, col2, col3, col4 = st.columns(4)
-                col1.metric("Total", f"${stats['total']:.2f}")
-                col2.metric("Count", stats["count"])
-                # Fix: Check for both 'avg_amount' and 'average' keys
-                if 'avg_amount' in stats:
-                    col3.metric("Avg", f"${stats['avg_amount']:.2f}")
-                elif 'average' in stats:
-                    col3.metric("Avg", f"${stats['average']:.2f}")
-                else:
-                    # Calculate if neither key exists
-                    avg = stats['total'] / stats['count'] if stats['count'] > 0 else 0
-                    col3.metric("Avg", f"${avg:.2f}")
-                col4.metric("Max", f"${stats['max_amount']:.2f}")
+                col1.metric("Total", f"${stats.total:.2f}")
+                col2.metric("Count", stats.count)
+                col3.metric("Avg", f"${stats.average:.2f}")
+                col4.metric("Max", f"${stats.max_amount:.2f}")
 
                 df = report_manager.get_category_expenses(selected)
                 if not df.empty:
-                    df["date"] = pd.to_datetime(df["date"])
-                    df["month"] = df["date"].dt.to_period("M").astype(str)
-                    month_summary = df.groupby("month")["amount"].sum().reset_index()
+                    # Monthly totals come from the rollup, not from the rows below
+                    month_summary = report_manager.get_rollup_summary("month", category=selected)
 
                     fig = px.line(
                         month_summary,
                         x="month",
-                        y="amount",
+                        y="total",
                         title=f"Monthly Trend for {selected}",
                         markers=True
                     )
@@ -116,32 +107,29 @@ def show_basic_reports():
             end = st.date_input("End Date", key="time_end")
 
         if start and end and start <= end:
-            df = report_manager.get_expenses_by_date_range(
-                start.strftime("%Y-%m-%d"),
-                end.strftime("%Y-%m-%d")
-            )
-
-            if not df.empty:
-                df["date"] = pd.to_datetime(df["date"])
-                df["month"] = df["date"].dt.strftime("%Y-%m")
-                trend = df.groupby("month")["amount"].sum().reset_index()
+            # Both summaries are answered from the monthly rollup
+            start_str, end_str = start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+            trend = report_manager.get_rollup_summary("month", start_str, end_str)
 
+            if not trend.empty:
                 fig = px.bar(
                     trend,
                     x="month",
-                    y="amount",
+                    y="total",
                     title="Spending Over Time",
-                    labels={"month": "Month", "amount": "Total Amount"}
+                    labels={"month": "Month", "total": "Total Amount"}
                 )
                 st.plotly_chart(fig, use_container_width=True)
 
-                by_cat = df.groupby("category")["amount"].sum().reset_index()
-                fig2 = px.pie(by_cat, values="amount", names="category", title="By Category")
+                by_cat = report_manager.get_rollup_summary("category", start_str, end_str)
+                fig2 = px.pie(by_cat, values="total", names="category", title="By Category")
                 st.plotly_chart(fig2, use_container_width=True)
 
-                st.metric("Total", f"${df['amount'].sum():.2f}")
-                st.metric("Avg/Txn", f"${df['amount'].mean():.2f}")
-                st.metric("Transactions", len(df))
+                total = trend["total"].sum()
+                count = int(trend["count"].sum())
+                st.metric("Total", f"${total:.2f}")
+                st.metric("Avg/Txn", f"${total / count:.2f}")
+                st.metric("Transactions", count)
 
                 log_manager.add_log("Viewed Time Summary")
             else:
@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 from streamlit import session_state
 from expense_tracker.utils.logs import LogManager
-from expense_tracker.database.sql_queries import CATEGORY_QUERIES
+from expense_tracker.database.reference_cache import get_reference_cache
 
 def show_category_management():
     # Check if user has admin privileges
@@ -13,7 +13,8 @@ def show_category_management():
     st.markdown("<div class='main-header'>Category Management</div>", unsafe_allow_html=True)
     tab1, tab2, tab3 = st.tabs(["List Categories", "Add Category", "Delete Category"])
     # Retrieve shared managers
-    cursor = session_state.cursor
+    pool = session_state.pool
+    references = get_reference_cache(pool)
     category_manager = session_state.category_manager
     log_manager = session_state.log_manager
     log_manager.set_current_user(session_state.username)
@@ -22,8 +23,7 @@ def show_category_management():
     with tab1:
         st.subheader("All Categories")
         # Fetch all categories
-        cursor.execute(CATEGORY_QUERIES["list_categories"])
-        categories = cursor.fetchall()
+        categories = references.get("categories")
         
         if categories:
             categories_df = pd.DataFrame(categories, columns=["Category Name"])
@@ -57,8 +57,7 @@ def show_category_management():
         st.subheader("Delete Category")
         
         # Categories for deletion
-        cursor.execute(CATEGORY_QUERIES["list_categories"])
-        categories_to_delete = [cat[0] for cat in cursor.fetchall()]
+        categories_to_delete = references.values("categories")
         
         if not categories_to_delete:
             st.info("No categories available to delete.")
@@ -66,13 +65,12 @@ def show_category_management():
             category_to_delete = st.selectbox("Select Category to Delete", categories_to_delete)
             
             # Get category expense count
-            cursor.execute("""
+            expense_count = pool.fetchone("""
                 SELECT COUNT(*) 
                 FROM category_expense ce
                 JOIN Categories c ON ce.category_id = c.category_id
                 WHERE c.category_name = ?
-            """, (category_to_delete,))
-            expense_count = cursor.fetchone()[0]
+            """, (category_to_delete,))[0]
             # Warning about deletion of all related data
             st.warning(f"Deleting this category will remove it and all associated {expense_count} expenses. This action cannot be undone.")
             
@@ -13,8 +13,7 @@ project_root = Path(__file__).resolve().parent.parent.parent
 
 def show_import_export():
     st.markdown("<div class='main-header'>Import/Export Data</div>", unsafe_allow_html=True)
-    # Retrieve shared managers and cursor
-    cursor = session_state.cursor
+    # Retrieve shared managers
     csv_operations = session_state.csv_operations
     log_manager = session_state.log_manager
     csv_operations.set_current_user(session_state.username)
@@ -60,11 +59,12 @@ def show_import_export():
                 tmp_file.write(uploaded_file.getvalue())
                 temp_path = tmp_file.name
             
-            # Preview the uploaded data
+            # Preview the uploaded data. Only the first rows are parsed, so
+            # large exports are never loaded into memory in full.
             try:
-                df = pd.read_csv(temp_path)
+                df = pd.read_csv(temp_path, nrows=5)
                 st.subheader("Preview of data to be imported:")
-                st.dataframe(df.head(5), use_container_width=True)
+                st.dataframe(df, use_container_width=True)
                 
                 # Check for required columns
                 required_columns = ["amount", "category", "payment_method", "date", "description", "tag"]
@@ -75,12 +75,23 @@ def show_import_export():
                 else:
                     # Import button
                     if st.button("Import Expenses"):
-                        # Call the import function
-                        result = csv_operations.import_expenses(temp_path)
+                        # Call the import function, reporting progress chunk by chunk
+                        progress_bar = st.progress(0.0)
+                        
+                        def show_progress(stats):
+                            fraction = stats["bytes_read"] / stats["total_bytes"] if stats["total_bytes"] else 1.0
+                            progress_bar.progress(min(fraction, 1.0), text=f"{stats['rows']} rows processed")
+                        
+                        result = csv_operations.import_expenses(temp_path, progress_callback=show_progress)
                         
                         if result:
-                            log_manager.add_log(log_manager.generate_log_description("import_expenses", [str(len(df))]))
-                            st.success("Expenses imported successfully!")
+                            stats = csv_operations.last_import_stats
+                            progress_bar.progress(1.0, text=f"{stats['rows']} rows processed")
+                            log_manager.add_log(log_manager.generate_log_description("import_expenses", [str(stats["added"])]))
+                            st.success(
+                                f"Expenses imported successfully! {stats['added']} added, "
+                                f"{stats['duplicates']} duplicates skipped, {stats['errors']} errors."
+                            )
                         else:
                             st.error("Failed to import expenses. Check the log for details.")
                 
@@ -107,37 +118,32 @@ def show_import_export():
         }
         
         sort_field = st.selectbox("Sort by", list(sort_options.keys()), format_func=lambda x: sort_options[x])
+        compress = st.checkbox("Compress (gzip)")
         
         # Export button
         if st.button("Export Expenses"):
-            # Create a temporary file for the export
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as tmp_file:
-                temp_path = tmp_file.name
-            
-            # Call the export function
-            result = csv_operations.export_csv(temp_path, sort_field)
+            # The whole export is held in memory here: download_button takes
+            # bytes or a file it reads completely into Streamlit's media store,
+            # so only the CLI export_csv path keeps memory flat for large exports
+            chunks = csv_operations.iter_export_csv(sort_field, compress=compress)
+            csv_data = b"".join(chunks) if chunks is not None else b""
             
-            if result:
-                # Read the exported file for download
-                with open(temp_path, "r") as f:
-                    csv_data = f.read()
-                
+            if csv_operations.last_export_rows:
                 # Generate a meaningful filename
                 current_date = datetime.now().strftime("%Y%m%d")
                 download_filename = f"expenses_{st.session_state.username}_{current_date}.csv"
+                if compress:
+                    download_filename += ".gz"
                 
                 # Create download button
                 st.download_button(
                     label="Download CSV File",
                     data=csv_data,
                     file_name=download_filename,
-                    mime="text/csv"
+                    mime="application/gzip" if compress else "text/csv"
                 )
                 
                 log_manager.add_log(log_manager.generate_log_description("export_expenses"))
                 st.success("Expenses exported successfully!")
-                
-                # Clean up the temporary file
-                os.unlink(temp_path)
             else:
-                st.error("Failed to export expenses. There might be no data to export.")
\ No newline at end of file
+                st.error("Failed to export expenses. There might be no data to export.")
@@ -2,14 +2,30 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 from streamlit import session_state
-from expense_tracker.database.sql_queries import CATEGORY_QUERIES, PAYMENT_QUERIES
+from expense_tracker.database.reference_cache import get_reference_cache
+from expense_tracker.database.sql_queries import EXPENSE_QUERIES
 from expense_tracker.utils.logs import LogManager
 
+# Matches offered by the expense pickers at a time
+PICKER_LIMIT = 20
+
+def pick_expense(expense_manager, label, key, empty_message):
+    """Search box and selectbox over matching expenses; returns the chosen expense id or None."""
+    term = st.text_input("Search by ID, date, amount or description", key=f"{key}_search",
+                         placeholder="e.g. 42, 2024-03, 12.50 or groceries")
+    # Only the matches are fetched, never the whole expense history
+    options = dict(expense_manager.search_expenses(term, st.session_state.role, PICKER_LIMIT))
+    if not options:
+        st.info("No expenses match your search." if term.strip() else empty_message)
+        return None
+    return st.selectbox(label, list(options), format_func=options.get, key=f"{key}_select")
+
 def show_manage_expenses():
     st.markdown("<div class='main-header'>Expense Management</div>", unsafe_allow_html=True)
      
-    # Retrieve shared managers and cursor
-    cursor = session_state.cursor
+    # Retrieve shared managers and connection pool
+    pool = session_state.pool
+    references = get_reference_cache(pool)
     expense_manager = session_state.expense_manager
     expense_manager.set_current_user(session_state.username)
     log_manager = session_state.log_manager
@@ -24,12 +40,10 @@ def show_manage_expenses():
         st.subheader("Add New Expense")
         
         # Get available categories
-        cursor.execute(CATEGORY_QUERIES["list_categories"])
-        categories = [cat[0] for cat in cursor.fetchall()]
+        categories = references.values("categories")
         
         # Get available payment methods
-        cursor.execute(PAYMENT_QUERIES["list_payment_methods"])
-        payment_methods = [pm[0] for pm in cursor.fetchall()]
+        payment_methods = references.values("payment_methods")
         
         if not categories or not payment_methods:
             st.warning("Please make sure categories and payment methods are available before adding expenses.")
@@ -91,85 +105,78 @@ def show_manage_expenses():
             
             with col2:
                 # Category filter
-                cursor.execute(CATEGORY_QUERIES["list_categories"])
-                all_categories = [cat[0] for cat in cursor.fetchall()]
+                all_categories = references.values("categories")
                 selected_category = st.selectbox("Category", ["All"] + all_categories)
                 
                 # Payment method filter
-                cursor.execute(PAYMENT_QUERIES["list_payment_methods"])
-                all_methods = [pm[0] for pm in cursor.fetchall()]
+                all_methods = references.values("payment_methods")
                 selected_method = st.selectbox("Payment Method", ["All"] + all_methods)
                 
                 # Tag filter
-                cursor.execute("SELECT DISTINCT tag_name FROM Tags")
-                all_tags = [tag[0] for tag in cursor.fetchall()]
+                all_tags = references.values("tags")
                 selected_tag = st.selectbox("Tag", ["All"] + all_tags)
         
-        # Build the query based on filters
-        query = """
-            SELECT e.expense_id, e.date, e.amount, e.description, 
-                c.category_name, t.tag_name, pm.payment_method_name
-            FROM Expense e
-            LEFT JOIN category_expense ce ON e.expense_id = ce.expense_id
-            LEFT JOIN Categories c ON ce.category_id = c.category_id
-            LEFT JOIN tag_expense te ON e.expense_id = te.expense_id
-            LEFT JOIN Tags t ON te.tag_id = t.tag_id
-            LEFT JOIN payment_method_expense pme ON e.expense_id = pme.expense_id
-            LEFT JOIN Payment_Method pm ON pme.payment_method_id = pm.payment_method_id
-            LEFT JOIN user_expense ue ON e.expense_id = ue.expense_id
-            WHERE 1=1
-        """
-        params = []
-        
-        # Add filters to the query
-        if st.session_state.role != "admin":
-            # Regular users can only see their own expenses
-            query += " AND ue.username = ?"
-            params.append(st.session_state.username)
-        
+        # Build the filters in the same form the CLI uses
+        filters = {"date": [], "amount": []}
         if start_date:
-            query += " AND e.date >= ?"
-            params.append(start_date.strftime("%Y-%m-%d"))
-        
+            filters["date"].append((">=", start_date.strftime("%Y-%m-%d")))
         if end_date:
-            query += " AND e.date <= ?"
-            params.append(end_date.strftime("%Y-%m-%d"))
-        
+            filters["date"].append(("<=", end_date.strftime("%Y-%m-%d")))
         if min_amount > 0:
-            query += " AND e.amount >= ?"
-            params.append(min_amount)
-        
+            filters["amount"].append((">=", min_amount))
         if max_amount and max_amount > 0:
-            query += " AND e.amount <= ?"
-            params.append(max_amount)
-        
+            filters["amount"].append(("<=", max_amount))
         if selected_category != "All":
-            query += " AND c.category_name = ?"
-            params.append(selected_category)
-        
+            filters["category"] = [("=", selected_category)]
         if selected_method != "All":
-            query += " AND pm.payment_method_name = ?"
-            params.append(selected_method)
-        
+            filters["payment_method"] = [("=", selected_method)]
         if selected_tag != "All":
-            query += " AND t.tag_name = ?"
-            params.append(selected_tag)
-        
-        query += " ORDER BY e.date DESC"
-        
-        # Execute the query
-        cursor.execute(query, params)
-        expenses = cursor.fetchall()
+            filters["tag"] = [("=", selected_tag)]
         
-        if expenses:
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1, key="expense_page_size")
+
+        # Start from the newest expenses again whenever the filters change
+        page_state = (repr(filters), page_size)
+        if session_state.get("expense_page_state") != page_state:
+            session_state.expense_page_state = page_state
+            session_state.expense_page_cursor = {}
+            session_state.expense_page_number = 1
+
+        # Only the rows of this page are read; count and sum come from an aggregate
+        role = st.session_state.role
+        page = expense_manager.get_expense_page(filters, role, page_size, **session_state.expense_page_cursor)
+        totals = expense_manager.get_expense_totals(filters, role)
+        if page and not page["rows"] and session_state.expense_page_cursor:
+            # Everything past the cursor was deleted meanwhile: start over
+            session_state.expense_page_cursor = {}
+            session_state.expense_page_number = 1
+            st.rerun()
+
+        if page and page["rows"]:
             # Convert to DataFrame for display
-            df = pd.DataFrame(expenses, columns=[
+            df = pd.DataFrame(page["rows"], columns=[
                 "ID", "Date", "Amount", "Description", "Category", "Tag", "Payment Method"
             ])
             st.dataframe(df, use_container_width=True)
-            
+
             # Summary information
-            st.markdown(f"**Total: ${df['Amount'].sum():.2f}** ({len(df)} expenses)")
+            if totals:
+                count, total = totals
+                pages = max(1, -(-count // page_size))
+                st.markdown(f"**Total: ${total:.2f}** ({count} expenses) · Page {session_state.expense_page_number} of {pages}")
+
+            first, last = page["rows"][0], page["rows"][-1]
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("Previous", disabled=not page["has_previous"], key="expense_page_previous"):
+                    session_state.expense_page_cursor = {"before": (first[1], first[0])}
+                    session_state.expense_page_number -= 1
+                    st.rerun()
+            with col2:
+                if st.button("Next", disabled=not page["has_next"], key="expense_page_next"):
+                    session_state.expense_page_cursor = {"after": (last[1], last[0])}
+                    session_state.expense_page_number += 1
+                    st.rerun()
         else:
             st.info("No expenses found matching your filters.")
     
@@ -177,74 +184,22 @@ def show_manage_expenses():
     with tab3:
         st.subheader("Update Expense")
         
-        # Get user expenses for selection
-        if st.session_state.role == "admin":
-            cursor.execute("""
-                SELECT e.expense_id, e.date, e.amount, c.category_name, 
-                    t.tag_name, pm.payment_method_name, e.description, ue.username
-                FROM Expense e
-                LEFT JOIN category_expense ce ON e.expense_id = ce.expense_id
-                LEFT JOIN Categories c ON ce.category_id = c.category_id
-                LEFT JOIN tag_expense te ON e.expense_id = te.expense_id
-                LEFT JOIN Tags t ON te.tag_id = t.tag_id
-                LEFT JOIN payment_method_expense pme ON e.expense_id = pme.expense_id
-                LEFT JOIN Payment_Method pm ON pme.payment_method_id = pm.payment_method_id
-                LEFT JOIN user_expense ue ON e.expense_id = ue.expense_id
-                ORDER BY e.date DESC
-            """)
-        else:
-            cursor.execute("""
-                SELECT e.expense_id, e.date, e.amount, c.category_name, 
-                    t.tag_name, pm.payment_method_name, e.description
-                FROM Expense e
-                LEFT JOIN category_expense ce ON e.expense_id = ce.expense_id
-                LEFT JOIN Categories c ON ce.category_id = c.category_id
-                LEFT JOIN tag_expense te ON e.expense_id = te.expense_id
-                LEFT JOIN Tags t ON te.tag_id = t.tag_id
-                LEFT JOIN payment_method_expense pme ON e.expense_id = pme.expense_id
-                LEFT JOIN Payment_Method pm ON pme.payment_method_id = pm.payment_method_id
-                LEFT JOIN user_expense ue ON e.expense_id = ue.expense_id
-                WHERE ue.username = ?
-                ORDER BY e.date DESC
-            """, (st.session_state.username,))
-        
-        expenses = cursor.fetchall()
-        
-        if not expenses:
-            st.info("No expenses available to update.")
-        else:
-            # Format expenses for selection
-            if st.session_state.role == "admin":
-                expense_options = [f"ID: {e[0]} | {e[1]} | ${e[2]} | {e[3]} | User: {e[7]}" for e in expenses]
-            else:
-                expense_options = [f"ID: {e[0]} | {e[1]} | ${e[2]} | {e[3]}" for e in expenses]
-            
-            selected_expense = st.selectbox("Select Expense to Update", expense_options)
-            expense_id = int(selected_expense.split('|')[0].split(':')[1].strip())
-            
+        expense_id = pick_expense(expense_manager, "Select Expense to Update", "update_expense",
+                                  "No expenses available to update.")
+        if expense_id is not None:
             # Get available categories and payment methods
-            cursor.execute(CATEGORY_QUERIES["list_categories"])
-            categories = [cat[0] for cat in cursor.fetchall()]
+            categories = references.values("categories")
             
-            cursor.execute(PAYMENT_QUERIES["list_payment_methods"])
-            payment_methods = [pm[0] for pm in cursor.fetchall()]
+            payment_methods = references.values("payment_methods")
             
             # Get current expense details for pre-filling the form
-            cursor.execute("""
-                SELECT e.amount, e.date, e.description, c.category_name, 
-                    t.tag_name, pm.payment_method_name, pme.payment_detail_identifier
-                FROM Expense e
-                LEFT JOIN category_expense ce ON e.expense_id = ce.expense_id
-                LEFT JOIN Categories c ON ce.category_id = c.category_id
-                LEFT JOIN tag_expense te ON e.expense_id = te.expense_id
-                LEFT JOIN Tags t ON te.tag_id = t.tag_id
-                LEFT JOIN payment_method_expense pme ON e.expense_id = pme.expense_id
-                LEFT JOIN Payment_Method pm ON pme.payment_method_id = pm.payment_method_id
+            expense_details = pool.fetchone("""
+                SELECT e.amount, e.date, e.description, e.category_name, 
+                    e.tag_name, e.payment_method_name, e.payment_detail_identifier
+                FROM expense_flat e
                 WHERE e.expense_id = ?
             """, (expense_id,))
             
-            expense_details = cursor.fetchone()
-            
             if expense_details:
                 current_amount, current_date, current_desc, current_category, current_tag, current_method, current_payment_detail = expense_details
                 
@@ -302,73 +257,33 @@ def show_manage_expenses():
     with tab4:
         st.subheader("Delete Expense")
         
-        # Get user expenses for deletion
-        if st.session_state.role == "admin":
-            cursor.execute("""
-                SELECT e.expense_id, e.date, e.amount, c.category_name, 
-                    t.tag_name, pm.payment_method_name, e.description, ue.username
-                FROM Expense e
-                LEFT JOIN category_expense ce ON e.expense_id = ce.expense_id
-                LEFT JOIN Categories c ON ce.category_id = c.category_id
-                LEFT JOIN tag_expense te ON e.expense_id = te.expense_id
-                LEFT JOIN Tags t ON te.tag_id = t.tag_id
-                LEFT JOIN payment_method_expense pme ON e.expense_id = pme.expense_id
-                LEFT JOIN Payment_Method pm ON pme.payment_method_id = pm.payment_method_id
-                LEFT JOIN user_expense ue ON e.expense_id = ue.expense_id
-                ORDER BY e.date DESC
-            """)
-        else:
-            cursor.execute("""
-                SELECT e.expense_id, e.date, e.amount, c.category_name, 
-                    t.tag_name, pm.payment_method_name, e.description
-                FROM Expense e
-                LEFT JOIN category_expense ce ON e.expense_id = ce.expense_id
-                LEFT JOIN Categories c ON ce.category_id = c.category_id
-                LEFT JOIN tag_expense te ON e.expense_id = te.expense_id
-                LEFT JOIN Tags t ON te.tag_id = t.tag_id
-                LEFT JOIN payment_method_expense pme ON e.expense_id = pme.expense_id
-                LEFT JOIN Payment_Method pm ON pme.payment_method_id = pm.payment_method_id
-                LEFT JOIN user_expense ue ON e.expense_id = ue.expense_id
-                WHERE ue.username = ?
-                ORDER BY e.date DESC
-            """, (st.session_state.username,))
-        
-        expenses = cursor.fetchall()
-        
-        if not expenses:
-            st.info("No expenses available to delete.")
-        else:
-            # Format expenses for selection
+        expense_id = pick_expense(expense_manager, "Select Expense to Delete", "delete_expense",
+                                  "No expenses available to delete.")
+        if expense_id is not None:
+            # Display expense details
             if st.session_state.role == "admin":
-                expense_options = [f"ID: {e[0]} | {e[1]} | ${e[2]} | {e[3]} | User: {e[7]}" for e in expenses]
+                expense = pool.fetchone(EXPENSE_QUERIES["expense_details"].format(user_filter=""), (expense_id,))
             else:
-                expense_options = [f"ID: {e[0]} | {e[1]} | ${e[2]} | {e[3]}" for e in expenses]
-            
-            selected_expense = st.selectbox("Select Expense to Delete", expense_options, key="delete_expense_select")
-            expense_id = int(selected_expense.split('|')[0].split(':')[1].strip())
-            
-            # Display expense details
-            for expense in expenses:
-                if expense[0] == expense_id:
-                    st.markdown("**Expense Details:**")
-                    
-                    details = {
-                        "ID": expense[0],
-                        "Date": expense[1],
-                        "Amount": f"${expense[2]:.2f}",
-                        "Category": expense[3],
-                        "Tag": expense[4],
-                        "Payment Method": expense[5],
-                        "Description": expense[6]
-                    }
-                    
-                    if st.session_state.role == "admin":
-                        details["User"] = expense[7]
-                    
-                    for key, value in details.items():
-                        st.markdown(f"**{key}:** {value}")
-                    
-                    break
+                expense = pool.fetchone(EXPENSE_QUERIES["expense_details"].format(user_filter="AND e.username = ?"),
+                                        (expense_id, st.session_state.username))
+            if expense:
+                st.markdown("**Expense Details:**")
+                
+                details = {
+                    "ID": expense[0],
+                    "Date": expense[1],
+                    "Amount": f"${expense[2]:.2f}",
+                    "Category": expense[3],
+                    "Tag": expense[4],
+                    "Payment Method": expense[5],
+                    "Description": expense[6]
+                }
+                
+                if st.session_state.role == "admin":
+                    details["User"] = expense[7]
+                
+                for key, value in details.items():
+                    st.markdown(f"**{key}:** {value}")
             
             # Confirmation for deletion
             st.warning("This action cannot be undone. Are you sure you want to delete this expense?")
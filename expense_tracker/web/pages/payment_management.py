@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 from streamlit import session_state
 from expense_tracker.utils.logs import LogManager
+from expense_tracker.database.reference_cache import get_reference_cache
 from expense_tracker.database.sql_queries import PAYMENT_QUERIES
 
 def show_payment_management():
@@ -12,7 +13,8 @@ def show_payment_management():
     st.markdown("<div class='main-header'>Payment Method Management</div>", unsafe_allow_html=True)
     tab1, tab2, tab3 = st.tabs(["List Payment Methods", "Add Payment Method", "Delete Payment Method"])
     # Retrieve shared managers
-    cursor = session_state.cursor
+    pool = session_state.pool
+    references = get_reference_cache(pool)
     payment_manager = session_state.payment_manager
     log_manager = session_state.log_manager
     log_manager.set_current_user(session_state.username)
@@ -21,8 +23,7 @@ def show_payment_management():
     with tab1:
         st.subheader("All Payment Methods")
         # Fetch all payment methods
-        cursor.execute(PAYMENT_QUERIES["list_payment_methods"])
-        payment_methods = cursor.fetchall()
+        payment_methods = references.get("payment_methods")
         
         if payment_methods:
             methods_df = pd.DataFrame(payment_methods, columns=["Payment Method"])
@@ -54,15 +55,13 @@ def show_payment_management():
     with tab3:
         st.subheader("Delete Payment Method")
         # Fetch payment methods for deletion
-        cursor.execute(PAYMENT_QUERIES["list_payment_methods"])
-        methods_to_delete = [m[0] for m in cursor.fetchall()]
+        methods_to_delete = references.values("payment_methods")
         if not methods_to_delete:
             st.info("No payment methods available to delete.")
         else:
             method = st.selectbox("Select Payment Method to Delete", methods_to_delete)
             # Count associated expenses
-            cursor.execute(PAYMENT_QUERIES["check_payment_expenses"], (method,))
-            expense_count = cursor.fetchone()[0]
+            expense_count = pool.fetchone(PAYMENT_QUERIES["check_payment_expenses"], (method,))[0]
             st.warning(f"Deleting payment method '{method}' will remove it and {expense_count} associated expenses. This action cannot be undone.")
             # Confirmation before deletion
             confirm = st.checkbox("I understand the consequences and want to delete this payment method", key="confirm_payment_delete")
@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from expense_tracker.database.connection import get_connection
+from expense_tracker.database.connection import get_pool
 from expense_tracker.utils.logs import LogManager
 from expense_tracker.database.sql_queries import LOG_QUERIES
 
@@ -13,18 +13,18 @@ def show_system_logs():
     
     st.markdown("<div class='main-header'>System Logs</div>", unsafe_allow_html=True)
     
-    # Initialize DB connection and manager
-    conn, cursor = get_connection()
+    # Initialize DB connection pool and manager
+    pool = get_pool()
     
-    log_manager = LogManager(cursor, conn)
+    # get_log_page() flushes the background log writer before reading
+    log_manager = LogManager(pool)
     
     # Set up filter options
     col1, col2, col3 = st.columns(3)
     
     with col1:
         # Get unique usernames from log table
-        cursor.execute(LOG_QUERIES["get_users_with_logs"])
-        usernames = [row[0] for row in cursor.fetchall()]
+        usernames = [row[0] for row in pool.fetchall(LOG_QUERIES["get_users_with_logs"])]
         selected_user = st.selectbox("Filter by User", ["All"] + usernames)
     
     with col2:
@@ -34,58 +34,49 @@ def show_system_logs():
     with col3:
         end_date = st.date_input("End Date", value=None)
     
-    # Get log entries with filters
-    query = LOG_QUERIES["view_logs_base"]
-    params = []
-    
-    # Add WHERE clause if any filter is applied
-    where_clause = " WHERE 1=1"
-    query += where_clause
-    
-    if selected_user != "All":
-        query += " AND username = ?"
-        params.append(selected_user)
-    
-    if start_date:
-        start_date_str = start_date.strftime("%Y-%m-%d")
-        query += " AND date(timestamp) >= ?"
-        params.append(start_date_str)
-    
-    if end_date:
-        end_date_str = end_date.strftime("%Y-%m-%d")
-        query += " AND date(timestamp) <= ?"
-        params.append(end_date_str)
-    
-    query += LOG_QUERIES["view_logs_order"] + " LIMIT 1000"
-    
-    cursor.execute(query, params)
-    logs = cursor.fetchall()
-    
-    if logs:
-        # Format logs for display
-        # Make sure the column names match the number of columns in the data
-        column_names = ["ID", "Username", "Timestamp", "Description"]
-        logs_df = pd.DataFrame(logs, columns=column_names)
-        # Start row numbering from 1
-        logs_df.index = logs_df.index + 1
+    page_size = st.selectbox("Entries per page", [50, 100, 250, 500], index=1, key="log_page_size")
+
+    # Start from the newest entries again whenever the filters change
+    page_state = (selected_user, start_date, end_date, page_size)
+    if st.session_state.get("log_page_state") != page_state:
+        st.session_state.log_page_state = page_state
+        st.session_state.log_page_cursor = {}
+        st.session_state.log_page_number = 1
+
+    # Newest first, paged by (ts, log_id) so deep pages cost the same as the first
+    page = log_manager.get_log_page(
+        None if selected_user == "All" else selected_user,
+        start_date.strftime("%Y-%m-%d") if start_date else None,
+        end_date.strftime("%Y-%m-%d") if end_date else None,
+        page_size,
+        **st.session_state.log_page_cursor,
+    )
+    if page and not page["rows"] and st.session_state.log_page_cursor:
+        # Everything past the cursor was deleted meanwhile: start over
+        st.session_state.log_page_cursor = {}
+        st.session_state.log_page_number = 1
+        st.rerun()
+
+    if page and page["rows"]:
+        logs_df = pd.DataFrame([row[:4] for row in page["rows"]], columns=["ID", "Username", "Timestamp", "Description"])
+        # Number rows across pages, starting from 1
+        logs_df.index = logs_df.index + 1 + (st.session_state.log_page_number - 1) * page_size
         logs_df.index.name = "No."
-        
-        # Apply formatting - Fix: Safely convert timestamp strings to datetime objects
-        def safe_datetime_format(x):
-            try:
-                if pd.notna(x) and isinstance(x, str):
-                    # Try to parse as datetime
-                    dt = pd.to_datetime(x, errors='coerce')
-                    if pd.notna(dt):
-                        return dt.strftime("%Y-%m-%d %H:%M:%S")
-                return x  # Return original value if not parseable as datetime
-            except:
-                return x  # Return original value on any error
-                
-        logs_df["Timestamp"] = logs_df["Timestamp"].apply(safe_datetime_format)
-        
         st.dataframe(logs_df, use_container_width=True)
-        
-        st.info(f"Showing {len(logs)} most recent log entries. Use filters to narrow down results.")
+
+        st.caption(f"Page {st.session_state.log_page_number} · newest entries first")
+
+        first, last = page["rows"][0], page["rows"][-1]
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Newer", disabled=not page["has_previous"], key="log_page_newer"):
+                st.session_state.log_page_cursor = {"before": (first[4], first[0])}
+                st.session_state.log_page_number -= 1
+                st.rerun()
+        with col2:
+            if st.button("Older", disabled=not page["has_next"], key="log_page_older"):
+                st.session_state.log_page_cursor = {"after": (last[4], last[0])}
+                st.session_state.log_page_number += 1
+                st.rerun()
     else:
-        st.info("No log entries found matching the selected filters.")
\ No newline at end of file
+        st.info("No log entries found matching the selected filters.")
@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 from streamlit import session_state
 
-from expense_tracker.database.sql_queries import USER_QUERIES
+from expense_tracker.database.reference_cache import get_reference_cache
 from expense_tracker.utils.logs import LogManager
 from expense_tracker.core.user import UserManager  # only for type hints, live instance from session_state
 
@@ -16,7 +16,8 @@ def show_user_management():
     
     # Retrieve shared managers
     user_manager = session_state.user_manager
-    cursor = session_state.cursor
+    pool = session_state.pool
+    references = get_reference_cache(pool)
     log_manager = session_state.log_manager
     log_manager.set_current_user(session_state.username)
     
@@ -24,8 +25,7 @@ def show_user_management():
     with tab1:
         st.subheader("All Users")
         # Fetch all users and their roles
-        cursor.execute(USER_QUERIES["list_users"])
-        users = cursor.fetchall()
+        users = references.get("users")
         
         if users:
             users_df = pd.DataFrame(users, columns=["Username", "Role"])
@@ -58,9 +58,7 @@ def show_user_management():
         st.subheader("Delete User")
         
         # Users except current admin
-        cursor.execute("SELECT username FROM User WHERE username != ?", (session_state.username,))
-        
-        users_to_delete = [user[0] for user in cursor.fetchall()]
+        users_to_delete = [user[0] for user in references.get("users") if user[0] != session_state.username]
         
         if not users_to_delete:
             st.info("No other users to delete.")
@@ -68,29 +66,24 @@ def show_user_management():
             user_to_delete = st.selectbox("Select User to Delete", users_to_delete)
             
             # Get user details
-            cursor.execute("""
+            result = pool.fetchone("""
                 SELECT r.role_name
                 FROM User u
                 JOIN user_role ur ON u.username = ur.username
                 JOIN Role r ON ur.role_id = r.role_id
                 WHERE u.username = ?
             """, (user_to_delete,))
-            
-            # Store the result of fetchone() in a variable first
-            result = cursor.fetchone()
             if result and len(result) > 0:
                 user_role = result[0]
             else:
                 user_role = "Unknown"
 
             # Get user expense count
-            cursor.execute("""
+            result = pool.fetchone("""
                 SELECT COUNT(*)
                 FROM user_expense
                 WHERE username = ?
             """, (user_to_delete,))
-                
-            result = cursor.fetchone()
             if result is not None and len(result) > 0:
                 expense_count = result[0]
             else: